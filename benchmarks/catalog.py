@@ -0,0 +1,66 @@
+import copy
+import os
+import shutil
+import tempfile
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.test.utils import override_settings, setup_test_environment  # noqa: E402
+from shop.bulk import insert_products  # noqa: E402
+from shop.sync import products_changed  # noqa: E402
+
+__all__ = (
+    "setup_database",
+    "teardown_database",
+    "create_catalog",
+)
+
+
+def setup_database():
+    # 운영 DB 를 건드리지 않도록 테스트 DB (SQLite 는 메모리) 에 마이그레이션 후 사용
+    old_name = connection.settings_dict["NAME"]
+    # 테스트 실행과 같이 DEBUG (debug_toolbar) 를 끄고 측정
+    setup_test_environment(debug=False)
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+    # 버전 캐시 (파일) 도 임시 디렉터리 사용
+    cache_dir = tempfile.mkdtemp()
+    cache_settings = copy.deepcopy(settings.CACHES)
+    cache_settings[settings.SHOP_VERSION_CACHE]["LOCATION"] = cache_dir
+    override = override_settings(CACHES=cache_settings)
+    override.enable()
+    return old_name, override, cache_dir
+
+
+def teardown_database(state):
+    old_name, override, cache_dir = state
+    override.disable()
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def create_catalog(
+    products, options=3, tags=2, tag_pool=100, chunk_size=1000, offset=0
+):
+    # 상품 products 개, 상품별 옵션 options 개 / 태그 tags 개 (tag_pool 개의 태그 중 선택)
+    # offset 개의 상품이 이미 있으면 이어서 생성
+    tag_pks = {}
+    for start in range(offset, products, chunk_size):
+        items = [
+            (
+                "상품{}".format(i),
+                [
+                    ("옵션{}".format(j), (i * 7 + j * 500) % 10000)
+                    for j in range(options)
+                ],
+                [(None, "태그{}".format((i + j) % tag_pool)) for j in range(tags)],
+            )
+            for i in range(start, min(start + chunk_size, products))
+        ]
+        with transaction.atomic():
+            created = insert_products(items, tag_pks)
+            products_changed([product.pk for product in created], prices=False)
@@ -0,0 +1,202 @@
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+from benchmarks.catalog import create_catalog
+from benchmarks.load import percentile
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.test.utils import override_settings
+from shop.tags import tag_resolver
+
+# SHOP_DB_PROFILES 별 동시 읽기 / 쓰기 처리량 비교
+# 프로파일마다 임시 SQLite 파일에 상품을 만들고, 읽기 / 쓰기 워커 프로세스가
+# WSGI 앱으로 직접 요청 (요청마다 연결을 정리하는 request_finished 포함)
+# $ python -m benchmarks.database --products 10000 --readers 4 --writers 2 --duration 10
+
+
+def make_environ(method, path, query="", data=None):
+    body = json.dumps(data).encode() if data is not None else b""
+    return {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SERVER_NAME": "127.0.0.1",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "REMOTE_ADDR": "127.0.0.1",
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": io.StringIO(),
+        "wsgi.multithread": False,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+
+
+def read_request(rng, products):
+    # 상세 조회와 가격 조건 목록 조회를 번갈아 실행
+    if rng.random() < 0.5:
+        return make_environ(
+            "GET", "/shop/products/{}/".format(rng.randint(1, products))
+        )
+    return make_environ(
+        "GET",
+        "/shop/products/",
+        "page_size=20&price_gte={}".format(rng.randrange(0, 10000, 100)),
+    )
+
+
+def write_request(rng, products):
+    index = rng.randrange(1000000)
+    return make_environ(
+        "POST",
+        "/shop/products/",
+        data={
+            "name": "부하상품{}".format(index),
+            "option_set": [
+                {"name": "옵션{}".format(j), "price": (index + j * 500) % 10000}
+                for j in range(3)
+            ],
+            "tag_set": [{"name": "태그{}".format(index % 100)}],
+        },
+    )
+
+
+def worker(kind, products, deadline, results):
+    application = get_wsgi_application()
+    make_request = read_request if kind == "read" else write_request
+    rng = random.Random(os.getpid())
+    latencies, errors = [], 0
+
+    def start_response(status, headers, exc_info=None):
+        start_response.status = int(status.split(" ", 1)[0])
+
+    while time.monotonic() < deadline:
+        environ = make_request(rng, products)
+        started = time.perf_counter()
+        response = application(environ, start_response)
+        try:
+            b"".join(response)
+        finally:
+            response.close()
+        latencies.append(time.perf_counter() - started)
+        if start_response.status >= 400:
+            errors += 1
+    results.put((kind, latencies, errors))
+
+
+def prepare_database(path, products):
+    connection = connections["default"]
+    connection.close()
+    connection.settings_dict["NAME"] = path
+    # 이전 프로파일 DB 의 태그 pk 를 사용하지 않도록 초기화
+    caches[settings.SHOP_VERSION_CACHE].clear()
+    tag_resolver.clear()
+    call_command("migrate", verbosity=0)
+    create_catalog(products)
+    connections.close_all()
+
+
+def run_profile(profile, args):
+    directory = tempfile.mkdtemp()
+    connection = connections["default"]
+    old_name = connection.settings_dict["NAME"]
+    old_max_age = connection.settings_dict["CONN_MAX_AGE"]
+    # 응답 캐시 없이 매 요청 DB 조회
+    override = override_settings(
+        DEBUG=False,
+        SHOP_DB_PROFILE=profile,
+        SHOP_METRICS_DIR=os.path.join(directory, "metrics"),
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            settings.SHOP_RESPONSE_CACHE: {
+                "BACKEND": "django.core.cache.backends.dummy.DummyCache"
+            },
+            settings.SHOP_VERSION_CACHE: {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+            },
+        },
+    )
+    override.enable()
+    connection.settings_dict["CONN_MAX_AGE"] = settings.SHOP_DB_PROFILES[profile][
+        "CONN_MAX_AGE"
+    ]
+    try:
+        prepare_database(os.path.join(directory, "db.sqlite3"), args.products)
+
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        deadline = time.monotonic() + args.duration
+        processes = [
+            context.Process(
+                target=worker, args=(kind, args.products, deadline, results)
+            )
+            for kind in ["read"] * args.readers + ["write"] * args.writers
+        ]
+        for process in processes:
+            process.start()
+        collected = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+    finally:
+        connections.close_all()
+        connection.settings_dict["NAME"] = old_name
+        connection.settings_dict["CONN_MAX_AGE"] = old_max_age
+        override.disable()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    report = {}
+    for kind in ("read", "write"):
+        latencies = sorted(
+            latency
+            for result_kind, values, _ in collected
+            if result_kind == kind
+            for latency in values
+        )
+        report[kind] = {
+            "rps": round(len(latencies) / args.duration, 1),
+            "errors": sum(
+                errors for result_kind, _, errors in collected if result_kind == kind
+            ),
+            "p50_ms": (
+                round(percentile(latencies, 0.5) * 1000, 2) if latencies else None
+            ),
+            "p99_ms": (
+                round(percentile(latencies, 0.99) * 1000, 2) if latencies else None
+            ),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", nargs="+", default=["default", "production"])
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=10)
+    args = parser.parse_args()
+
+    for profile in args.profiles:
+        report = run_profile(profile, args)
+        for kind, result in report.items():
+            print(
+                "{:<12} {:<6} {rps:>10.1f} rps {errors:>6} errors "
+                "p50 {p50_ms}ms p99 {p99_ms}ms".format(profile, kind, **result)
+            )
+
+
+if __name__ == "__main__":
+    main()
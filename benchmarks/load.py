@@ -0,0 +1,122 @@
+import argparse
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+# 실행 중인 서버에 동시 요청을 보내 처리량 / 응답 시간 분포를 측정
+# $ uvicorn config.asgi:application --port 8000
+# $ gunicorn config.wsgi --threads 8 --bind 127.0.0.1:8001
+# $ python -m benchmarks.load http://127.0.0.1:8000/shop/products/ --concurrency 200
+# $ python -m benchmarks.load http://127.0.0.1:8001/shop/products/ --concurrency 200
+# --idle 은 측정 동안 요청 없이 유지할 keep-alive 연결 수
+
+
+async def request(reader, writer, host, target):
+    writer.write(
+        "GET {} HTTP/1.1\r\nHost: {}\r\nConnection: keep-alive\r\n\r\n".format(
+            target, host
+        ).encode("latin1")
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length, chunked = None, False
+    while True:
+        line = (await reader.readline()).strip()
+        if not line:
+            break
+        name, _, value = line.decode("latin1").partition(":")
+        name = name.lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "transfer-encoding" and "chunked" in value:
+            chunked = True
+
+    if chunked:
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length is not None:
+        await reader.readexactly(length)
+    return status
+
+
+async def client(url, deadline, latencies, errors):
+    parts = urlsplit(url)
+    target = parts.path + ("?" + parts.query if parts.query else "")
+    reader = writer = None
+    while time.monotonic() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(
+                    parts.hostname, parts.port or 80
+                )
+            started = time.monotonic()
+            status = await request(reader, writer, parts.netloc, target)
+            latencies.append(time.monotonic() - started)
+            if status >= 400:
+                errors.append(status)
+        except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+            errors.append(None)
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def hold_idle(url, count):
+    parts = urlsplit(url)
+    connections = []
+    for _ in range(count):
+        try:
+            connections.append(
+                await asyncio.open_connection(parts.hostname, parts.port or 80)
+            )
+        except OSError:
+            break
+    return connections
+
+
+def percentile(values, ratio):
+    index = min(len(values) - 1, int(len(values) * ratio))
+    return values[index]
+
+
+async def run(args):
+    idle = await hold_idle(args.url, args.idle)
+    latencies, errors = [], []
+    deadline = time.monotonic() + args.duration
+    await asyncio.gather(
+        *(
+            client(args.url, deadline, latencies, errors)
+            for _ in range(args.concurrency)
+        )
+    )
+    for _, writer in idle:
+        writer.close()
+
+    latencies.sort()
+    print("idle        : {} / {}".format(len(idle), args.idle))
+    print("concurrency : {}".format(args.concurrency))
+    print("requests    : {}".format(len(latencies)))
+    print("errors      : {}".format(len(errors)))
+    print("rps         : {:.1f}".format(len(latencies) / args.duration))
+    if latencies:
+        print("p50         : {:.1f}ms".format(percentile(latencies, 0.5) * 1000))
+        print("p99         : {:.1f}ms".format(percentile(latencies, 0.99) * 1000))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("url")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--idle", type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
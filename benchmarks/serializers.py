@@ -0,0 +1,57 @@
+import argparse
+import time
+from benchmarks.catalog import setup_database, teardown_database, create_catalog
+from rest_framework.renderers import JSONRenderer
+from shop.models import Product
+from shop.projection import serialize_product_rows
+from shop.serializers import ProductSerializer
+
+# python -m benchmarks.serializers --products 10000
+# ProductSerializer (모델 인스턴스 + prefetch) 와 values() 직렬화 비교
+
+
+def serialize_models():
+    queryset = Product.objects.prefetch_related("tag_set", "option_set").order_by("pk")
+    return JSONRenderer().render(ProductSerializer(queryset, many=True).data)
+
+
+def serialize_values():
+    rows = list(Product.objects.order_by("pk").values("pk", "name"))
+    return JSONRenderer().render(serialize_product_rows(rows))
+
+
+def measure(func, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        content = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, content
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--options", type=int, default=3)
+    parser.add_argument("--tags", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    state = setup_database()
+    try:
+        create_catalog(args.products, args.options, args.tags)
+        model_time, model_content = measure(serialize_models, args.repeat)
+        values_time, values_content = measure(serialize_values, args.repeat)
+    finally:
+        teardown_database(state)
+
+    assert model_content == values_content, "직렬화 결과가 다릅니다."
+    print("products : {}".format(args.products))
+    print("models   : {:.3f}s".format(model_time))
+    print("values   : {:.3f}s".format(values_time))
+    print("speedup  : {:.1f}x".format(model_time / values_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from base64 import b64encode
+from benchmarks.catalog import setup_database, teardown_database, create_catalog
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from shop.models import ProductOption
+
+# 상품 수 별 API 성능 측정 (테스트 DB 사용)
+# $ python -m benchmarks.suite --sizes 100 10000 100000 --output results.json
+# $ python -m benchmarks.suite --baseline benchmarks/baseline.json --save-baseline
+# $ python -m benchmarks.suite --baseline benchmarks/baseline.json
+# baseline 보다 wall / peak 가 threshold 배 이상이거나 쿼리 수가 늘면 실패 (exit 1)
+
+
+def cursor(pk):
+    # ProductCursorPagination 의 pk 커서
+    return b64encode("p={}".format(pk).encode()).decode()
+
+
+def scenarios(size, options):
+    # 이름 -> 실행 번호를 받아 (method, url, data) 를 만드는 함수
+    middle = size // 2
+    list_url = reverse("product-list")
+    detail_url = reverse("product-detail", kwargs={"pk": middle})
+    product = {
+        "name": "새상품",
+        "option_set": [
+            {"name": "옵션{}".format(j), "price": j * 100} for j in range(options)
+        ],
+        "tag_set": [{"name": "태그0"}, {"name": "새태그"}],
+    }
+
+    def patch(index):
+        # 실행마다 가격을 바꿔 실제 UPDATE 가 발생하도록 변경
+        return (
+            "patch",
+            detail_url,
+            {
+                "pk": middle,
+                "name": "상품{}".format(middle - 1),
+                "option_set": [
+                    {"pk": pk, "name": name, "price": price + index + 1}
+                    for pk, name, price in ProductOption.objects.filter(
+                        product=middle
+                    ).values_list("pk", "name", "price")
+                ],
+                "tag_set": [],
+            },
+        )
+
+    return {
+        "list": lambda index: ("get", list_url, {"page_size": 100}),
+        "list_deep": lambda index: (
+            "get",
+            list_url,
+            {"page_size": 100, "cursor": cursor(max(0, size - 100))},
+        ),
+        "list_price": lambda index: (
+            "get",
+            list_url,
+            {"page_size": 100, "ordering": "min_price", "price_gte": 5000},
+        ),
+        "retrieve": lambda index: ("get", detail_url, None),
+        "create": lambda index: ("post", list_url, product),
+        "partial_update": patch,
+    }
+
+
+def run_request(client, scenario, index):
+    method, url, data = scenario(index)
+    if method == "get":
+        return lambda: client.get(url, data)
+    return lambda: getattr(client, method)(url, data, format="json")
+
+
+def measure(scenario, repeat):
+    client = APIClient()
+    walls, queries = [], []
+    for index in range(repeat):
+        request = run_request(client, scenario, index)
+        caches[settings.SHOP_RESPONSE_CACHE].clear()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = request()
+            walls.append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            raise RuntimeError(
+                "{} 응답: {}".format(response.status_code, response.data)
+            )
+        queries.append(len(captured))
+
+    # tracemalloc 은 실행 시간을 늘리므로 따로 한번 더 실행해 측정
+    request = run_request(client, scenario, repeat)
+    caches[settings.SHOP_RESPONSE_CACHE].clear()
+    tracemalloc.start()
+    request()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "wall_ms": round(statistics.median(walls) * 1000, 3),
+        "queries": max(queries),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def compare(results, baseline, threshold):
+    failures = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result["queries"] > base["queries"]:
+            failures.append(
+                "{}: 쿼리 {} -> {}".format(name, base["queries"], result["queries"])
+            )
+        for key in ("wall_ms", "peak_kb"):
+            if result[key] > base[key] * threshold:
+                failures.append(
+                    "{}: {} {} -> {} (x{:.2f})".format(
+                        name, key, base[key], result[key], result[key] / base[key]
+                    )
+                )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10000, 100000])
+    parser.add_argument("--options", type=int, default=3)
+    parser.add_argument("--tags", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    parser.add_argument("--baseline", help="비교할 (또는 저장할) baseline JSON 파일")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.5,
+        help="baseline 대비 허용 배수 (wall / peak)",
+    )
+    args = parser.parse_args()
+
+    results = {}
+    state = setup_database()
+    try:
+        created = 0
+        for size in sorted(args.sizes):
+            create_catalog(size, args.options, args.tags, offset=created)
+            created = size
+            for name, scenario in scenarios(size, args.options).items():
+                key = "{}@{}".format(name, size)
+                results[key] = measure(scenario, args.repeat)
+                print(
+                    "{:<24} {wall_ms:>10.3f}ms {queries:>4} queries "
+                    "{peak_kb:>10.1f}KB".format(key, **results[key])
+                )
+    finally:
+        teardown_database(state)
+
+    report = {
+        "options": args.options,
+        "tags": args.tags,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    elif args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        failures = compare(results, baseline["results"], args.threshold)
+        for failure in failures:
+            print(failure, file=sys.stderr)
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
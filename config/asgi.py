@@ -3,14 +3,178 @@ ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
-For more information on this file, see
-https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
+Django 2.2 has no ASGI handler, so the WSGI application runs in a bounded
+thread pool and responses are streamed from the event loop.
+
+    $ uvicorn config.asgi:application --workers 4
 """
 
+import asyncio
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
 
-from django.core.asgi import get_asgi_application
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+from django.db import close_old_connections
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
+
+class ThreadPoolASGIHandler:
+    # 요청 처리 (DB 조회 / 직렬화) 와 응답 chunk 생성만 스레드 풀에서 실행하고
+    # 느린 클라이언트로의 전송 / keep-alive 연결 유지는 이벤트 루프에서 처리
+    body_spool_size = 1024 * 1024
+
+    def __init__(self, wsgi_application, max_workers):
+        self.wsgi_application = wsgi_application
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="asgi"
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self.handle(scope, receive, send)
+        else:
+            raise ValueError(
+                "지원하지 않는 ASGI scope 입니다: {}".format(scope["type"])
+            )
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def read_body(self, receive):
+        body = SpooledTemporaryFile(max_size=self.body_spool_size)
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                body.close()
+                return None
+            body.write(message.get("body", b""))
+            if not message.get("more_body", False):
+                body.seek(0)
+                return body
+
+    def get_environ(self, scope, body):
+        server = scope.get("server") or ("localhost", 80)
+        client = scope.get("client") or ("", 0)
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin1"),
+            "PATH_INFO": scope["path"].encode("utf-8").decode("latin1"),
+            "QUERY_STRING": scope.get("query_string", b"").decode("latin1"),
+            "SERVER_NAME": server[0],
+            "SERVER_PORT": str(server[1]),
+            "SERVER_PROTOCOL": "HTTP/{}".format(scope.get("http_version", "1.1")),
+            "REMOTE_ADDR": client[0],
+            "REMOTE_PORT": str(client[1]),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": body,
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": True,
+            "wsgi.run_once": False,
+        }
+        for name, value in scope.get("headers", []):
+            name = name.decode("latin1").upper().replace("-", "_")
+            value = value.decode("latin1")
+            if name not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                name = "HTTP_" + name
+            if name in environ:
+                value = environ[name] + "," + value
+            environ[name] = value
+        # chunked 요청은 Content-Length 가 없으므로 읽은 본문 크기로 설정
+        if "CONTENT_LENGTH" not in environ:
+            body.seek(0, os.SEEK_END)
+            environ["CONTENT_LENGTH"] = str(body.tell())
+            body.seek(0)
+        return environ
+
+    def start_request(self, environ):
+        # 스레드 풀에서 실행 - 응답 상태 / 헤더와 chunk iterator 반환
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started["status"] = int(status.split(" ", 1)[0])
+            started["headers"] = [
+                (name.lower().encode("latin1"), value.encode("latin1"))
+                for name, value in headers
+            ]
+
+        response = self.wsgi_application(environ, start_response)
+        return started["status"], started["headers"], response, iter(response)
+
+    def run_in_thread(self, func, *args):
+        # 요청 처리 / chunk 생성 / 종료는 서로 다른 풀 스레드에서 실행될 수 있고
+        # request_finished 의 DB 연결 정리는 response.close 를 실행한 스레드에만 적용되므로
+        # 작업마다 실행한 스레드의 연결을 CONN_MAX_AGE 에 따라 정리
+        try:
+            return func(*args)
+        finally:
+            close_old_connections()
+
+    async def watch_disconnect(self, receive, disconnected):
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                disconnected.set()
+                return
+
+    async def handle(self, scope, receive, send):
+        body = await self.read_body(receive)
+        if body is None:
+            return
+
+        loop = asyncio.get_running_loop()
+        disconnected = asyncio.Event()
+        watcher = loop.create_task(self.watch_disconnect(receive, disconnected))
+        response = None
+        try:
+            status, headers, response, chunks = await loop.run_in_executor(
+                self.executor,
+                self.run_in_thread,
+                self.start_request,
+                self.get_environ(scope, body),
+            )
+            await send(
+                {"type": "http.response.start", "status": status, "headers": headers}
+            )
+            # chunk 마다 스레드를 반납하므로 내보내기 응답도 스레드를 점유하지 않음
+            while not disconnected.is_set():
+                chunk = await loop.run_in_executor(
+                    self.executor, self.run_in_thread, next, chunks, None
+                )
+                if chunk is None:
+                    break
+                if chunk:
+                    await send(
+                        {"type": "http.response.body", "body": chunk, "more_body": True}
+                    )
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            watcher.cancel()
+            if response is not None and hasattr(response, "close"):
+                # request_finished 시그널도 스레드 풀에서 실행
+                await loop.run_in_executor(
+                    self.executor, self.run_in_thread, response.close
+                )
+            body.close()
+
+
+def get_asgi_application():
+    wsgi_application = get_wsgi_application()
+    return ThreadPoolASGIHandler(wsgi_application, settings.SHOP_ASGI_THREADS)
+
+
 application = get_asgi_application()
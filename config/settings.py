@@ -53,6 +53,8 @@ INSTALLED_APPS = SYSTEM_APPS + CUSTOM_APPS + THIRD_PARTY_APPS
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "shop.middleware.MetricsMiddleware",
+    "shop.middleware.QueryBudgetMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -88,14 +90,66 @@ WSGI_APPLICATION = "config.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
+# SQLite 연결 프로파일 (SHOP_DB_PROFILE 환경 변수로 선택)
+# production: 요청간 연결 재사용 + 연결 생성시 PRAGMA 적용 (shop.signals.configure_sqlite)
+#   WAL 모드에서는 읽기가 쓰기를 기다리지 않고, synchronous=NORMAL 은 WAL 에서도 손상 없이
+#   commit 마다의 fsync 만 생략 (전원 장애시 마지막 트랜잭션만 유실 가능)
+SHOP_DB_PROFILES = {
+    "default": {
+        "CONN_MAX_AGE": 0,
+        "PRAGMAS": {},
+    },
+    "production": {
+        "CONN_MAX_AGE": 600,
+        "PRAGMAS": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "mmap_size": 256 * 1024 * 1024,
+            # 음수는 KiB 단위 (64MB)
+            "cache_size": -64 * 1024,
+            "busy_timeout": 5000,
+        },
+    },
+}
+SHOP_DB_PROFILE = os.environ.get("SHOP_DB_PROFILE", "default")
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": str(BASE_DIR / "db.sqlite3"),
+        "CONN_MAX_AGE": SHOP_DB_PROFILES[SHOP_DB_PROFILE]["CONN_MAX_AGE"],
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # 상품 조회 응답 캐시 (LRU / TTL), FileBasedCache 등으로 교체 가능
+    "shop": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "shop",
+        "TIMEOUT": 60,
+        "OPTIONS": {
+            "MAX_ENTRIES": 1000,
+        },
+    },
+    # 응답 캐시 무효화 버전, 워커 프로세스간 공유되어야 하므로 파일 기반
+    "shop_versions": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(BASE_DIR, ".cache", "shop_versions"),
+        "TIMEOUT": None,
+        "OPTIONS": {
+            "MAX_ENTRIES": 10000,
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -138,3 +192,75 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Shop
+
+# 상품 목록 페이지 크기, 클라이언트는 page_size 로 SHOP_MAX_PAGE_SIZE 까지 요청 가능
+SHOP_PAGE_SIZE = 20
+SHOP_MAX_PAGE_SIZE = 100
+
+# 프로세스별 태그명 -> pk 캐시 최대 개수
+SHOP_TAG_CACHE_SIZE = 10000
+
+# 태그 자동완성 인덱스 최대 태그 수 (상품 수가 많은 순) / 전체 재생성 주기 (초)
+SHOP_TAG_INDEX_SIZE = 50000
+SHOP_TAG_INDEX_TTL = 300
+SHOP_TAG_AUTOCOMPLETE_LIMIT = 10
+
+# 상품 일괄 추가시 한 트랜잭션에서 저장할 최대 상품 수
+SHOP_BULK_CHUNK_SIZE = 500
+
+# 상품 일괄 변경 / 삭제 (한 트랜잭션) 요청당 최대 상품 수
+SHOP_BULK_UPDATE_LIMIT = 500
+
+# 상품 전체 내보내기시 한번에 조회하는 상품 수
+SHOP_EXPORT_CHUNK_SIZE = 1000
+
+# 변경 피드 (/shop/products/changes/) 요청당 최대 변경 수와
+# compact_change_log 에서 보관하는 변경 로그 기간 (일)
+SHOP_CHANGE_FEED_LIMIT = 1000
+SHOP_CHANGE_LOG_RETENTION_DAYS = 30
+
+# build_snapshot 으로 생성하는 전체 상품 스냅샷 (/shop/products/snapshot/) 위치,
+# pk 범위 chunk 크기 (chunk 단위로 변경 확인 / 압축), 전송 블록 크기
+SHOP_SNAPSHOT_DIR = os.path.join(BASE_DIR, ".cache", "snapshot")
+SHOP_SNAPSHOT_CHUNK_SIZE = 1000
+SHOP_SNAPSHOT_BLOCK_SIZE = 64 * 1024
+
+# 상품 목록 / 상세 조회를 모델 인스턴스 대신 values() 조회로 직렬화
+SHOP_FAST_READ = True
+
+# ASGI (config.asgi) 에서 요청을 처리하는 스레드 수, DB 동시 접근 수의 상한
+SHOP_ASGI_THREADS = 8
+
+# 상품 변경 후 파생 데이터 (가격 요약 / 태그 요약 / 검색 / 변경 로그) 를 한번에 갱신하는 상품 수
+# pk 를 IN 조건의 변수로 전달하므로 SQLite 변수 수 제한 (이전 버전 기본값 999) 보다 작게 유지
+# 요청으로 받는 pk 리스트 (가격 일괄 변경 조건, ?product__in=) 의 최대 개수로도 사용
+SHOP_SYNC_CHUNK_SIZE = 500
+
+# 한번에 변경된 상품이 이보다 많으면 상품별 대신 전체 상품 상세 응답 캐시를 무효화
+SHOP_INVALIDATE_PRODUCT_LIMIT = 100
+
+# view_name 별 요청당 최대 쿼리 수 (ViewSet 의 query_budgets 보다 우선)
+# 초과시 경고 로그, SHOP_QUERY_BUDGET_STRICT 이면 QueryBudgetExceeded (테스트)
+# 값이 {method: 예산} 이면 해당 method 만 확인
+SHOP_QUERY_BUDGETS = {
+    # 세션 / 사용자 2 개 + 전체 수 추정 2 개 + 목록 + prefetch (태그, 옵션)
+    "admin:shop_product_changelist": {"GET": 7},
+    "admin:shop_productoption_changelist": {"GET": 5},
+}
+SHOP_QUERY_BUDGET_STRICT = False
+
+# 프로세스별 지표 파일 디렉토리 (배포 / 재시작시 비워야 함)
+SHOP_METRICS_DIR = os.path.join(BASE_DIR, ".cache", "metrics")
+# /shop/internal/metrics/ 는 `Authorization: Bearer <SHOP_METRICS_TOKEN>` 요청에만 응답
+# 토큰이 없으면 (기본값) 비활성화 - 리버스 프록시 뒤에서는 REMOTE_ADDR 로 내부 요청을 구분할 수 없음
+SHOP_METRICS_TOKEN = os.environ.get("SHOP_METRICS_TOKEN", "")
+
+# admin 목록에서 필터가 없을 때 이보다 많은 상품 / 옵션은 COUNT(*) 대신 최대 pk 로 추정
+SHOP_ADMIN_EXACT_COUNT_LIMIT = 10000
+
+# 상품 조회 응답 캐시 / 무효화 버전 캐시 alias
+SHOP_RESPONSE_CACHE = "shop"
+SHOP_VERSION_CACHE = "shop_versions"
@@ -1,5 +1,9 @@
 from django.contrib import admin
+from django.db.models import Count
 from .models import Tag, Product, ProductOption
+from .pagination import EstimatedCountPaginator
+from .facets import refresh_tag_facets
+from .sync import products_changed, products_deleted
 
 
 @admin.register(Tag)
@@ -15,9 +19,47 @@ class ProductAdmin(admin.ModelAdmin):
     list_display = (
         "pk",
         "name",
+        "tag_count",
+        "option_count",
         "tag_set_list",
         "option_list",
     )
+    # 페이지 크기와 관계없이 목록 조회 쿼리 수 고정 (태그 / 옵션 prefetch, 전체 수 추정)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .prefetch_related("tag_set", "option_set")
+            .annotate(tag_count=Count("tag_set"))
+        )
+
+    def tag_count(self, obj):
+        return obj.tag_count
+
+    tag_count.short_description = "태그 수"
+    tag_count.admin_order_field = "tag_count"
+
+    # 태그 (m2m) 까지 저장된 후 파생 데이터 갱신
+    def save_related(self, request, form, formsets, change):
+        product = form.instance
+        before = set(product.tag_set.values_list("pk", flat=True)) if change else set()
+        super().save_related(request, form, formsets, change)
+        products_changed([product.pk], created=not change)
+        # 연결이 삭제된 태그는 products_changed 에서 갱신되지 않으므로 따로 갱신
+        removed = before.difference(product.tag_set.values_list("pk", flat=True))
+        if removed:
+            refresh_tag_facets(removed)
+
+    def delete_model(self, request, obj):
+        products_deleted([obj.pk])
+        super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        products_deleted(list(queryset.values_list("pk", flat=True)))
+        super().delete_queryset(request, queryset)
 
 
 @admin.register(ProductOption)
@@ -28,3 +70,24 @@ class ProductOptionAdmin(admin.ModelAdmin):
         "name",
         "price",
     )
+    list_select_related = ("product",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        pks = {obj.product_id}
+        # 다른 상품으로 옮긴 경우 이전 상품도 갱신
+        if change and "product" in form.changed_data:
+            pks.add(form.initial["product"])
+        products_changed(pks)
+
+    def delete_model(self, request, obj):
+        product_pk = obj.product_id
+        super().delete_model(request, obj)
+        products_changed([product_pk])
+
+    def delete_queryset(self, request, queryset):
+        pks = set(queryset.values_list("product", flat=True))
+        super().delete_queryset(request, queryset)
+        products_changed(pks)
@@ -0,0 +1,198 @@
+from django.db import connections, transaction, DatabaseError
+from django.db.models import Max
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import CharField
+from .models import Product, ProductOption
+from .sync import products_changed, products_deleted
+from .tags import parse_tag_payload, resolve_tag_lists, tag_index
+
+__all__ = (
+    "assign_pks",
+    "validate_product_payload",
+    "insert_products",
+    "bulk_create_products",
+    "bulk_delete_products",
+)
+
+product_name_field = CharField(max_length=100)
+
+
+def assign_pks(model, objs, using="default"):
+    # SQLite 등 bulk_create 후 pk 를 돌려주지 않는 DB 는 pk 를 미리 할당
+    connection = connections[using]
+    if not objs or connection.features.can_return_ids_from_bulk_insert:
+        return
+
+    last = model.objects.using(using).aggregate(last=Max("pk"))["last"] or 0
+    if connection.vendor == "sqlite":
+        # AUTOINCREMENT 로 삭제된 pk 가 재사용되지 않도록 sqlite_sequence 확인
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = %s",
+                [model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] > last:
+            last = row[0]
+
+    for pk, obj in enumerate(objs, start=last + 1):
+        obj.pk = pk
+
+
+def validate_product_payload(data):
+    if not isinstance(data, dict):
+        raise ValidationError("잘못된 데이터입니다.")
+
+    if "option_set" not in data or "tag_set" not in data or "name" not in data:
+        raise ValidationError("잘못된 데이터입니다.")
+
+    name = product_name_field.run_validation(data["name"])
+
+    options = []
+    for option in data["option_set"]:
+        if (
+            not isinstance(option, dict)
+            or "name" not in option
+            or "price" not in option
+        ):
+            raise ValidationError("옵션명과 가격은 필수 입력 값입니다.")
+        try:
+            price = int(option["price"])
+        except (TypeError, ValueError):
+            raise ValidationError("가격은 숫자로 입력해야 합니다.")
+        options.append((option["name"], price))
+
+    tags = parse_tag_payload(data["tag_set"])
+    return name, options, tags
+
+
+def insert_products(items, tag_pks=None):
+    # items: validate_product_payload 결과 리스트, tag_pks: 태그명 -> pk (갱신됨)
+    if tag_pks is None:
+        tag_pks = {}
+
+    products = []
+    for name, options, _ in items:
+        prices = [price for _, price in options]
+        products.append(
+            Product(
+                name=name,
+                min_price=min(prices, default=None),
+                max_price=max(prices, default=None),
+                option_count=len(prices),
+            )
+        )
+    assign_pks(Product, products)
+    Product.objects.bulk_create(products)
+
+    ProductOption.objects.bulk_create(
+        [
+            ProductOption(product=product, name=option_name, price=price)
+            for product, (_, options, _) in zip(products, items)
+            for option_name, price in options
+        ]
+    )
+
+    through = Product.tag_set.through
+    link_lists = resolve_tag_lists([tags for _, _, tags in items], tag_pks)
+    through.objects.bulk_create(
+        [
+            through(product_id=product.pk, tag_id=tag_pk)
+            for product, product_tag_pks in zip(products, link_lists)
+            for tag_pk in product_tag_pks
+        ]
+    )
+    tag_index.add_links(tag_pks, link_lists)
+    return products
+
+
+def bulk_create_products(data, chunk_size):
+    results = [None] * len(data)
+    valid = []
+    for index, item in enumerate(data):
+        try:
+            valid.append((index, validate_product_payload(item)))
+        except ValidationError as e:
+            results[index] = {
+                "index": index,
+                "status": status.HTTP_400_BAD_REQUEST,
+                "errors": e.detail,
+            }
+
+    created = []
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start : start + chunk_size]
+        try:
+            with transaction.atomic():
+                products = insert_products([item for _, item in chunk])
+                products_changed(
+                    [product.pk for product in products], prices=False, created=True
+                )
+        except DatabaseError:
+            for index, _ in chunk:
+                results[index] = {
+                    "index": index,
+                    "status": status.HTTP_409_CONFLICT,
+                    "errors": ["상품을 저장하지 못했습니다. 다시 시도해주세요."],
+                }
+            continue
+
+        for (index, _), product in zip(chunk, products):
+            results[index] = {
+                "index": index,
+                "status": status.HTTP_201_CREATED,
+                "pk": product.pk,
+            }
+        created += products
+
+    return results, created
+
+
+def bulk_delete_products(data):
+    # 상품 pk 리스트를 한 트랜잭션에서 삭제 (옵션 / 태그 연결도 product_id IN 으로 함께 삭제)
+    # 반환값: (상품별 결과, 삭제된 상품 pk 집합)
+    results = [None] * len(data)
+    valid = {}
+    for index, pk in enumerate(data):
+        if not isinstance(pk, int) or isinstance(pk, bool) or pk in valid:
+            results[index] = {
+                "index": index,
+                "status": status.HTTP_400_BAD_REQUEST,
+                "errors": ["잘못된 데이터입니다."],
+            }
+            continue
+        valid[pk] = index
+
+    try:
+        with transaction.atomic():
+            deleted = set(
+                Product.objects.filter(pk__in=list(valid)).values_list("pk", flat=True)
+            )
+            products_deleted(deleted)
+            Product.objects.filter(pk__in=deleted).delete()
+    except DatabaseError:
+        for pk, index in valid.items():
+            results[index] = {
+                "index": index,
+                "status": status.HTTP_409_CONFLICT,
+                "pk": pk,
+                "errors": ["상품을 삭제하지 못했습니다. 다시 시도해주세요."],
+            }
+        return results, set()
+
+    for pk, index in valid.items():
+        if pk in deleted:
+            results[index] = {
+                "index": index,
+                "status": status.HTTP_204_NO_CONTENT,
+                "pk": pk,
+            }
+        else:
+            results[index] = {
+                "index": index,
+                "status": status.HTTP_404_NOT_FOUND,
+                "pk": pk,
+                "errors": ["존재하지 않는 상품입니다."],
+            }
+    return results, deleted
@@ -0,0 +1,180 @@
+import hashlib
+import time
+from functools import wraps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag, urlencode
+from rest_framework.response import Response
+from .models import CatalogState
+
+__all__ = (
+    "current_versions",
+    "bump_versions",
+    "cache_response",
+    "conditional_response",
+    "invalidate_products",
+    "invalidate_tags",
+)
+
+LIST_VERSION_KEY = "shop:version:list"
+PRODUCT_VERSION_KEY = "shop:version:product:{}"
+ALL_PRODUCTS_VERSION_KEY = "shop:version:product"
+TAG_VERSION_KEY = "shop:version:tag"
+
+
+def _new_version():
+    return time.time_ns()
+
+
+def current_versions(keys):
+    # 버전은 워커 프로세스간 공유되는 캐시에 저장 - 키가 없으면 새 버전으로 시작
+    version_cache = caches[settings.SHOP_VERSION_CACHE]
+    versions = version_cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            version_cache.add(key, _new_version())
+            versions[key] = version_cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def _url_hash(request):
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    url = "{}://{}{}?{}".format(request.scheme, request.get_host(), request.path, query)
+    return hashlib.md5(url.encode()).hexdigest()
+
+
+def _response_key(request, version_keys):
+    return "shop:response:{}:{}".format(
+        ":".join(str(version) for version in current_versions(version_keys)),
+        _url_hash(request),
+    )
+
+
+VALIDATOR_HEADERS = ("ETag", "Last-Modified")
+
+
+def _not_modified(request, response):
+    # If-None-Match 가 ETag 와 일치하면 304, 삭제는 수정 시각에 반영되지 않으므로
+    # If-Modified-Since 는 확인하지 않음
+    if not response.has_header("ETag"):
+        return None
+    not_modified = get_conditional_response(request, etag=response["ETag"])
+    if not_modified is not None:
+        for header in VALIDATOR_HEADERS:
+            if response.has_header(header):
+                not_modified[header] = response[header]
+    return not_modified
+
+
+def _catalog_state(view, kwargs):
+    # 상세는 상품 한 행의 version / updated_at, 목록 / 검색은 상품 테이블을 집계하지 않고
+    # 쓰기마다 갱신되는 CatalogState 한 행으로 계산 (페이지 깊이 / 상품 수와 무관한 비용)
+    pk = kwargs.get("pk")
+    if pk is not None:
+        state = (
+            view.filter_queryset(view.get_queryset())
+            .prefetch_related(None)
+            .filter(pk=pk)
+            .values("version", "updated_at")
+            .first()
+        )
+        if state is not None:
+            state["count"] = 1
+        return state
+
+    state = CatalogState.objects.current()
+    if state is not None:
+        state["count"] = state.pop("product_count")
+    return state
+
+
+def conditional_response(func):
+    # list / retrieve 의 ETag (버전 + 상품 수) / Last-Modified (수정 시각) 를
+    # 한 행 조회로 계산하고, 일치하면 직렬화 없이 304 응답
+    @wraps(func)
+    def wrapper(view, request, *args, **kwargs):
+        state = _catalog_state(view, kwargs)
+        if state is None:
+            return func(view, request, *args, **kwargs)
+
+        validators = Response()
+        validators["ETag"] = quote_etag(
+            "{}-{}-{}".format(_url_hash(request), state["version"], state["count"])
+        )
+        if state["updated_at"] is not None:
+            validators["Last-Modified"] = http_date(state["updated_at"].timestamp())
+
+        response = _not_modified(request, validators)
+        if response is None:
+            response = func(view, request, *args, **kwargs)
+            if response.status_code == 200:
+                for header in VALIDATOR_HEADERS:
+                    if validators.has_header(header):
+                        response[header] = validators[header]
+        return response
+
+    return wrapper
+
+
+def cache_response(func):
+    # list / retrieve 응답 캐시, 캐시 히트 시 SQL 을 실행하지 않음
+    @wraps(func)
+    def wrapper(view, request, *args, **kwargs):
+        pk = kwargs.get("pk")
+        if pk is None:
+            version_keys = [LIST_VERSION_KEY, TAG_VERSION_KEY]
+        else:
+            version_keys = [
+                PRODUCT_VERSION_KEY.format(pk),
+                ALL_PRODUCTS_VERSION_KEY,
+                TAG_VERSION_KEY,
+            ]
+        response_cache = caches[settings.SHOP_RESPONSE_CACHE]
+        key = _response_key(request, version_keys)
+
+        cached = response_cache.get(key)
+        if cached is not None:
+            data, headers = cached
+            response = Response(data, headers=headers)
+            return _not_modified(request, response) or response
+
+        response = func(view, request, *args, **kwargs)
+        if response.status_code == 200:
+            headers = {
+                header: response[header]
+                for header in VALIDATOR_HEADERS
+                if response.has_header(header)
+            }
+            response_cache.set(key, (response.data, headers))
+        return response
+
+    return wrapper
+
+
+def bump_versions(keys):
+    def bump():
+        caches[settings.SHOP_VERSION_CACHE].set_many(
+            {key: _new_version() for key in keys}
+        )
+
+    # 커밋 전 다른 요청이 이전 데이터를 새 버전으로 캐시할 수 있으므로 커밋 후 한번 더 갱신
+    bump()
+    transaction.on_commit(bump)
+
+
+def invalidate_products(pks):
+    pks = list(pks)
+    if len(pks) > settings.SHOP_INVALIDATE_PRODUCT_LIMIT:
+        # 일괄 변경은 상품별 버전 키 대신 전체 상품 상세 버전을 한번에 갱신
+        bump_versions([LIST_VERSION_KEY, ALL_PRODUCTS_VERSION_KEY])
+    else:
+        bump_versions(
+            [LIST_VERSION_KEY] + [PRODUCT_VERSION_KEY.format(pk) for pk in pks]
+        )
+
+
+def invalidate_tags():
+    # 태그명 변경 / 삭제는 모든 상품 응답에 영향
+    bump_versions([TAG_VERSION_KEY])
@@ -0,0 +1,96 @@
+from django.db.models import Max
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from .models import Product, ProductChange, ChangeLogCompaction
+from .projection import RELATION_FIELDS, serialize_product_rows
+from .serializers import ProductSerializer
+
+__all__ = (
+    "CursorExpired",
+    "log_changes",
+    "latest_cursor",
+    "change_feed",
+    "compact_changes",
+)
+
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "정리된 변경 기록입니다. 전체 상품을 다시 조회해주세요."
+    default_code = "cursor_expired"
+
+
+def log_changes(pks, deleted=False):
+    # 쓰기와 같은 트랜잭션에서 호출 - SQLite 는 쓰기 트랜잭션이 하나씩 실행되므로
+    # 커서 (pk) 는 커밋 순서대로 증가
+    pks = list(pks)
+    if pks:
+        ProductChange.objects.bulk_create(
+            [ProductChange(product_pk=pk, deleted=deleted) for pk in pks]
+        )
+
+
+def _compacted_through():
+    return (
+        ChangeLogCompaction.objects.aggregate(cursor=Max("compacted_through"))["cursor"]
+        or 0
+    )
+
+
+def latest_cursor():
+    # 모든 변경이 정리된 경우에도 정리된 커서 이후부터 받을 수 있도록 함
+    cursor = ProductChange.objects.aggregate(cursor=Max("pk"))["cursor"] or 0
+    return max(cursor, _compacted_through())
+
+
+def change_feed(since, limit):
+    # since 이후 최대 limit 개의 변경을 상품별 마지막 상태 (변경 / 삭제) 로 묶어 반환
+    # 반환값: (다음 커서, 남은 변경 여부, 변경된 상품 리스트, 삭제된 상품 pk 리스트)
+    if since < _compacted_through():
+        raise CursorExpired
+
+    changes = list(
+        ProductChange.objects.filter(pk__gt=since)
+        .order_by("pk")
+        .values_list("pk", "product_pk", "deleted")[: limit + 1]
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    if not changes:
+        return since, False, [], []
+
+    last = {}
+    for _, product_pk, deleted in changes:
+        last[product_pk] = deleted
+    changed = sorted(pk for pk, deleted in last.items() if not deleted)
+
+    # 이후 삭제된 상품은 다음 변경에 삭제로 다시 기록되므로 여기서도 삭제로 응답
+    fields = [
+        name for name in ProductSerializer.Meta.fields if name not in RELATION_FIELDS
+    ]
+    rows = list(Product.objects.filter(pk__in=changed).order_by("pk").values(*fields))
+    products = serialize_product_rows(rows) if rows else []
+    found = {row["pk"] for row in rows}
+    deleted = sorted(pk for pk in last if pk not in found)
+    return changes[-1][0], has_more, products, deleted
+
+
+def compact_changes(before):
+    # 1. 같은 상품의 이전 변경은 마지막 변경만 남김 (모든 커서에서 결과 동일)
+    # 2. before 이전의 변경은 삭제하고, 삭제된 마지막 커서 이하는 CursorExpired 로 응답
+    # 반환값: (1 에서 삭제된 수, 2 에서 삭제된 수)
+    latest = (
+        ProductChange.objects.order_by()
+        .values("product_pk")
+        .annotate(last=Max("pk"))
+        .values("last")
+    )
+    superseded, _ = ProductChange.objects.exclude(pk__in=latest).delete()
+
+    expired = ProductChange.objects.filter(created_at__lt=before)
+    through = expired.aggregate(cursor=Max("pk"))["cursor"]
+    if through is None:
+        return superseded, 0
+    removed, _ = ProductChange.objects.filter(pk__lte=through).delete()
+    ChangeLogCompaction.objects.create(compacted_through=through)
+    return superseded, removed
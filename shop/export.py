@@ -0,0 +1,79 @@
+import csv
+import json
+from django.db.models import Prefetch
+from .models import Product, Tag, ProductOption
+
+__all__ = (
+    "EXPORT_FORMATS",
+    "iter_product_chunks",
+)
+
+CSV_HEADER = ("kind", "pk", "product", "name", "price")
+
+
+def iter_product_chunks(chunk_size):
+    # pk 기준으로 chunk_size 만큼씩 조회, chunk 마다 옵션 / 태그를 prefetch
+    last_pk = 0
+    while True:
+        products = list(
+            Product.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .prefetch_related(
+                Prefetch("option_set", queryset=ProductOption.objects.order_by("pk")),
+                Prefetch("tag_set", queryset=Tag.objects.order_by("pk")),
+            )[:chunk_size]
+        )
+        if not products:
+            return
+        yield products
+        last_pk = products[-1].pk
+
+
+def product_to_dict(product):
+    return {
+        "pk": product.pk,
+        "name": product.name,
+        "option_set": [
+            {"pk": option.pk, "name": option.name, "price": option.price}
+            for option in product.option_set.all()
+        ],
+        "tag_set": [{"pk": tag.pk, "name": tag.name} for tag in product.tag_set.all()],
+    }
+
+
+def iter_ndjson(chunk_size):
+    for products in iter_product_chunks(chunk_size):
+        yield "".join(
+            json.dumps(product_to_dict(product), ensure_ascii=False) + "\n"
+            for product in products
+        )
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def iter_csv(chunk_size):
+    # 상품 / 옵션 / 태그를 kind 컬럼으로 구분한 행으로 출력
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    for products in iter_product_chunks(chunk_size):
+        rows = []
+        for product in products:
+            rows.append(writer.writerow(("product", product.pk, "", product.name, "")))
+            for option in product.option_set.all():
+                rows.append(
+                    writer.writerow(
+                        ("option", option.pk, product.pk, option.name, option.price)
+                    )
+                )
+            for tag in product.tag_set.all():
+                rows.append(writer.writerow(("tag", tag.pk, product.pk, tag.name, "")))
+        yield "".join(rows)
+
+
+EXPORT_FORMATS = {
+    "ndjson": (iter_ndjson, "application/x-ndjson; charset=utf-8"),
+    "csv": (iter_csv, "text/csv; charset=utf-8"),
+}
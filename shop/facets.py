@@ -0,0 +1,66 @@
+from django.db import connection
+from django.db.models import Count, IntegerField, Max, Min, Value
+from .models import Product, Tag, TagFacet
+
+__all__ = (
+    "product_tags",
+    "refresh_tag_facets",
+    "rebuild_tag_facets",
+)
+
+
+def product_tags(pks):
+    # 상품에 연결된 태그 pk 서브쿼리
+    return (
+        Product.tag_set.through.objects.filter(product__in=list(pks))
+        .order_by()
+        .values("tag")
+    )
+
+
+def _create_missing(tags):
+    # 요약이 없는 태그의 빈 요약 행을 INSERT ... SELECT 한번으로 추가
+    query, params = (
+        Tag.objects.filter(pk__in=tags, facet__isnull=True)
+        .order_by()
+        .annotate(zero=Value(0, output_field=IntegerField()))
+        .values("pk", "zero")
+        .query.sql_with_params()
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO {} ({}, {}) {}".format(
+                TagFacet._meta.db_table,
+                TagFacet._meta.pk.column,
+                TagFacet._meta.get_field("product_count").column,
+                query,
+            ),
+            params,
+        )
+
+
+def refresh_tag_facets(tags, exclude_products=()):
+    # tags: 태그 pk 리스트 또는 서브쿼리, 변경된 태그의 요약만 다시 계산
+    # exclude_products 가 없으면 (상품 추가 / 변경) 새로 연결된 태그의 요약 행을 추가
+    if not exclude_products:
+        _create_missing(tags)
+    TagFacet.objects.filter(tag__in=tags).refresh(exclude_products)
+
+
+def rebuild_tag_facets(batch_size=1000):
+    # 전체 태그 요약을 다시 생성 (누락 / 불일치 복구)
+    rows = (
+        Product.tag_set.through.objects.order_by()
+        .values("tag")
+        .annotate(
+            product_count=Count("pk"),
+            min_price=Min("product__min_price"),
+            max_price=Max("product__max_price"),
+        )
+    )
+    TagFacet.objects.all().delete()
+    facets = TagFacet.objects.bulk_create(
+        [TagFacet(tag_id=row.pop("tag"), **row) for row in rows.iterator()],
+        batch_size=batch_size,
+    )
+    return len(facets)
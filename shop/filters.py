@@ -0,0 +1,61 @@
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+__all__ = (
+    "PriceRangeFilter",
+    "ProductInFilter",
+    "ProductOrderingFilter",
+)
+
+PRICE_FIELDS = ("min_price", "max_price")
+
+
+class PriceRangeFilter(BaseFilterBackend):
+    # 기본값 - price_lte: 해당 가격 이하의 옵션이 있는 상품, price_gte: 이상의 옵션이 있는 상품
+    lookups = {
+        "price_lte": "min_price__lte",
+        "price_gte": "max_price__gte",
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        lookups = getattr(view, "price_range_lookups", self.lookups)
+        for param, lookup in lookups.items():
+            value = request.query_params.get(param)
+            if value is None:
+                continue
+            try:
+                value = int(value)
+            except ValueError:
+                raise ValidationError("가격은 숫자로 입력해야 합니다.")
+            queryset = queryset.filter(**{lookup: value})
+        return queryset
+
+
+class ProductInFilter(BaseFilterBackend):
+    # product__in=1,2,3 - 여러 상품의 옵션을 한번에 조회
+    # pk 가 IN 조건의 변수로 전달되므로 가격 / 커서 조건 변수와 합쳐도 SQLite 변수 수 제한을
+    # 넘지 않도록 SHOP_SYNC_CHUNK_SIZE 개까지만 허용
+    def filter_queryset(self, request, queryset, view):
+        value = request.query_params.get("product__in")
+        if value is None:
+            return queryset
+        try:
+            pks = [int(pk) for pk in value.split(",") if pk]
+        except ValueError:
+            raise ValidationError("상품 pk 는 숫자로 입력해야 합니다.")
+        limit = settings.SHOP_SYNC_CHUNK_SIZE
+        if len(pks) > limit:
+            raise ValidationError(
+                "상품은 최대 {} 개까지 조회할 수 있습니다.".format(limit)
+            )
+        return queryset.filter(product__in=pks)
+
+
+class ProductOrderingFilter(OrderingFilter):
+    # 가격 정렬시 옵션이 없는 (가격이 없는) 상품은 제외
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if ordering and any(field.lstrip("-") in PRICE_FIELDS for field in ordering):
+            queryset = queryset.filter(min_price__isnull=False)
+        return super().filter_queryset(request, queryset, view)
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from shop.snapshot import build_snapshot
+
+
+class Command(BaseCommand):
+    help = "전체 상품 스냅샷 (gzip NDJSON) 에서 변경된 chunk 만 다시 생성합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size", type=int, default=settings.SHOP_SNAPSHOT_CHUNK_SIZE
+        )
+        parser.add_argument("--force", action="store_true")
+
+    def handle(self, *args, **options):
+        manifest, rebuilt = build_snapshot(options["chunk_size"], options["force"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                "상품 {} 개, chunk {} 개 갱신 완료 ({})".format(
+                    manifest["products"], rebuilt, manifest["file"]
+                )
+            )
+        )
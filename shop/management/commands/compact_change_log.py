@@ -0,0 +1,25 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from shop.changes import compact_changes
+
+
+class Command(BaseCommand):
+    help = "상품 변경 로그에서 중복된 변경과 보관 기간이 지난 변경을 정리합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=settings.SHOP_CHANGE_LOG_RETENTION_DAYS
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options["days"])
+        with transaction.atomic():
+            superseded, expired = compact_changes(before)
+        self.stdout.write(
+            self.style.SUCCESS(
+                "중복 {} 개, 만료 {} 개 정리 완료".format(superseded, expired)
+            )
+        )
@@ -0,0 +1,206 @@
+import csv
+import json
+import os
+import time
+from collections import deque
+from multiprocessing import Pool
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction, DatabaseError
+from rest_framework.exceptions import ValidationError
+from shop.bulk import validate_product_payload, insert_products
+from shop.models import ImportProgress
+from shop.sync import products_changed
+from shop.export import CSV_HEADER
+
+
+def _read_blocks(path, file_format, chunk_size):
+    # chunk_size 개의 상품 단위로 (시작 줄 번호, 줄 리스트) 를 생성
+    with open(path, encoding="utf-8", newline="") as f:
+        if file_format == "csv":
+            next(f, None)
+
+        block, count, start = [], 0, 2 if file_format == "csv" else 1
+        for line_no, line in enumerate(f, start=start):
+            if not line.strip():
+                continue
+            starts_product = file_format == "jsonl" or line.startswith("product,")
+            if starts_product:
+                if count == chunk_size:
+                    yield block
+                    block, count = [], 0
+                count += 1
+            block.append((line_no, line))
+        if block:
+            yield block
+
+
+def _csv_payloads(lines):
+    payload = None
+    for line_no, row in zip(
+        (line_no for line_no, _ in lines), csv.reader(line for _, line in lines)
+    ):
+        row += [""] * (len(CSV_HEADER) - len(row))
+        kind = row[0]
+        if kind == "product":
+            if payload is not None:
+                yield payload
+            payload = (line_no, {"name": row[3], "option_set": [], "tag_set": []})
+        elif payload is None:
+            raise ValueError(
+                "{}: 상품 행 이전에 옵션 / 태그 행이 있습니다.".format(line_no)
+            )
+        elif kind == "option":
+            payload[1]["option_set"].append({"name": row[3], "price": row[4]})
+        elif kind == "tag":
+            payload[1]["tag_set"].append({"name": row[3]})
+    if payload is not None:
+        yield payload
+
+
+def _jsonl_payloads(lines):
+    for line_no, line in lines:
+        try:
+            data = json.loads(line)
+        except ValueError:
+            data = None
+        # 내보낸 파일의 pk 는 다른 DB 의 값이므로 태그는 이름으로만 연결
+        if isinstance(data, dict) and isinstance(data.get("tag_set"), list):
+            data["tag_set"] = [
+                (
+                    {"name": tag["name"]}
+                    if isinstance(tag, dict) and "name" in tag
+                    else tag
+                )
+                for tag in data["tag_set"]
+            ]
+        yield line_no, data
+
+
+def parse_block(args):
+    file_format, lines = args
+    items, errors = [], []
+    if file_format == "csv":
+        payloads = _csv_payloads(lines)
+    else:
+        payloads = _jsonl_payloads(lines)
+
+    try:
+        for line_no, payload in payloads:
+            try:
+                items.append(validate_product_payload(payload))
+            except ValidationError as e:
+                errors.append("{}: {}".format(line_no, " ".join(map(str, e.detail))))
+    except ValueError as e:
+        errors.append(str(e))
+    return items, errors
+
+
+def _parse_blocks(pool, blocks, window):
+    # 파일 전체가 메모리에 쌓이지 않도록 window 개의 block 만 미리 파싱
+    pending = deque()
+    for block in blocks:
+        pending.append(pool.apply_async(parse_block, (block,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+class Command(BaseCommand):
+    help = "CSV / JSONL 파일의 상품, 옵션, 태그를 일괄 저장합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=["csv", "jsonl"])
+        parser.add_argument(
+            "--chunk-size", type=int, default=settings.SHOP_BULK_CHUNK_SIZE
+        )
+        parser.add_argument("--workers", type=int, default=os.cpu_count())
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="마지막으로 저장된 chunk 이후부터 다시 저장",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        chunk_size = options["chunk_size"]
+        file_format = options["format"] or ("csv" if path.endswith(".csv") else "jsonl")
+        if not os.path.exists(path):
+            raise CommandError("파일이 존재하지 않습니다: {}".format(path))
+        if chunk_size < 1:
+            raise CommandError("chunk-size 는 1 이상이어야 합니다.")
+
+        # 진행 상황은 chunk 저장과 같은 트랜잭션에서 DB 에 기록
+        # (커밋 후 파일에 기록하면 그 사이에 종료된 chunk 가 --resume 시 중복 저장됨)
+        progress_key = os.path.abspath(path)
+        done = -1
+        if options["resume"]:
+            progress = ImportProgress.objects.filter(path=progress_key).first()
+            if progress is not None:
+                if progress.chunk_size != chunk_size:
+                    raise CommandError(
+                        "이전 실행과 같은 chunk-size ({}) 를 사용해야 합니다.".format(
+                            progress.chunk_size
+                        )
+                    )
+                done = progress.chunk
+                self.stdout.write("chunk {} 이후부터 다시 저장합니다.".format(done))
+
+        # 이미 저장된 chunk 는 파싱하지 않음
+        blocks = (
+            (file_format, block if index > done else [])
+            for index, block in enumerate(_read_blocks(path, file_format, chunk_size))
+        )
+
+        tag_pks = {}
+        total = errors = 0
+        started = time.monotonic()
+        workers = max(1, options["workers"])
+        with Pool(workers, initializer=django.setup) as pool:
+            for index, (items, block_errors) in enumerate(
+                _parse_blocks(pool, blocks, workers * 2)
+            ):
+                if index <= done:
+                    continue
+                for error in block_errors:
+                    self.stderr.write(error)
+                errors += len(block_errors)
+
+                try:
+                    with transaction.atomic():
+                        products = insert_products(items, tag_pks)
+                        products_changed(
+                            [product.pk for product in products],
+                            prices=False,
+                            created=True,
+                        )
+                        ImportProgress.objects.update_or_create(
+                            path=progress_key,
+                            defaults={"chunk_size": chunk_size, "chunk": index},
+                        )
+                except DatabaseError as e:
+                    raise CommandError(
+                        "chunk {} 저장 실패 ({}), --resume 으로 다시 실행하세요.".format(
+                            index, e
+                        )
+                    )
+
+                total += len(items)
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    "chunk {}: {} 개 저장 (누적 {} 개, {:.0f} 개/초)".format(
+                        index, len(items), total, total / elapsed if elapsed else 0
+                    )
+                )
+
+        ImportProgress.objects.filter(path=progress_key).delete()
+        self.stdout.write(
+            self.style.SUCCESS(
+                "상품 {} 개 저장 완료, 오류 {} 건 ({:.1f} 초)".format(
+                    total, errors, time.monotonic() - started
+                )
+            )
+        )
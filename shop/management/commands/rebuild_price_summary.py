@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from shop.models import Product
+from shop.sync import products_changed
+
+
+class Command(BaseCommand):
+    help = "상품별 옵션 가격 요약 (최저가 / 최고가 / 옵션 수) 을 다시 계산합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last = Product.objects.aggregate(last=Max("pk"))["last"] or 0
+
+        updated = 0
+        # 쓰기 잠금이 길어지지 않도록 pk 구간별로 나누어 갱신
+        for start in range(0, last, batch_size):
+            with transaction.atomic():
+                updated += Product.objects.filter(
+                    pk__gt=start, pk__lte=start + batch_size
+                ).refresh_price_summary()
+
+        products_changed([], prices=False)
+        self.stdout.write(self.style.SUCCESS("상품 {} 개 갱신 완료".format(updated)))
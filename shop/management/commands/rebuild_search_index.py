@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from shop.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "상품 검색 (FTS5) 인덱스를 다시 생성합니다."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS("검색 인덱스 재생성 완료"))
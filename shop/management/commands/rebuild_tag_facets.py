@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from shop.facets import rebuild_tag_facets
+
+
+class Command(BaseCommand):
+    help = "태그별 상품 수 / 가격 범위 요약을 다시 계산합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            created = rebuild_tag_facets(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS("태그 {} 개 갱신 완료".format(created)))
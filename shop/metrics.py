@@ -0,0 +1,255 @@
+import glob
+import mmap
+import os
+import struct
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from django.conf import settings
+
+__all__ = (
+    "DURATION_BUCKETS",
+    "MetricsFile",
+    "record_request",
+    "record_response_bytes",
+    "collect",
+    "render_prometheus",
+)
+
+# 요청 처리 시간 histogram 구간 (초)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+METRICS = {
+    "shop_request_duration_seconds": (
+        "histogram",
+        "ViewSet action 별 요청 처리 시간",
+    ),
+    "shop_requests_total": ("counter", "ViewSet action 별 요청 수"),
+    "shop_request_errors_total": (
+        "counter",
+        "ViewSet action 별 오류 응답 수 (4xx / 5xx)",
+    ),
+    "shop_response_bytes_total": ("counter", "ViewSet action 별 응답 크기 합계"),
+    "shop_db_queries_total": ("counter", "ViewSet action 별 쿼리 수 합계"),
+    "shop_db_duration_seconds_total": (
+        "counter",
+        "ViewSet action 별 SQL 실행 시간 합계",
+    ),
+}
+
+HEADER = struct.Struct("<Q")
+KEY_LENGTH = struct.Struct("<I")
+VALUE = struct.Struct("<d")
+
+
+class MetricsFile:
+    # 프로세스별 mmap 파일 - [사용 크기] 다음에 [키 길이][키 (8 byte 정렬)][float64 값] 반복
+    # 값 갱신은 offset 에 직접 기록하므로 요청당 비용은 수 마이크로초
+    initial_size = 64 * 1024
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.offsets = {}
+        self.file = open(path, "a+b")
+        if os.fstat(self.file.fileno()).st_size < self.initial_size:
+            self.file.truncate(self.initial_size)
+        self.mmap = mmap.mmap(self.file.fileno(), 0)
+        self.used = HEADER.unpack_from(self.mmap, 0)[0] or HEADER.size
+        for key, _, offset in read_entries(self.mmap, self.used):
+            self.offsets[key] = offset
+
+    def _add_key(self, key):
+        encoded = key.encode("utf-8")
+        padded = KEY_LENGTH.size + len(encoded)
+        padded += -padded % 8
+        end = self.used + padded + VALUE.size
+        if end > len(self.mmap):
+            size = len(self.mmap)
+            while size < end:
+                size *= 2
+            self.mmap.close()
+            self.file.truncate(size)
+            self.mmap = mmap.mmap(self.file.fileno(), 0)
+
+        KEY_LENGTH.pack_into(self.mmap, self.used, len(encoded))
+        self.mmap[
+            self.used + KEY_LENGTH.size : self.used + KEY_LENGTH.size + len(encoded)
+        ] = encoded
+        offset = self.used + padded
+        VALUE.pack_into(self.mmap, offset, 0.0)
+        self.used = end
+        # 키와 값을 모두 쓴 뒤에 사용 크기를 갱신해 읽는 쪽이 미완성 항목을 보지 않도록 함
+        HEADER.pack_into(self.mmap, 0, self.used)
+        self.offsets[key] = offset
+        return offset
+
+    def increment_many(self, items):
+        # items: [(키, 증가량)]
+        with self.lock:
+            for key, amount in items:
+                offset = self.offsets.get(key)
+                if offset is None:
+                    offset = self._add_key(key)
+                VALUE.pack_into(
+                    self.mmap, offset, VALUE.unpack_from(self.mmap, offset)[0] + amount
+                )
+
+    def close(self):
+        self.mmap.close()
+        self.file.close()
+
+
+def read_entries(buffer, used):
+    position = HEADER.size
+    while position < used:
+        length = KEY_LENGTH.unpack_from(buffer, position)[0]
+        start = position + KEY_LENGTH.size
+        key = bytes(buffer[start : start + length]).decode("utf-8")
+        offset = start + length
+        offset += -offset % 8
+        yield key, VALUE.unpack_from(buffer, offset)[0], offset
+        position = offset + VALUE.size
+
+
+_local = {"file": None, "pid": None, "directory": None}
+_open_lock = threading.Lock()
+
+
+def _metrics_file():
+    # fork 된 워커 / 설정 변경시 새 파일을 사용
+    pid, directory = os.getpid(), settings.SHOP_METRICS_DIR
+    metrics_file = _local["file"]
+    if metrics_file is not None and _local["pid"] == pid:
+        if _local["directory"] == directory:
+            return metrics_file
+    with _open_lock:
+        if _local["file"] is None or (_local["pid"], _local["directory"]) != (
+            pid,
+            directory,
+        ):
+            os.makedirs(directory, exist_ok=True)
+            _local["file"] = MetricsFile(
+                os.path.join(directory, "metrics-{}.db".format(pid))
+            )
+            _local["pid"], _local["directory"] = pid, directory
+        return _local["file"]
+
+
+_keys = {}
+
+
+def _action_keys(action):
+    # action 별 키 문자열은 한번만 생성
+    keys = _keys.get(action)
+    if keys is None:
+        label = 'action="{}"'.format(action.replace("\\", "\\\\").replace('"', '\\"'))
+        keys = {
+            "buckets": [
+                'shop_request_duration_seconds_bucket{{{},le="{}"}}'.format(
+                    label, bound
+                )
+                for bound in DURATION_BUCKETS
+            ]
+            + ['shop_request_duration_seconds_bucket{{{},le="+Inf"}}'.format(label)],
+            "sum": "shop_request_duration_seconds_sum{{{}}}".format(label),
+            "count": "shop_request_duration_seconds_count{{{}}}".format(label),
+            "requests": "shop_requests_total{{{}}}".format(label),
+            "4xx": 'shop_request_errors_total{{{},class="4xx"}}'.format(label),
+            "5xx": 'shop_request_errors_total{{{},class="5xx"}}'.format(label),
+            "bytes": "shop_response_bytes_total{{{}}}".format(label),
+            "queries": "shop_db_queries_total{{{}}}".format(label),
+            "db": "shop_db_duration_seconds_total{{{}}}".format(label),
+        }
+        _keys[action] = keys
+    return keys
+
+
+def record_request(action, duration, status, size, queries, db_duration):
+    keys = _action_keys(action)
+    # histogram 구간은 누적하지 않고 해당 구간에만 기록, 출력시 누적
+    items = [
+        (keys["buckets"][bisect_left(DURATION_BUCKETS, duration)], 1),
+        (keys["sum"], duration),
+        (keys["count"], 1),
+        (keys["requests"], 1),
+        (keys["bytes"], size),
+        (keys["queries"], queries),
+        (keys["db"], db_duration),
+    ]
+    if status >= 500:
+        items.append((keys["5xx"], 1))
+    elif status >= 400:
+        items.append((keys["4xx"], 1))
+    _metrics_file().increment_many(items)
+
+
+def record_response_bytes(action, size):
+    _metrics_file().increment_many([(_action_keys(action)["bytes"], size)])
+
+
+def collect():
+    # 모든 프로세스 파일의 값을 키별로 합산
+    values = defaultdict(float)
+    for path in glob.glob(os.path.join(settings.SHOP_METRICS_DIR, "metrics-*.db")):
+        with open(path, "rb") as f:
+            try:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                continue
+            with buffer:
+                used = HEADER.unpack_from(buffer, 0)[0]
+                for key, value, _ in read_entries(buffer, used):
+                    values[key] += value
+    return values
+
+
+def _format_value(value):
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+def render_prometheus(values):
+    families = defaultdict(list)
+    for key, value in values.items():
+        name, _, labels = key.partition("{")
+        for suffix in ("_bucket", "_sum", "_count"):
+            if name.endswith(suffix) and name[: -len(suffix)] in METRICS:
+                name = name[: -len(suffix)]
+                break
+        families[name].append((key, labels, value))
+
+    lines = []
+    for name in sorted(families):
+        kind, description = METRICS.get(name, ("untyped", ""))
+        lines.append("# HELP {} {}".format(name, description))
+        lines.append("# TYPE {} {}".format(name, kind))
+        samples = sorted(families[name])
+        if kind == "histogram":
+            samples = _cumulative_buckets(samples)
+        for key, _, value in samples:
+            lines.append("{} {}".format(key, _format_value(value)))
+    return "\n".join(lines) + "\n"
+
+
+def _cumulative_buckets(samples):
+    # action 별로 le 순서대로 누적
+    buckets = defaultdict(dict)
+    others = []
+    for key, labels, value in samples:
+        if "_bucket{" in key:
+            label, _, bound = labels.rpartition(',le="')
+            buckets[label][bound.rstrip('"}')] = value
+        else:
+            others.append((key, labels, value))
+
+    result = []
+    bounds = [str(bound) for bound in DURATION_BUCKETS] + ["+Inf"]
+    for label in sorted(buckets):
+        total = 0
+        for bound in bounds:
+            total += buckets[label].get(bound, 0)
+            key = 'shop_request_duration_seconds_bucket{{{},le="{}"}}'.format(
+                label, bound
+            )
+            result.append((key, label, total))
+    return result + others
@@ -0,0 +1,145 @@
+import logging
+import time
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+from shop.metrics import record_request, record_response_bytes
+
+__all__ = (
+    "QueryBudgetExceeded",
+    "QueryBudgetMiddleware",
+    "MetricsMiddleware",
+)
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+    # connection.execute_wrapper 로 DEBUG 여부와 관계없이 쿼리 수 / 시간 집계
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+def get_view_action(request):
+    # ViewSet 요청이면 (ViewSet 클래스, action) 반환
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return None, None
+    actions = getattr(match.func, "actions", None) or {}
+    return getattr(match.func, "cls", None), actions.get(request.method.lower())
+
+
+def get_query_budget(request):
+    # SHOP_QUERY_BUDGETS (view_name 기준, 값은 예산 또는 {method: 예산}) 우선,
+    # 없으면 ViewSet 의 query_budgets[action]
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return None, None
+
+    name = match.view_name
+    if name in settings.SHOP_QUERY_BUDGETS:
+        budget = settings.SHOP_QUERY_BUDGETS[name]
+        # {method: 예산} 이면 해당 method 만 확인
+        if isinstance(budget, dict):
+            budget = budget.get(request.method)
+        return name, budget
+
+    view_class, action = get_view_action(request)
+    budgets = getattr(view_class, "query_budgets", None) or {}
+    if action in budgets:
+        return "{}.{}".format(view_class.__name__, action), budgets[action]
+    return name, None
+
+
+class QueryBudgetMiddleware:
+    # 요청별 쿼리 수 / SQL 시간을 Server-Timing 헤더로 응답하고 쿼리 예산 초과를 확인
+    # 스트리밍 응답은 응답을 반환할 때까지 실행된 쿼리만 집계
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = request.query_counter = QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        timing = 'db;dur={:.2f};desc="{} queries", app;dur={:.2f}'.format(
+            counter.duration * 1000, counter.count, elapsed * 1000
+        )
+        if response.has_header("Server-Timing"):
+            timing = response["Server-Timing"] + ", " + timing
+        response["Server-Timing"] = timing
+
+        name, budget = get_query_budget(request)
+        if budget is not None and counter.count > budget:
+            message = "{} {}: 쿼리 {} 개 실행 (예산 {} 개)".format(
+                request.method, name, counter.count, budget
+            )
+            if settings.SHOP_QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+
+class MetricsMiddleware:
+    # ViewSet action 별 응답 시간 / 요청 수 / 오류 수 / 응답 크기 / SQL 시간을 shop.metrics 에 기록
+    # QueryBudgetMiddleware 보다 앞에 두어야 SQL 시간이 기록됨
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        view_class, action = get_view_action(request)
+        if action is None:
+            return response
+
+        name = "{}.{}".format(view_class.__name__, action)
+        counter = getattr(request, "query_counter", None)
+        if response.streaming and response.has_header("Content-Length"):
+            # 파일 응답은 sendfile 로 전송되도록 streaming_content 를 감싸지 않음
+            size = int(response["Content-Length"])
+        elif response.streaming:
+            # 스트리밍 응답은 전송이 끝난 뒤 크기를 기록
+            size = 0
+            response.streaming_content = self.count_bytes(
+                name, response.streaming_content
+            )
+        else:
+            size = len(response.content)
+        record_request(
+            name,
+            elapsed,
+            response.status_code,
+            size,
+            counter.count if counter else 0,
+            counter.duration if counter else 0.0,
+        )
+        return response
+
+    def count_bytes(self, name, content):
+        size = 0
+        try:
+            for chunk in content:
+                size += len(chunk)
+                yield chunk
+        finally:
+            record_response_bytes(name, size)
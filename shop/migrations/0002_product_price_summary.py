@@ -0,0 +1,62 @@
+# Generated by Django 2.2.24 on 2026-10-17 22:36
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def refresh_price_summary(apps, schema_editor):
+    Product = apps.get_model("shop", "Product")
+    ProductOption = apps.get_model("shop", "ProductOption")
+    options = (
+        ProductOption.objects.filter(product=OuterRef("pk"))
+        .order_by()
+        .values("product")
+    )
+    Product.objects.update(
+        min_price=Subquery(options.annotate(value=Min("price")).values("value")),
+        max_price=Subquery(options.annotate(value=Max("price")).values("value")),
+        option_count=Coalesce(
+            Subquery(options.annotate(value=Count("pk")).values("value")), Value(0)
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="max_price",
+            field=models.IntegerField(
+                blank=True, editable=False, null=True, verbose_name="최고가"
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="min_price",
+            field=models.IntegerField(
+                blank=True, editable=False, null=True, verbose_name="최저가"
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="option_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="옵션 수"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["min_price"], name="shop_product_min_price_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["max_price"], name="shop_product_max_price_idx"),
+        ),
+        migrations.RunPython(refresh_price_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 2.2.24 on 2026-10-17 22:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0002_product_price_summary'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='productoption',
+            options={'ordering': ('pk',)},
+        ),
+        migrations.AlterModelOptions(
+            name='tag',
+            options={'ordering': ('pk',)},
+        ),
+        migrations.AddIndex(
+            model_name='productoption',
+            index=models.Index(fields=['product', 'price'], name='shop_option_product_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productoption',
+            index=models.Index(fields=['price'], name='shop_option_price_idx'),
+        ),
+    ]
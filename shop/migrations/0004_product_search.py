@@ -0,0 +1,38 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 trigram 토크나이저 (SQLite 3.34+) 가 필요, 다른 DB 에서는 검색 비활성화
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE shop_product_search "
+        "USING fts5(name, options, tags, tokenize = 'trigram')"
+    )
+    schema_editor.execute(
+        "INSERT INTO shop_product_search(rowid, name, options, tags) "
+        "SELECT p.id, p.name, "
+        "(SELECT group_concat(o.name, ' ') FROM shop_productoption o "
+        "WHERE o.product_id = p.id), "
+        "(SELECT group_concat(t.name, ' ') FROM shop_tag t "
+        "INNER JOIN shop_product_tag_set pt ON pt.tag_id = t.id "
+        "WHERE pt.product_id = p.id) "
+        "FROM shop_product p"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS shop_product_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0003_option_price_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 2.2.24 on 2026-10-17 22:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0004_product_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='수정 시각'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='버전'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['version'], name='shop_product_version_idx'),
+        ),
+    ]
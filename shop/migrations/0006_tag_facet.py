@@ -0,0 +1,54 @@
+# Generated by Django 2.2.24 on 2026-10-17 23:20
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Min
+import django.db.models.deletion
+
+
+def build_tag_facets(apps, schema_editor):
+    Product = apps.get_model("shop", "Product")
+    TagFacet = apps.get_model("shop", "TagFacet")
+    rows = (
+        Product.tag_set.through.objects.order_by()
+        .values("tag")
+        .annotate(
+            product_count=Count("pk"),
+            min_price=Min("product__min_price"),
+            max_price=Max("product__max_price"),
+        )
+    )
+    TagFacet.objects.bulk_create(
+        [
+            TagFacet(
+                tag_id=row["tag"],
+                product_count=row["product_count"],
+                min_price=row["min_price"],
+                max_price=row["max_price"],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0005_product_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagFacet',
+            fields=[
+                ('tag', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='facet', serialize=False, to='shop.Tag', verbose_name='태그')),
+                ('product_count', models.PositiveIntegerField(default=0, verbose_name='상품 수')),
+                ('min_price', models.IntegerField(blank=True, null=True, verbose_name='최저가')),
+                ('max_price', models.IntegerField(blank=True, null=True, verbose_name='최고가')),
+            ],
+            options={
+                'ordering': ('tag',),
+            },
+        ),
+        migrations.RunPython(build_tag_facets, migrations.RunPython.noop),
+    ]
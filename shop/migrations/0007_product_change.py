@@ -0,0 +1,58 @@
+# Generated by Django 2.2.24 on 2026-10-17 23:29
+
+from django.db import migrations, models
+
+
+def log_existing_products(apps, schema_editor):
+    # 기존 상품을 변경 로그에 추가해 커서 0 부터 전체 상품을 받을 수 있도록 함
+    Product = apps.get_model("shop", "Product")
+    ProductChange = apps.get_model("shop", "ProductChange")
+    ProductChange.objects.bulk_create(
+        (
+            ProductChange(product_pk=pk)
+            for pk in Product.objects.order_by("pk").values_list("pk", flat=True)
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0006_tag_facet'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogCompaction',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('compacted_through', models.PositiveIntegerField(verbose_name='정리된 마지막 커서')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='정리 시각')),
+            ],
+            options={
+                'ordering': ('pk',),
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductChange',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_pk', models.PositiveIntegerField(verbose_name='상품 pk')),
+                ('deleted', models.BooleanField(default=False, verbose_name='삭제')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='변경 시각')),
+            ],
+            options={
+                'ordering': ('pk',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='productchange',
+            index=models.Index(fields=['product_pk'], name='shop_change_product_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productchange',
+            index=models.Index(fields=['created_at'], name='shop_change_created_at_idx'),
+        ),
+        migrations.RunPython(log_existing_products, migrations.RunPython.noop),
+    ]
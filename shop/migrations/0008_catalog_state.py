@@ -0,0 +1,38 @@
+# Generated by Django 2.2.24 on 2026-10-17 23:43
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def create_catalog_state(apps, schema_editor):
+    Product = apps.get_model("shop", "Product")
+    CatalogState = apps.get_model("shop", "CatalogState")
+    state = Product.objects.aggregate(
+        version=Max("version"), product_count=Count("pk"), updated_at=Max("updated_at")
+    )
+    CatalogState.objects.create(
+        pk=1,
+        version=state["version"] or 0,
+        product_count=state["product_count"],
+        updated_at=state["updated_at"],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0007_product_change'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogState',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(default=0, verbose_name='버전')),
+                ('product_count', models.PositiveIntegerField(default=0, verbose_name='상품 수')),
+                ('updated_at', models.DateTimeField(blank=True, null=True, verbose_name='수정 시각')),
+            ],
+        ),
+        migrations.RunPython(create_catalog_state, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.24 on 2026-10-17 23:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0008_catalog_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportProgress',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=1024, unique=True, verbose_name='파일 경로')),
+                ('chunk_size', models.PositiveIntegerField(verbose_name='chunk 크기')),
+                ('chunk', models.PositiveIntegerField(verbose_name='마지막 저장 chunk')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='수정 시각')),
+            ],
+        ),
+    ]
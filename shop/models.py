@@ -1,42 +1,87 @@
 # shop/models.py
 from django.db import models
+from django.db.models import Count, F, Max, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
 
 __all__ = (
     "Tag",
     "Product",
     "ProductOption",
+    "TagFacet",
+    "ProductChange",
+    "ChangeLogCompaction",
+    "CatalogState",
+    "ImportProgress",
 )
 
 
 class Tag(models.Model):
     name = models.CharField("태그명", unique=True, max_length=100)
 
+    class Meta:
+        ordering = ("pk",)
+
     def __str__(self):
         return self.name
 
 
+class ProductQuerySet(models.QuerySet):
+    def refresh_price_summary(self):
+        # 옵션 가격 요약 (최저가 / 최고가 / 옵션 수) 을 한번의 UPDATE 로 갱신
+        options = (
+            ProductOption.objects.filter(product=OuterRef("pk"))
+            .order_by()
+            .values("product")
+        )
+        return self.update(
+            min_price=Subquery(options.annotate(value=Min("price")).values("value")),
+            max_price=Subquery(options.annotate(value=Max("price")).values("value")),
+            option_count=Coalesce(
+                Subquery(options.annotate(value=Count("pk")).values("value")),
+                Value(0),
+            ),
+        )
+
+    def touch(self):
+        # 변경된 상품의 수정 시각과 전체 상품 중 가장 큰 값 + 1 인 version 을 갱신
+        last_version = Product.objects.order_by("-version").values("version")[:1]
+        return self.update(
+            updated_at=timezone.now(),
+            version=Coalesce(Subquery(last_version), Value(0)) + 1,
+        )
+
+
 class Product(models.Model):
     name = models.CharField("상품명", max_length=100)
     tag_set = models.ManyToManyField(Tag, blank=True)
+    min_price = models.IntegerField("최저가", null=True, blank=True, editable=False)
+    max_price = models.IntegerField("최고가", null=True, blank=True, editable=False)
+    option_count = models.PositiveIntegerField("옵션 수", default=0, editable=False)
+    updated_at = models.DateTimeField("수정 시각", auto_now=True)
+    version = models.PositiveIntegerField("버전", default=0, editable=False)
+
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["min_price"], name="shop_product_min_price_idx"),
+            models.Index(fields=["max_price"], name="shop_product_max_price_idx"),
+            models.Index(fields=["version"], name="shop_product_version_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
-    # Admin 에서 확인용
+    # Admin 에서 확인용 (prefetch 된 경우 추가 쿼리 없음)
     @property
     def tag_set_list(self):
-        return (
-            [i for i in self.tag_set.all()] if [i for i in self.tag_set.all()] else None
-        )
+        return list(self.tag_set.all()) or None
 
-    # Admin 에서 확인용
+    # Admin 에서 확인용 (prefetch 된 경우 추가 쿼리 없음)
     @property
     def option_list(self):
-        return (
-            [i for i in self.option_set.all()]
-            if [i for i in self.option_set.all()]
-            else None
-        )
+        return list(self.option_set.all()) or None
 
 
 class ProductOption(models.Model):
@@ -50,5 +95,143 @@ class ProductOption(models.Model):
     name = models.CharField("옵션명", max_length=100)
     price = models.IntegerField("가격")
 
+    class Meta:
+        ordering = ("pk",)
+        indexes = [
+            models.Index(
+                fields=["product", "price"], name="shop_option_product_price_idx"
+            ),
+            models.Index(fields=["price"], name="shop_option_price_idx"),
+        ]
+
     def __str__(self):
         return self.name
+
+
+class TagFacetQuerySet(models.QuerySet):
+    def refresh(self, exclude_products=()):
+        # 태그별 상품 수 / 가격 범위를 한번의 UPDATE 로 갱신
+        # exclude_products: 같은 트랜잭션에서 삭제될 상품
+        links = (
+            Product.tag_set.through.objects.filter(tag=OuterRef("tag"))
+            .exclude(product__in=exclude_products)
+            .order_by()
+            .values("tag")
+        )
+        return self.update(
+            product_count=Coalesce(
+                Subquery(links.annotate(value=Count("pk")).values("value")),
+                Value(0),
+            ),
+            min_price=Subquery(
+                links.annotate(value=Min("product__min_price")).values("value")
+            ),
+            max_price=Subquery(
+                links.annotate(value=Max("product__max_price")).values("value")
+            ),
+        )
+
+
+class TagFacet(models.Model):
+    tag = models.OneToOneField(
+        Tag,
+        verbose_name="태그",
+        primary_key=True,
+        related_name="facet",
+        on_delete=models.CASCADE,
+    )
+    product_count = models.PositiveIntegerField("상품 수", default=0)
+    min_price = models.IntegerField("최저가", null=True, blank=True)
+    max_price = models.IntegerField("최고가", null=True, blank=True)
+
+    objects = TagFacetQuerySet.as_manager()
+
+    class Meta:
+        ordering = ("tag",)
+
+    def __str__(self):
+        return str(self.tag_id)
+
+
+class ProductChange(models.Model):
+    # 상품 변경 로그 (추가만 가능), pk 가 변경 피드의 커서
+    # 삭제된 상품의 기록도 남아야 하므로 상품 FK 대신 pk 만 저장
+    product_pk = models.PositiveIntegerField("상품 pk")
+    deleted = models.BooleanField("삭제", default=False)
+    created_at = models.DateTimeField("변경 시각", auto_now_add=True)
+
+    class Meta:
+        ordering = ("pk",)
+        indexes = [
+            models.Index(fields=["product_pk"], name="shop_change_product_idx"),
+            models.Index(fields=["created_at"], name="shop_change_created_at_idx"),
+        ]
+
+    def __str__(self):
+        return "{} ({})".format(self.product_pk, "삭제" if self.deleted else "변경")
+
+
+class ChangeLogCompaction(models.Model):
+    # 변경 로그 정리 기록, compacted_through 이하의 커서는 더 이상 사용할 수 없음
+    compacted_through = models.PositiveIntegerField("정리된 마지막 커서")
+    created_at = models.DateTimeField("정리 시각", auto_now_add=True)
+
+    class Meta:
+        ordering = ("pk",)
+
+    def __str__(self):
+        return str(self.compacted_through)
+
+
+class CatalogStateQuerySet(models.QuerySet):
+    def bump(self, created=0, deleted=0):
+        # 상품 변경 / 추가 / 삭제시 전체 상품 버전 증가, 상품 수 갱신 (UPDATE 한번)
+        # ETag 는 버전만으로도 바뀌므로 ORM 으로 직접 추가된 상품 등으로 상품 수가
+        # 어긋나도 음수가 되지 않도록만 보정
+        # 행이 없으면 (flush 등) 현재 상품으로 다시 생성, 삭제될 상품은 아직 남아 있음
+        updated = self.filter(pk=CatalogState.PK).update(
+            version=F("version") + 1,
+            product_count=Greatest(F("product_count") + created - deleted, Value(0)),
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            self.create(
+                pk=CatalogState.PK,
+                version=1,
+                product_count=Product.objects.count() - deleted,
+                updated_at=timezone.now(),
+            )
+
+    def current(self):
+        # 반환값: {"version", "product_count", "updated_at"} 또는 None
+        return (
+            self.filter(pk=CatalogState.PK)
+            .values("version", "product_count", "updated_at")
+            .first()
+        )
+
+
+class CatalogState(models.Model):
+    # 전체 상품 상태 (한 행) - 목록 ETag / Last-Modified 를 상품 테이블 집계 없이 계산
+    PK = 1
+
+    version = models.PositiveIntegerField("버전", default=0)
+    product_count = models.PositiveIntegerField("상품 수", default=0)
+    updated_at = models.DateTimeField("수정 시각", null=True, blank=True)
+
+    objects = CatalogStateQuerySet.as_manager()
+
+    def __str__(self):
+        return str(self.version)
+
+
+class ImportProgress(models.Model):
+    # import_catalog 의 파일별 마지막 저장 chunk - chunk 저장과 같은 트랜잭션에서 갱신하므로
+    # 중간에 종료되어도 --resume 시 저장된 chunk 를 다시 저장하지 않음
+    path = models.CharField("파일 경로", max_length=1024, unique=True)
+    chunk_size = models.PositiveIntegerField("chunk 크기")
+    chunk = models.PositiveIntegerField("마지막 저장 chunk")
+    updated_at = models.DateTimeField("수정 시각", auto_now=True)
+
+    def __str__(self):
+        return "{} ({})".format(self.path, self.chunk)
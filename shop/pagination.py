@@ -0,0 +1,181 @@
+import json
+from base64 import b64decode, b64encode
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db.models import Max, Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+from rest_framework.utils.urls import replace_query_param
+from .search import search_products
+
+
+def _reverse_ordering(ordering):
+    return tuple(field[1:] if field[0] == "-" else "-" + field for field in ordering)
+
+
+class KeysetCursorPagination(CursorPagination):
+    # (정렬 필드, pk) 전체를 커서로 저장하는 keyset 페이지네이션
+    # DRF CursorPagination 은 첫 정렬 필드만 저장하고 같은 값은 OFFSET (최대 offset_cutoff)
+    # 으로 건너뛰므로, 같은 가격이 많으면 페이지가 반복되거나 이후 행이 누락됨
+    def get_ordering(self, request, queryset, view):
+        # 마지막에 pk 를 추가해 유일한 순서로 만듦 (첫 필드와 같은 방향이면 인덱스를 그대로 사용)
+        ordering = super().get_ordering(request, queryset, view)
+        if "pk" not in (field.lstrip("-") for field in ordering):
+            ordering += ("-pk" if ordering[0].startswith("-") else "pk",)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        self.position = self.cursor.position if self.cursor is not None else None
+
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if self.position is not None:
+            try:
+                queryset = queryset.filter(self.keyset_filter(ordering, self.position))
+            except (TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[: self.page_size + 1])
+        self.page = results[: self.page_size]
+        has_following = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = self.position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def keyset_filter(self, ordering, position):
+        # (a, b) > (x, y) 를 a >= x AND (a > x OR (a = x AND b > y)) 로 조회
+        # 첫 필드의 범위 조건으로 인덱스 범위만 읽음
+        condition, equal = Q(), {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip("-")
+            lookup = "__lt" if field.startswith("-") else "__gt"
+            condition |= Q(**equal, **{name + lookup: value})
+            equal[name] = value
+        first = ordering[0]
+        bound = "__lte" if first.startswith("-") else "__gte"
+        return Q(**{first.lstrip("-") + bound: position[0]}) & condition
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None:
+            return None if cursor is None else cursor._replace(position=None)
+        try:
+            position = json.loads(cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if (
+            not isinstance(position, list)
+            or len(position) != len(self.ordering)
+            or not all(isinstance(value, (int, float, str)) for value in position)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor._replace(position=position)
+
+    def get_position(self, instance):
+        return [
+            instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            for name in (field.lstrip("-") for field in self.ordering)
+        ]
+
+    def get_link(self, instance, reverse):
+        position = (
+            self.get_position(instance) if instance is not None else self.position
+        )
+        cursor = Cursor(offset=0, reverse=reverse, position=json.dumps(position))
+        return self.encode_cursor(cursor)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.get_link(self.page[-1] if self.page else None, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.get_link(self.page[0] if self.page else None, reverse=True)
+
+
+class ProductCursorPagination(KeysetCursorPagination):
+    # pk (가격 정렬시 가격, pk) 기준 keyset 페이지네이션 - 페이지 깊이와 무관하게 OFFSET 없이 조회
+    ordering = "pk"
+    page_size = settings.SHOP_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.SHOP_MAX_PAGE_SIZE
+
+
+class OptionCursorPagination(KeysetCursorPagination):
+    # 가격 인덱스 (price, rowid) 순서 그대로 (가격, pk) 커서로 조회
+    ordering = ("price", "pk")
+    page_size = settings.SHOP_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.SHOP_MAX_PAGE_SIZE
+
+
+class SearchCursorPagination(ProductCursorPagination):
+    # 검색 점수, pk 기준 keyset 페이지네이션 - 다음 페이지만 지원
+    def paginate_search(self, request, query, queryset):
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+
+        after = self.decode_search_cursor(request)
+        rows = search_products(query, after, self.page_size + 1)
+        self.has_next = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        self.next_position = rows[-1] if self.has_next else None
+
+        products = queryset.filter(pk__in=[pk for _, pk in rows])
+        products = {product.pk: product for product in products}
+        return [products[pk] for _, pk in rows if pk in products]
+
+    def decode_search_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            score, pk = json.loads(b64decode(encoded.encode("ascii")).decode("ascii"))
+            return float(score), int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        encoded = b64encode(json.dumps(self.next_position).encode("ascii"))
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded.decode("ascii")
+        )
+
+    def get_previous_link(self):
+        return None
+
+
+class EstimatedCountPaginator(Paginator):
+    # admin changelist 용 - 필터 없는 큰 테이블은 COUNT(*) 대신 최대 pk 로 전체 수 추정
+    # (삭제된 상품만큼 많게 추정되어 마지막 페이지가 비어 있을 수 있음)
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if queryset.query.where:
+            return super().count
+        # 필터가 없으면 annotate / prefetch 와 관계없이 테이블 전체 행 수
+        manager = queryset.model._base_manager
+        estimate = manager.aggregate(last=Max("pk"))["last"] or 0
+        if estimate > settings.SHOP_ADMIN_EXACT_COUNT_LIMIT:
+            return estimate
+        return manager.count()
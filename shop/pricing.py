@@ -0,0 +1,135 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import ExpressionWrapper, F, FloatField, Value
+from django.db.models.functions import Ceil, Floor, Greatest, Round
+from rest_framework.exceptions import ValidationError
+from .models import ProductOption
+from .sync import products_changed
+
+__all__ = (
+    "PRICE_OPERATIONS",
+    "PRICE_ROUNDINGS",
+    "parse_price_adjustment",
+    "adjust_prices",
+)
+
+PRICE_OPERATIONS = ("set", "add", "percent")
+
+PRICE_ROUNDINGS = {
+    "round": Round,
+    "floor": Floor,
+    "ceil": Ceil,
+}
+
+
+def _int_value(value, message):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValidationError(message)
+
+
+def _pk_list(data, key):
+    values = data[key]
+    if not isinstance(values, list) or not values:
+        raise ValidationError("{} 는 pk 리스트로 입력해야 합니다.".format(key))
+    # UPDATE 의 IN 조건 변수로 전달되므로 다른 조건 변수와 합쳐도 SQLite 변수 수 제한을
+    # 넘지 않도록 SHOP_SYNC_CHUNK_SIZE 개까지만 허용
+    limit = settings.SHOP_SYNC_CHUNK_SIZE
+    if len(values) > limit:
+        raise ValidationError(
+            "{} 는 최대 {} 개까지 입력할 수 있습니다.".format(key, limit)
+        )
+    try:
+        return [int(value) for value in values]
+    except (TypeError, ValueError):
+        raise ValidationError("{} 는 pk 리스트로 입력해야 합니다.".format(key))
+
+
+def _selector(data):
+    # 태그 / 상품 / 옵션 가격 범위 조건 (여러개면 모두 만족하는 옵션)
+    lookups = {}
+    if "tags" in data:
+        lookups["product__tag_set__in"] = _pk_list(data, "tags")
+    if "products" in data:
+        lookups["product__in"] = _pk_list(data, "products")
+    if "price_gte" in data:
+        lookups["price__gte"] = _int_value(
+            data["price_gte"], "가격은 숫자로 입력해야 합니다."
+        )
+    if "price_lte" in data:
+        lookups["price__lte"] = _int_value(
+            data["price_lte"], "가격은 숫자로 입력해야 합니다."
+        )
+    if not lookups:
+        raise ValidationError("변경할 옵션의 조건을 입력해주세요.")
+    # 태그 / 상품 조건을 함께 사용해도 전체 변수 수가 제한을 넘지 않도록 합계도 확인
+    pks = sum(
+        len(lookups.get(key, ())) for key in ("product__tag_set__in", "product__in")
+    )
+    if pks > settings.SHOP_SYNC_CHUNK_SIZE:
+        raise ValidationError(
+            "tags / products 는 합쳐서 최대 {} 개까지 입력할 수 있습니다.".format(
+                settings.SHOP_SYNC_CHUNK_SIZE
+            )
+        )
+    return lookups
+
+
+def _expression(data):
+    operation = data.get("operation")
+    if operation not in PRICE_OPERATIONS:
+        raise ValidationError("지원하지 않는 변경 방식입니다.")
+    if "value" not in data:
+        raise ValidationError("변경 값은 필수 입력 값입니다.")
+
+    if operation == "set":
+        value = _int_value(data["value"], "변경 값은 숫자로 입력해야 합니다.")
+        if value < 0:
+            raise ValidationError("가격은 0 이상이어야 합니다.")
+        return Value(value)
+
+    if operation == "add":
+        value = _int_value(data["value"], "변경 값은 숫자로 입력해야 합니다.")
+        return Greatest(F("price") + value, Value(0))
+
+    # percent: 가격 * (100 + value) / 100 을 unit 원 단위로 반올림 / 내림 / 올림
+    try:
+        value = float(data["value"])
+    except (TypeError, ValueError):
+        raise ValidationError("변경 값은 숫자로 입력해야 합니다.")
+    rounding = data.get("rounding", "round")
+    if rounding not in PRICE_ROUNDINGS:
+        raise ValidationError("지원하지 않는 반올림 방식입니다.")
+    unit = _int_value(data.get("unit", 1), "unit 은 숫자로 입력해야 합니다.")
+    if unit < 1:
+        raise ValidationError("unit 은 1 이상이어야 합니다.")
+
+    # 정수 곱을 먼저 계산해 1000 * 1.1 같은 부동소수 오차가 올림에 영향을 주지 않도록 함
+    scaled = PRICE_ROUNDINGS[rounding](
+        ExpressionWrapper(
+            F("price") * Value(100 + value) / Value(100.0 * unit),
+            output_field=FloatField(),
+        )
+    )
+    return Greatest(scaled * unit, Value(0))
+
+
+def parse_price_adjustment(data):
+    # 반환값: (옵션 조건 lookups, 새 가격 식)
+    if not isinstance(data, dict):
+        raise ValidationError("잘못된 데이터입니다.")
+    return _selector(data), _expression(data)
+
+
+@transaction.atomic
+def adjust_prices(lookups, price):
+    # 조건에 맞는 옵션 가격을 UPDATE 한번으로 변경하고 변경된 상품의 파생 데이터 갱신
+    options = ProductOption.objects.filter(**lookups)
+    # 가격 범위 조건은 UPDATE 후 달라지므로 변경 대상 상품을 먼저 조회
+    pks = list(options.order_by().values_list("product", flat=True).distinct())
+    if not pks:
+        return 0, pks
+    updated = options.update(price=price)
+    products_changed(pks, search=False)
+    return updated, pks
@@ -0,0 +1,63 @@
+from .models import Product, ProductOption
+from .serializers import ProductSerializer
+
+__all__ = (
+    "RELATION_FIELDS",
+    "serialize_product_rows",
+)
+
+# values() 로 조회할 수 없어 따로 묶어야 하는 관계 필드
+RELATION_FIELDS = ("option_set", "tag_set")
+
+
+def _option_map(pks):
+    options = {}
+    for pk, product_id, name, price in (
+        ProductOption.objects.filter(product__in=pks)
+        .order_by("pk")
+        .values_list("pk", "product", "name", "price")
+        .iterator()
+    ):
+        options.setdefault(product_id, []).append(
+            {"pk": pk, "name": name, "price": price}
+        )
+    return options
+
+
+def _tag_map(pks):
+    tags = {}
+    for product_id, tag_id, name in (
+        Product.tag_set.through.objects.filter(product__in=pks)
+        .order_by("tag_id")
+        .values_list("product", "tag", "tag__name")
+        .iterator()
+    ):
+        tags.setdefault(product_id, []).append({"pk": tag_id, "name": name})
+    return tags
+
+
+def serialize_product_rows(rows, fields=None):
+    # 상품 values() 행에 옵션 / 태그를 각각 한번의 조회로 묶어
+    # ProductSerializer 와 같은 순서 / 형식의 dict 로 변환
+    names = [
+        name
+        for name in ProductSerializer.Meta.fields
+        if fields is None or name in fields
+    ]
+    pks = [row["pk"] for row in rows]
+    relations = {}
+    if pks and "option_set" in names:
+        relations["option_set"] = _option_map(pks)
+    if pks and "tag_set" in names:
+        relations["tag_set"] = _tag_map(pks)
+
+    data = []
+    for row in rows:
+        product = {}
+        for name in names:
+            if name in RELATION_FIELDS:
+                product[name] = relations[name].get(row["pk"], [])
+            else:
+                product[name] = row[name]
+        data.append(product)
+    return data
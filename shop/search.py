@@ -0,0 +1,123 @@
+from django.db import connection
+from rest_framework.exceptions import ValidationError
+from .models import Product, Tag, ProductOption
+
+__all__ = (
+    "SEARCH_TABLE",
+    "refresh_search_index",
+    "delete_search_index",
+    "rebuild_search_index",
+    "search_products",
+)
+
+# 상품별 검색 문서 (상품명 / 옵션명 / 태그명) 를 저장하는 FTS5 (trigram) 가상 테이블
+SEARCH_TABLE = "shop_product_search"
+
+# 상품명 > 옵션명 > 태그명 순으로 가중치
+SEARCH_SCORE = "bm25({}, 10.0, 5.0, 1.0)".format(SEARCH_TABLE)
+
+MIN_TERM_LENGTH = 3
+
+DOCUMENT_SQL = """
+    SELECT
+        p.{product_pk},
+        p.{product_name},
+        (SELECT group_concat(o.{option_name}, ' ')
+         FROM {option_table} o WHERE o.{option_product} = p.{product_pk}),
+        (SELECT group_concat(t.{tag_name}, ' ')
+         FROM {tag_table} t
+         INNER JOIN {through_table} pt ON pt.{through_tag} = t.{tag_pk}
+         WHERE pt.{through_product} = p.{product_pk})
+    FROM {product_table} p
+""".format(
+    product_table=Product._meta.db_table,
+    product_pk=Product._meta.pk.column,
+    product_name=Product._meta.get_field("name").column,
+    option_table=ProductOption._meta.db_table,
+    option_name=ProductOption._meta.get_field("name").column,
+    option_product=ProductOption._meta.get_field("product").column,
+    tag_table=Tag._meta.db_table,
+    tag_pk=Tag._meta.pk.column,
+    tag_name=Tag._meta.get_field("name").column,
+    through_table=Product.tag_set.through._meta.db_table,
+    through_tag=Product.tag_set.through._meta.get_field("tag").column,
+    through_product=Product.tag_set.through._meta.get_field("product").column,
+)
+
+
+def _enabled():
+    return connection.vendor == "sqlite"
+
+
+def _in_clause(pks):
+    return "({})".format(", ".join(["%s"] * len(pks)))
+
+
+def delete_search_index(pks):
+    pks = list(pks)
+    if not pks or not _enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "DELETE FROM {} WHERE rowid IN {}".format(SEARCH_TABLE, _in_clause(pks)),
+            pks,
+        )
+
+
+def refresh_search_index(pks):
+    pks = list(pks)
+    if not pks or not _enabled():
+        return
+    delete_search_index(pks)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO {}(rowid, name, options, tags) {} WHERE p.{} IN {}".format(
+                SEARCH_TABLE, DOCUMENT_SQL, Product._meta.pk.column, _in_clause(pks)
+            ),
+            pks,
+        )
+
+
+def rebuild_search_index():
+    if not _enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM {}".format(SEARCH_TABLE))
+        cursor.execute(
+            "INSERT INTO {}(rowid, name, options, tags) {}".format(
+                SEARCH_TABLE, DOCUMENT_SQL
+            )
+        )
+        cursor.execute("INSERT INTO {0}({0}) VALUES ('optimize')".format(SEARCH_TABLE))
+
+
+def _match_expression(query):
+    terms = query.split()
+    if not terms or any(len(term) < MIN_TERM_LENGTH for term in terms):
+        raise ValidationError(
+            "검색어는 {}자 이상 입력해야 합니다.".format(MIN_TERM_LENGTH)
+        )
+    # 각 검색어를 구문으로 감싸 부분 문자열로 검색 (AND)
+    return " ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+def search_products(query, after, limit):
+    # (score, pk) 순서의 keyset 페이지, after 는 이전 페이지 마지막 (score, pk)
+    if not _enabled():
+        raise ValidationError("검색을 지원하지 않는 데이터베이스입니다.")
+
+    sql = (
+        "SELECT score, pk FROM ("
+        "SELECT {score} AS score, rowid AS pk FROM {table} WHERE {table} MATCH %s"
+        ")".format(score=SEARCH_SCORE, table=SEARCH_TABLE)
+    )
+    params = [_match_expression(query)]
+    if after is not None:
+        sql += " WHERE score > %s OR (score = %s AND pk > %s)"
+        params += [after[0], after[0], after[1]]
+    sql += " ORDER BY score, pk LIMIT %s"
+    params.append(limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
@@ -13,6 +13,17 @@ class ProductOptionSerializer(ModelSerializer):
         )
 
 
+class ProductOptionPriceSerializer(ModelSerializer):
+    class Meta:
+        model = ProductOption
+        fields = (
+            "pk",
+            "product",
+            "name",
+            "price",
+        )
+
+
 class TagSerializer(ModelSerializer):
     class Meta:
         model = Tag
@@ -22,7 +33,17 @@ class TagSerializer(ModelSerializer):
         )
 
 
-class ProductSerializer(WritableNestedModelSerializer):
+class SparseFieldsMixin:
+    # fields 인자로 전달된 필드만 출력
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields).difference(fields):
+                self.fields.pop(field_name)
+
+
+class ProductSerializer(SparseFieldsMixin, WritableNestedModelSerializer):
     option_set = ProductOptionSerializer(many=True, read_only=True)
     tag_set = TagSerializer(many=True, read_only=True)
 
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from .cache import invalidate_tags
+from .models import CatalogState, Tag
+from .sync import products_changed
+from .tags import tag_resolver
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    # SHOP_DB_PROFILE 의 PRAGMA 를 새 연결마다 적용 (journal_mode 는 DB 파일에 유지됨)
+    # 요청의 쿼리 수 (QueryBudgetMiddleware) 에 포함되지 않도록 sqlite3 연결에서 직접 실행
+    if connection.vendor != "sqlite":
+        return
+    pragmas = settings.SHOP_DB_PROFILES[settings.SHOP_DB_PROFILE]["PRAGMAS"]
+    for name, value in pragmas.items():
+        connection.connection.execute("PRAGMA {} = {}".format(name, value))
+
+
+@receiver(post_migrate)
+def create_catalog_state(sender, using, **kwargs):
+    # flush (테스트 DB 초기화 등) 후에도 CatalogState 행이 있도록 다시 생성
+    if sender.name != "shop":
+        return
+    manager = CatalogState.objects.db_manager(using)
+    if not manager.filter(pk=CatalogState.PK).exists():
+        manager.bump()
+
+
+@receiver(post_save, sender=Tag)
+def tag_saved(sender, instance, created, **kwargs):
+    # 새 태그는 캐시된 태그명과 충돌하지 않으므로 변경시에만 무효화
+    if not created:
+        tag_resolver.clear()
+        invalidate_tags()
+        products_changed(
+            list(instance.product_set.values_list("pk", flat=True)), prices=False
+        )
+
+
+@receiver(pre_delete, sender=Tag)
+def tag_deleting(sender, instance, **kwargs):
+    # 삭제 후에는 연결된 상품을 알 수 없으므로 미리 저장
+    instance._product_pks = list(instance.product_set.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+def tag_deleted(sender, instance, **kwargs):
+    tag_resolver.clear()
+    invalidate_tags()
+    products_changed(getattr(instance, "_product_pks", []), prices=False)
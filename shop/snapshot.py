@@ -0,0 +1,172 @@
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import time
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, ExpressionWrapper, F, IntegerField, Max, Prefetch
+from .changes import latest_cursor
+from .export import product_to_dict
+from .models import Product, ProductOption, Tag
+
+__all__ = (
+    "SNAPSHOT_CONTENT_TYPE",
+    "SNAPSHOT_FILENAME",
+    "build_snapshot",
+    "current_snapshot",
+    "snapshot_path",
+)
+
+# 내용은 NDJSON 이지만 Accept-Encoding 과 관계없이 같은 표현으로 응답하도록
+# Content-Encoding 없이 gzip 파일 자체로 전송
+SNAPSHOT_CONTENT_TYPE = "application/gzip"
+SNAPSHOT_FILENAME = "products.ndjson.gz"
+
+MANIFEST_FILE = "manifest.json"
+CHUNKS_FILE = "chunks.json"
+CHUNK_DIR = "chunks"
+
+# 전송 중인 이전 스냅샷이 삭제되지 않도록 최근 파일 몇개는 유지
+KEEP_SNAPSHOTS = 2
+
+
+def _path(*names):
+    return os.path.join(settings.SHOP_SNAPSHOT_DIR, *names)
+
+
+def _write_atomic(path, data):
+    tmp = "{}.{}.tmp".format(path, os.getpid())
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _chunk_fingerprints(chunk_size):
+    # pk 범위 chunk 별 (최대 version, 상품 수) - 변경 / 추가시 version 이 전체 최대값 + 1 로,
+    # 삭제시 상품 수가 바뀌므로 한번의 GROUP BY 로 변경된 chunk 를 확인
+    rows = (
+        Product.objects.order_by()
+        .annotate(
+            chunk=ExpressionWrapper(
+                (F("pk") - 1) / chunk_size, output_field=IntegerField()
+            )
+        )
+        .values("chunk")
+        .annotate(version=Max("version"), count=Count("pk"))
+        .values_list("chunk", "version", "count")
+    )
+    return {str(chunk): [version, count] for chunk, version, count in rows}
+
+
+def _chunk_products(index, chunk_size):
+    return (
+        Product.objects.filter(
+            pk__gt=index * chunk_size, pk__lte=(index + 1) * chunk_size
+        )
+        .order_by("pk")
+        .prefetch_related(
+            Prefetch("option_set", queryset=ProductOption.objects.order_by("pk")),
+            Prefetch("tag_set", queryset=Tag.objects.order_by("pk")),
+        )
+    )
+
+
+def _write_chunk(index, chunk_size):
+    # chunk 마다 독립된 gzip member 로 압축 - 이어 붙이면 하나의 gzip 스트림이 됨
+    data = "".join(
+        json.dumps(product_to_dict(product), ensure_ascii=False) + "\n"
+        for product in _chunk_products(index, chunk_size)
+    ).encode()
+    _write_atomic(_path(CHUNK_DIR, "{}.gz".format(index)), gzip.compress(data, mtime=0))
+
+
+def _remove_old_snapshots(current):
+    names = sorted(
+        (
+            name
+            for name in os.listdir(_path())
+            if name.startswith("snapshot-") and name != current
+        ),
+        key=lambda name: os.path.getmtime(_path(name)),
+    )
+    for name in names[: max(0, len(names) - (KEEP_SNAPSHOTS - 1))]:
+        os.remove(_path(name))
+
+
+def build_snapshot(chunk_size=None, force=False):
+    # 이전 빌드 이후 바뀐 chunk 만 다시 압축하고, 압축된 chunk 를 이어 붙여 스냅샷 생성
+    # 반환값: (manifest, 다시 압축한 chunk 수)
+    chunk_size = chunk_size or settings.SHOP_SNAPSHOT_CHUNK_SIZE
+    os.makedirs(_path(CHUNK_DIR), exist_ok=True)
+
+    previous = _read_json(_path(CHUNKS_FILE))
+    if force or not previous or previous["chunk_size"] != chunk_size:
+        previous = {"chunk_size": chunk_size, "chunks": {}}
+
+    # 같은 읽기 트랜잭션에서 cursor 를 먼저 조회 - 스냅샷 이후 변경은 변경 피드로 동기화
+    with transaction.atomic():
+        cursor = latest_cursor()
+        fingerprints = _chunk_fingerprints(chunk_size)
+        changed = [
+            chunk
+            for chunk, fingerprint in fingerprints.items()
+            if previous["chunks"].get(chunk) != fingerprint
+        ]
+        for chunk in changed:
+            _write_chunk(int(chunk), chunk_size)
+
+    for chunk in set(previous["chunks"]).difference(fingerprints):
+        try:
+            os.remove(_path(CHUNK_DIR, "{}.gz".format(chunk)))
+        except FileNotFoundError:
+            pass
+
+    chunks = sorted(fingerprints, key=int)
+    etag = hashlib.sha1(
+        json.dumps([chunk_size, [[c, fingerprints[c]] for c in chunks]]).encode()
+    ).hexdigest()
+    name = "snapshot-{}.ndjson.gz".format(etag)
+    if not os.path.exists(_path(name)):
+        tmp = _path("{}.{}.tmp".format(name, os.getpid()))
+        with open(tmp, "wb") as out:
+            for chunk in chunks:
+                with open(_path(CHUNK_DIR, "{}.gz".format(chunk)), "rb") as f:
+                    shutil.copyfileobj(f, out)
+            # 상품이 없는 경우에도 유효한 gzip 파일
+            if not chunks:
+                out.write(gzip.compress(b"", mtime=0))
+        os.replace(tmp, _path(name))
+
+    _write_atomic(
+        _path(CHUNKS_FILE),
+        json.dumps({"chunk_size": chunk_size, "chunks": fingerprints}).encode(),
+    )
+    manifest = {
+        "file": name,
+        "etag": etag,
+        "cursor": cursor,
+        "products": sum(count for _, count in fingerprints.values()),
+        "built_at": time.time(),
+    }
+    _write_atomic(_path(MANIFEST_FILE), json.dumps(manifest).encode())
+    _remove_old_snapshots(name)
+    return manifest, len(changed)
+
+
+def current_snapshot():
+    # 마지막으로 생성된 스냅샷 manifest (없으면 None), DB 는 조회하지 않음
+    return _read_json(_path(MANIFEST_FILE))
+
+
+def snapshot_path(manifest):
+    return _path(manifest["file"])
@@ -0,0 +1,56 @@
+from django.conf import settings
+from .cache import invalidate_products
+from .changes import log_changes
+from .facets import product_tags, refresh_tag_facets
+from .models import CatalogState, Product
+from .search import refresh_search_index, delete_search_index
+
+__all__ = (
+    "products_changed",
+    "products_deleted",
+)
+
+
+def _refresh_products(pks, prices, search, facets=True):
+    products = Product.objects.filter(pk__in=pks)
+    if prices:
+        products.refresh_price_summary()
+    products.touch()
+    if pks and facets:
+        refresh_tag_facets(product_tags(pks))
+    if search:
+        refresh_search_index(pks)
+    log_changes(pks)
+
+
+def products_changed(pks, prices=True, created=False, search=True):
+    # 상품 / 옵션 / 태그 변경 후 파생 데이터 갱신, 쓰기와 같은 트랜잭션에서 호출
+    # created: pks 가 새로 추가된 상품 (전체 상품 수에 반영)
+    # search: 검색 문서 (상품명 / 옵션명 / 태그명) 가 바뀌지 않는 가격 변경은 False
+    # pk 가 많으면 SQLite 변수 수 제한을 넘지 않도록 SHOP_SYNC_CHUNK_SIZE 개씩 나눠 갱신
+    pks = list(pks)
+    chunk_size = settings.SHOP_SYNC_CHUNK_SIZE
+    if len(pks) <= chunk_size:
+        _refresh_products(pks, prices, search)
+    else:
+        # 여러 chunk 에 걸친 태그 요약은 chunk 마다가 아니라 태그별로 한번만 갱신
+        tags = set()
+        for start in range(0, len(pks), chunk_size):
+            chunk = pks[start : start + chunk_size]
+            _refresh_products(chunk, prices, search, facets=False)
+            tags.update(product_tags(chunk).values_list("tag", flat=True).distinct())
+        tags = sorted(tags)
+        for start in range(0, len(tags), chunk_size):
+            refresh_tag_facets(tags[start : start + chunk_size])
+    CatalogState.objects.bump(created=len(pks) if created else 0)
+    invalidate_products(pks)
+
+
+def products_deleted(pks):
+    # 상품 삭제 전에 같은 트랜잭션에서 호출
+    if pks:
+        refresh_tag_facets(product_tags(pks), exclude_products=list(pks))
+    delete_search_index(pks)
+    log_changes(pks, deleted=True)
+    CatalogState.objects.bump(deleted=len(pks))
+    invalidate_products(pks)
@@ -0,0 +1,218 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter, OrderedDict
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from rest_framework.exceptions import ValidationError
+from .cache import TAG_VERSION_KEY, current_versions
+from .models import Tag
+
+__all__ = (
+    "TagResolver",
+    "tag_resolver",
+    "TagIndex",
+    "tag_index",
+    "parse_tag_payload",
+    "resolve_tag_pks",
+    "resolve_tag_lists",
+)
+
+
+class TagResolver:
+    # 프로세스 로컬 태그명 -> pk LRU 캐시, 태그 변경 버전이 바뀌면 비움
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._pks = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _check_version(self):
+        version = current_versions([TAG_VERSION_KEY])[0]
+        if version != self._version:
+            self._pks.clear()
+            self._version = version
+
+    def _get_many(self, names):
+        found = {}
+        with self._lock:
+            self._check_version()
+            for name in names:
+                pk = self._pks.get(name)
+                if pk is not None:
+                    self._pks.move_to_end(name)
+                    found[name] = pk
+        return found
+
+    def _set_many(self, tag_pks, version):
+        with self._lock:
+            if version != self._version:
+                return
+            self._pks.update(tag_pks)
+            for name in tag_pks:
+                self._pks.move_to_end(name)
+            while len(self._pks) > self.maxsize:
+                self._pks.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._pks.clear()
+
+    def resolve(self, names, create=()):
+        # names 의 태그명 -> pk, create 의 태그명은 없으면 생성 (insert 1 + 조회 1)
+        tag_pks = self._get_many(names)
+        missing = set(names).difference(tag_pks)
+        if not missing:
+            return tag_pks
+
+        # 요청 순서대로 생성 (pk 순서 고정)
+        new_names = [name for name in names if name in missing and name in create]
+        if new_names:
+            Tag.objects.bulk_create(
+                [Tag(name=name) for name in new_names], ignore_conflicts=True
+            )
+        found = dict(Tag.objects.filter(name__in=missing).values_list("name", "pk"))
+        tag_pks.update(found)
+
+        # 롤백된 태그가 캐시에 남지 않도록 커밋 후에 저장
+        version = self._version
+        transaction.on_commit(lambda: self._set_many(found, version))
+        return tag_pks
+
+
+tag_resolver = TagResolver(settings.SHOP_TAG_CACHE_SIZE)
+
+
+class TagIndex:
+    # 프로세스 로컬 태그명 prefix 검색 인덱스 - 대소문자 구분 없이 정렬된 (태그명, pk) 리스트와
+    # 상품 수, 처음 검색할 때 상품 수가 많은 태그부터 maxsize 개를 조회해 생성
+    # 이 프로세스에서 추가된 상품 연결은 바로 반영하고, 다른 프로세스의 변경 / 연결 삭제는
+    # ttl 마다 다시 생성해 반영 (태그명 변경 / 삭제시에는 즉시)
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = []
+        self._counts = {}
+        self._version = None
+        self._built_at = None
+        self._lock = threading.Lock()
+
+    def _build(self, version):
+        rows = (
+            Tag.objects.annotate(product_count=Count("product"))
+            .order_by("-product_count", "pk")
+            .values_list("pk", "name", "product_count")[: self.maxsize]
+        )
+        self._entries = sorted((name.casefold(), name, pk) for pk, name, _ in rows)
+        self._counts = {pk: count for pk, _, count in rows}
+        self._version = version
+        self._built_at = time.monotonic()
+
+    def _check(self):
+        version = current_versions([TAG_VERSION_KEY])[0]
+        if (
+            self._built_at is None
+            or version != self._version
+            or time.monotonic() - self._built_at > self.ttl
+        ):
+            self._build(version)
+
+    def search(self, prefix, limit):
+        # 태그명 순서로 prefix 로 시작하는 태그 최대 limit 개 [(pk, 태그명, 상품 수)]
+        prefix = prefix.casefold()
+        with self._lock:
+            self._check()
+            found = []
+            index = bisect_left(self._entries, (prefix,))
+            for key, name, pk in self._entries[index : index + limit]:
+                if not key.startswith(prefix):
+                    break
+                found.append((pk, name, self._counts[pk]))
+        return found
+
+    def _add(self, names, counts, version):
+        with self._lock:
+            if version != self._version or self._built_at is None:
+                return
+            for pk, count in counts.items():
+                if pk in self._counts:
+                    self._counts[pk] += count
+                elif len(self._counts) < self.maxsize:
+                    # 가득 찬 경우 새 태그 (상품 수가 가장 적음) 는 다시 생성할 때 반영
+                    insort(self._entries, (names[pk].casefold(), names[pk], pk))
+                    self._counts[pk] = count
+
+    def add_links(self, tag_pks, link_lists):
+        # tag_pks: 태그명 -> pk, link_lists: 상품별 새로 연결한 태그 pk 리스트
+        # 롤백된 연결이 반영되지 않도록 커밋 후에 반영
+        counts = Counter(pk for pks in link_lists for pk in pks)
+        if not counts:
+            return
+        names = {pk: name for name, pk in tag_pks.items() if pk in counts}
+        version = self._version
+        transaction.on_commit(lambda: self._add(names, counts, version))
+
+    def clear(self):
+        with self._lock:
+            self._entries = []
+            self._counts = {}
+            self._version = self._built_at = None
+
+
+tag_index = TagIndex(settings.SHOP_TAG_INDEX_SIZE, settings.SHOP_TAG_INDEX_TTL)
+
+
+def parse_tag_payload(tag_data):
+    tags = []
+    for tag in tag_data:
+        if not isinstance(tag, dict) or "name" not in tag:
+            raise ValidationError("태그명은 필수 입력 값입니다.")
+        # 기존 태그 pk 와 비교할 수 있도록 숫자로 변환 ("1" 도 허용)
+        pk = tag.get("pk")
+        if pk is not None:
+            try:
+                pk = int(pk)
+            except (TypeError, ValueError):
+                raise ValidationError("태그 pk 는 숫자로 입력해야 합니다.")
+        tags.append((pk, tag["name"]))
+
+    if len({name for _, name in tags}) != len(tags):
+        raise ValidationError("태그명은 중복될 수 없습니다.")
+    return tags
+
+
+def resolve_tag_pks(tags, tag_pks=None):
+    # pk 없이 전달된 태그는 없으면 생성, pk 가 함께 전달된 태그는 기존 태그와 일치할 때만 연결
+    # tag_pks: 태그명 -> pk (갱신됨)
+    return resolve_tag_lists([tags], tag_pks)[0]
+
+
+def resolve_tag_lists(tag_lists, tag_pks=None):
+    # 여러 상품의 태그를 한번의 조회로 확인하고 없는 태그만 생성
+    # tag_pks: 태그명 -> pk (갱신됨), 반환값은 상품별 연결할 태그 pk 리스트
+    if tag_pks is None:
+        tag_pks = {}
+
+    # 요청 순서를 유지하는 태그명 집합
+    names = {}
+    create = set()
+    for tags in tag_lists:
+        for tag_pk, tag_name in tags:
+            names[tag_name] = None
+            if tag_pk is None:
+                create.add(tag_name)
+
+    unknown = [name for name in names if name not in tag_pks]
+    if unknown:
+        tag_pks.update(tag_resolver.resolve(unknown, create=create))
+
+    # pk 가 함께 전달된 경우 기존 태그와 일치할 때만 연결
+    return [
+        [
+            tag_pks[tag_name]
+            for tag_pk, tag_name in tags
+            if tag_name in tag_pks and (tag_pk is None or tag_pks[tag_name] == tag_pk)
+        ]
+        for tags in tag_lists
+    ]
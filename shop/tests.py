@@ -1,8 +1,59 @@
+import asyncio
+import base64
+import csv
+import gzip
+import io
+import json
+import os
 import pytest
+import sqlite3
+import threading
 from collections import OrderedDict
+from urllib.parse import urlencode
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import DatabaseError, connection, connections, transaction
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
-from .models import Product, ProductOption, Tag
+from config.asgi import ThreadPoolASGIHandler
+from .models import CatalogState, ImportProgress, Product, ProductOption, Tag, TagFacet
+from .views import ProductViewSet
+from .middleware import QueryBudgetExceeded
+from .cache import invalidate_products
+from .metrics import MetricsFile, collect, render_prometheus
+from .tags import tag_resolver, tag_index, resolve_tag_pks
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budget(settings):
+    # 쿼리 예산 초과시 경고 대신 QueryBudgetExceeded
+    settings.SHOP_QUERY_BUDGET_STRICT = True
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(settings, tmp_path):
+    # 프로세스별 지표 파일을 테스트마다 새 디렉토리에 기록
+    settings.SHOP_METRICS_DIR = str(tmp_path / "metrics")
+    return settings.SHOP_METRICS_DIR
+
+
+@pytest.fixture(autouse=True)
+def snapshot_dir(settings, tmp_path):
+    settings.SHOP_SNAPSHOT_DIR = str(tmp_path / "snapshot")
+    return settings.SHOP_SNAPSHOT_DIR
+
+
+@pytest.fixture(autouse=True)
+def clear_shop_cache():
+    caches[settings.SHOP_RESPONSE_CACHE].clear()
+    caches[settings.SHOP_VERSION_CACHE].clear()
+    tag_resolver.clear()
+    tag_index.clear()
 
 
 # Shop/product GET TEST
@@ -63,235 +114,2644 @@ class TestProductGetAPI:
 
         response = self.client.get(self.url, format="json")
         assert response.status_code == 200
-        assert response.data == request_data
+        assert response.data["results"] == request_data
+        assert response.data["next"] is None
 
 
-# Shop/product POST TEST
+# Shop/product GET (cursor pagination) TEST
 @pytest.mark.django_db
-class TestProductPostAPI:
+class TestProductPaginationAPI:
     def setup_method(cls):
         cls.client = APIClient()
         cls.url = reverse("product-list")
-        Tag.objects.create(name="ExistTag")
+        tag = Tag.objects.create(name="ExistTag")
+        for i in range(5):
+            product = Product.objects.create(name=f"TestProduct{i+1}")
+            ProductOption.objects.create(product=product, name="TestOption", price=500)
+            product.tag_set.add(tag)
 
-    def test_create_product_success(self):
+    def test_view_product_list_follow_cursor(self):
+        names = []
+        url = self.url + "?page_size=2"
+        while url:
+            response = self.client.get(url, format="json")
+            assert response.status_code == 200
+            assert len(response.data["results"]) <= 2
+            names += [product["name"] for product in response.data["results"]]
+            url = response.data["next"]
+        assert names == [f"TestProduct{i+1}" for i in range(5)]
+
+    def test_view_product_list_page_size_max(self, monkeypatch):
+        monkeypatch.setattr(ProductViewSet.pagination_class, "max_page_size", 3)
+        response = self.client.get(self.url + "?page_size=100000", format="json")
+        assert response.status_code == 200
+        assert len(response.data["results"]) == 3
+
+    def test_view_product_list_query_count(self, django_assert_num_queries):
+        response = self.client.get(self.url + "?page_size=2", format="json")
+        # 페이지 깊이와 무관하게 ETag 집계 1 + 상품 1 + prefetch 2 쿼리
+        with django_assert_num_queries(4):
+            response = self.client.get(response.data["next"], format="json")
+        assert response.status_code == 200
+        assert [product["name"] for product in response.data["results"]] == [
+            "TestProduct3",
+            "TestProduct4",
+        ]
+
+    def test_view_product_list_fail_invalid_cursor(self):
+        response = self.client.get(self.url + "?cursor=invalid", format="json")
+        assert response.status_code == 404
+        for position in ['["a"]', "[1, 2]", "{}", "[null]"]:
+            cursor = base64.b64encode(urlencode({"p": position}).encode()).decode()
+            response = self.client.get(self.url, {"cursor": cursor}, format="json")
+            assert response.status_code == 404
+
+
+# Shop/product GET (sparse fieldsets) TEST
+@pytest.mark.django_db
+class TestProductSparseFieldsAPI:
+    def setup_method(cls):
+        cls.client = APIClient()
+        cls.url = reverse("product-list")
+        tag = Tag.objects.create(name="ExistTag")
+        for i in range(3):
+            product = Product.objects.create(name=f"TestProduct{i+1}")
+            ProductOption.objects.create(
+                product=product, name="TestOption", price=(3 - i) * 500
+            )
+            product.tag_set.add(tag)
+        Product.objects.refresh_price_summary()
+
+    def test_view_product_list_fields_name_only(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url + "?fields=pk,name", format="json")
+        assert response.status_code == 200
+        assert response.data["results"] == [
+            {"pk": i + 1, "name": f"TestProduct{i+1}"} for i in range(3)
+        ]
+        # ETag 집계 외에 prefetch 없이 상품 pk / name 만 조회
+        assert len(queries) == 2
+        sql = queries[1]["sql"]
+        assert '"shop_product"."name"' in sql
+        assert "min_price" not in sql and "option_count" not in sql
+
+    def test_view_product_list_fields_prune_prefetch(self, django_assert_num_queries):
+        with django_assert_num_queries(3):
+            response = self.client.get(self.url + "?fields=name,tag_set", format="json")
+        assert response.data["results"][0] == {
+            "name": "TestProduct1",
+            "tag_set": [{"pk": 1, "name": "ExistTag"}],
+        }
+
+    def test_view_product_list_fields_ordering_cursor(self):
+        names = []
+        url = self.url + "?fields=name&ordering=min_price&page_size=2"
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, format="json")
+            assert len(queries) == 2
+            names += [product["name"] for product in response.data["results"]]
+            url = response.data["next"]
+        assert names == ["TestProduct3", "TestProduct2", "TestProduct1"]
+
+    def test_view_product_detail_fields(self, django_assert_num_queries):
+        url = reverse("product-detail", kwargs={"pk": 1})
+        with django_assert_num_queries(3):
+            response = self.client.get(url + "?fields=pk,option_set", format="json")
+        assert response.data == {
+            "pk": 1,
+            "option_set": [{"pk": 1, "name": "TestOption", "price": 1500}],
+        }
+
+    def test_view_product_search_fields(self):
+        call_command("rebuild_search_index")
+        response = self.client.get(self.url, {"q": "TestProduct2", "fields": "name"})
+        assert response.status_code == 200
+        assert response.data["results"] == [{"name": "TestProduct2"}]
+
+    def test_view_product_list_fail_unknown_field(self):
+        response = self.client.get(self.url + "?fields=name,price", format="json")
+        assert response.status_code == 400
+        response = self.client.get(self.url + "?fields=", format="json")
+        assert response.status_code == 400
+
+
+# Shop/product GET (values() serializer) TEST
+@pytest.mark.django_db
+class TestProductFastReadAPI:
+    def setup_method(cls):
+        cls.client = APIClient()
+        cls.url = reverse("product-list")
+        tags = [Tag.objects.create(name=f"TestTag{i+1}") for i in range(3)]
+        for i in range(4):
+            product = Product.objects.create(name=f"TestProduct{i+1}")
+            for j in range(i):
+                ProductOption.objects.create(
+                    product=product, name=f"TestOption{j+1}", price=(3 - j) * 500
+                )
+            product.tag_set.set(tags[i:])
+        Product.objects.refresh_price_summary()
+
+    def get_both(self, settings, url):
+        # 같은 요청을 values() 직렬화 / ProductSerializer 로 각각 응답
+        contents = []
+        for fast_read in (True, False):
+            settings.SHOP_FAST_READ = fast_read
+            caches[settings.SHOP_RESPONSE_CACHE].clear()
+            response = self.client.get(url, format="json")
+            contents.append((response.status_code, response.content))
+        return contents
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            "",
+            "?page_size=2",
+            "?fields=name,tag_set",
+            "?ordering=-max_price&fields=pk",
+            "?price_gte=1000",
+        ],
+    )
+    def test_view_product_list_fast_read_same_content(self, settings, params):
+        fast, model = self.get_both(settings, self.url + params)
+        assert fast == model
+        assert fast[0] == 200
+
+    def test_view_product_list_fast_read_follow_cursor(self, settings):
+        url = self.url + "?page_size=1&ordering=min_price"
+        while url:
+            fast, model = self.get_both(settings, url)
+            assert fast == model
+            url = json.loads(fast[1])["next"]
+
+    @pytest.mark.parametrize("pk", [1, 2, 4, 100])
+    def test_view_product_detail_fast_read_same_content(self, settings, pk):
+        url = reverse("product-detail", kwargs={"pk": pk})
+        fast, model = self.get_both(settings, url)
+        assert fast == model
+        fast, model = self.get_both(settings, url + "?fields=option_set")
+        assert fast == model
+
+    def test_view_product_list_fast_read_query_count(self, django_assert_num_queries):
+        # ETag 집계 + 상품 / 옵션 / 태그 연결 (태그명 join) 각 1 쿼리
+        with django_assert_num_queries(4):
+            response = self.client.get(self.url, format="json")
+        assert response.data["results"][3] == {
+            "pk": 4,
+            "name": "TestProduct4",
+            "option_set": [
+                {"pk": 4, "name": "TestOption1", "price": 1500},
+                {"pk": 5, "name": "TestOption2", "price": 1000},
+                {"pk": 6, "name": "TestOption3", "price": 500},
+            ],
+            "tag_set": [],
+        }
+
+
+# Shop/product GET (ETag / Last-Modified) TEST
+@pytest.mark.django_db
+class TestProductConditionalAPI:
+    def setup_method(cls):
+        cls.client = APIClient()
+        cls.url = reverse("product-list")
+        cls.detail_url = reverse("product-detail", kwargs={"pk": 1})
+        request_data = [
+            {
+                "name": f"TestProduct{i+1}",
+                "option_set": [{"name": "TestOption", "price": 500}],
+                "tag_set": [{"name": "ExistTag"}],
+            }
+            for i in range(2)
+        ]
+        cls.client.post(reverse("product-bulk"), request_data, format="json")
+
+    def test_view_product_list_etag(self, django_assert_num_queries):
+        response = self.client.get(self.url, format="json")
+        assert response.status_code == 200
+        etag = response["ETag"]
+        assert response.has_header("Last-Modified")
+
+        # 캐시된 응답도 직렬화 / 쿼리 없이 304
+        with django_assert_num_queries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+
+        # 캐시가 없어도 상품 테이블 집계 없이 CatalogState 한 행 조회로 304
+        caches[settings.SHOP_RESPONSE_CACHE].clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+        assert len(context.captured_queries) == 1
+        sql = context.captured_queries[0]["sql"]
+        assert "shop_catalogstate" in sql and "shop_product" not in sql
+
+    def test_catalog_state(self):
+        state = CatalogState.objects.current()
+        assert state["product_count"] == 2
+        self.client.post(
+            self.url,
+            {"name": "TestProduct3", "option_set": [], "tag_set": []},
+            format="json",
+        )
+        self.client.delete(reverse("product-list"), [1, 2], format="json")
+        current = CatalogState.objects.current()
+        assert current["product_count"] == 1
+        assert current["version"] == state["version"] + 2
+        assert current["updated_at"] > state["updated_at"]
+
+    def test_catalog_state_admin(self, admin_client):
+        response = admin_client.post(
+            reverse("admin:shop_product_add"), {"name": "TestProduct3", "tag_set": []}
+        )
+        assert response.status_code == 302
+        assert CatalogState.objects.current()["product_count"] == 3
+        response = admin_client.post(
+            reverse("admin:shop_product_change", args=[3]),
+            {"name": "ChangedProduct3", "tag_set": []},
+        )
+        assert response.status_code == 302
+        assert CatalogState.objects.current()["product_count"] == 3
+
+    def test_view_product_list_etag_query_params(self):
+        etag = self.client.get(self.url, format="json")["ETag"]
+        response = self.client.get(
+            self.url + "?fields=name", format="json", HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_view_product_etag_changes_on_write(self):
+        list_etag = self.client.get(self.url, format="json")["ETag"]
+        detail_etag = self.client.get(self.detail_url, format="json")["ETag"]
+        version = Product.objects.get(pk=1).version
+
+        request_data = {
+            "pk": 1,
+            "name": "TestProduct1",
+            "option_set": [{"name": "NewOption", "price": 1000}],
+            "tag_set": [],
+        }
+        self.client.patch(self.detail_url, request_data, format="json")
+        product = Product.objects.get(pk=1)
+        assert product.version > Product.objects.get(pk=2).version
+        assert product.version > version
+
+        response = self.client.get(
+            self.url, format="json", HTTP_IF_NONE_MATCH=list_etag
+        )
+        assert response.status_code == 200
+        assert response["ETag"] != list_etag
+        response = self.client.get(
+            self.detail_url, format="json", HTTP_IF_NONE_MATCH=detail_etag
+        )
+        assert response.status_code == 200
+        assert response.data["option_set"][0]["name"] == "NewOption"
+
+    def test_view_product_etag_changes_on_tag_rename(self):
+        detail_etag = self.client.get(self.detail_url, format="json")["ETag"]
+        tag = Tag.objects.get(name="ExistTag")
+        tag.name = "RenamedTag"
+        tag.save()
+
+        response = self.client.get(
+            self.detail_url, format="json", HTTP_IF_NONE_MATCH=detail_etag
+        )
+        assert response.status_code == 200
+        assert response.data["tag_set"] == [{"pk": tag.pk, "name": "RenamedTag"}]
+
+    def test_view_product_list_etag_changes_on_destroy(self):
+        list_etag = self.client.get(self.url, format="json")["ETag"]
+        self.client.delete(reverse("product-detail", kwargs={"pk": 2}))
+        response = self.client.get(
+            self.url, format="json", HTTP_IF_NONE_MATCH=list_etag
+        )
+        assert response.status_code == 200
+        assert len(response.data["results"]) == 1
+
+    def test_view_product_detail_not_found_without_etag(self):
+        response = self.client.get(reverse("product-detail", kwargs={"pk": 100}))
+        assert response.status_code == 404
+        assert not response.has_header("ETag")
+
+
+# Shop/product GET (response cache) TEST
+@pytest.mark.django_db
+class TestProductCacheAPI:
+    def setup_method(cls):
+        cls.client = APIClient()
+        cls.url = reverse("product-list")
+        cls.detail_url = reverse("product-detail", kwargs={"pk": 1})
+        product = Product.objects.create(name="TestProduct")
+        ProductOption.objects.create(product=product, name="TestOption1", price=1000)
+        product.tag_set.add(Tag.objects.create(name="ExistTag"))
+
+    def test_view_product_cache_hit_without_query(self, django_assert_num_queries):
+        list_response = self.client.get(self.url, format="json")
+        detail_response = self.client.get(self.detail_url, format="json")
+
+        with django_assert_num_queries(0):
+            assert self.client.get(self.url, format="json").data == list_response.data
+            assert (
+                self.client.get(self.detail_url, format="json").data
+                == detail_response.data
+            )
+
+    def test_view_product_cache_key_query_params(self):
+        self.client.get(self.url + "?page_size=5", format="json")
+        Product.objects.create(name="TestProduct2")
+
+        # 다른 query parameter 는 별도로 캐시됨
+        response = self.client.get(self.url + "?page_size=10", format="json")
+        assert len(response.data["results"]) == 2
+
+    def test_view_product_cache_invalidate_create(self):
+        self.client.get(self.url, format="json")
+        request_data = {"name": "TestProduct2", "option_set": [], "tag_set": []}
+        response = self.client.post(self.url, request_data, format="json")
+        assert response.status_code == 201
+
+        response = self.client.get(self.url, format="json")
+        assert [product["name"] for product in response.data["results"]] == [
+            "TestProduct",
+            "TestProduct2",
+        ]
+
+    def test_view_product_cache_invalidate_partial_update(self):
+        self.client.get(self.url, format="json")
+        self.client.get(self.detail_url, format="json")
         request_data = {
+            "pk": 1,
             "name": "TestProduct",
+            "option_set": [{"pk": 1, "name": "Edit TestOption1", "price": 1500}],
+            "tag_set": [],
+        }
+        response = self.client.patch(self.detail_url, request_data, format="json")
+        assert response.status_code == 200
+
+        response = self.client.get(self.detail_url, format="json")
+        assert response.data["option_set"][0]["name"] == "Edit TestOption1"
+        response = self.client.get(self.url, format="json")
+        assert response.data["results"][0]["option_set"][0]["price"] == 1500
+
+    def test_view_product_cache_invalidate_update(self):
+        self.client.get(self.detail_url, format="json")
+        response = self.client.put(
+            self.detail_url, {"name": "Edit TestProduct"}, format="json"
+        )
+        assert response.status_code == 200
+
+        response = self.client.get(self.detail_url, format="json")
+        assert response.data["name"] == "Edit TestProduct"
+
+    def test_view_product_cache_invalidate_destroy(self):
+        self.client.get(self.url, format="json")
+        self.client.get(self.detail_url, format="json")
+        response = self.client.delete(self.detail_url, format="json")
+        assert response.status_code == 204
+
+        assert self.client.get(self.detail_url, format="json").status_code == 404
+        assert self.client.get(self.url, format="json").data["results"] == []
+
+    def test_view_product_cache_shared_version(self):
+        self.client.get(self.detail_url, format="json")
+        Product.objects.filter(pk=1).update(name="Edit TestProduct")
+
+        # 다른 워커 프로세스의 쓰기 - 공유 버전 캐시만 갱신됨
+        invalidate_products([1])
+        response = self.client.get(self.detail_url, format="json")
+        assert response.data["name"] == "Edit TestProduct"
+
+    def test_view_product_cache_invalidate_many(self, settings):
+        settings.SHOP_INVALIDATE_PRODUCT_LIMIT = 1
+        self.client.get(self.detail_url, format="json")
+        Product.objects.filter(pk=1).update(name="Edit TestProduct")
+
+        # 상품별 버전 키 대신 전체 상품 버전만 갱신
+        version_cache = caches[settings.SHOP_VERSION_CACHE]
+        version = version_cache.get("shop:version:product:1")
+        invalidate_products([1, 2])
+        assert version_cache.get("shop:version:product:1") == version
+        response = self.client.get(self.detail_url, format="json")
+        assert response.data["name"] == "Edit TestProduct"
+
+
+# Query budget middleware TEST
+@pytest.mark.django_db
+class TestQueryBudgetMiddleware:
+    def setup_method(cls):
+        cls.client = APIClient()
+        cls.url = reverse("product-detail", kwargs={"pk": 1})
+        product = Product.objects.create(name="TestProduct")
+        ProductOption.objects.create(product=product, name="TestOption", price=500)
+
+    def test_server_timing_header(self):
+        response = self.client.get(self.url, format="json")
+        assert response.status_code == 200
+        assert 'desc="4 queries"' in response["Server-Timing"]
+        assert "app;dur=" in response["Server-Timing"]
+
+        # 캐시 히트는 쿼리 없음
+        response = self.client.get(self.url, format="json")
+        assert 'desc="0 queries"' in response["Server-Timing"]
+
+    def test_query_budget_exceeded_strict(self, monkeypatch):
+        monkeypatch.setattr(ProductViewSet, "query_budgets", {"retrieve": 3})
+        with pytest.raises(QueryBudgetExceeded):
+            self.client.get(self.url, format="json")
+
+    def test_query_budget_exceeded_warning(self, settings, monkeypatch, caplog):
+        settings.SHOP_QUERY_BUDGET_STRICT = False
+        monkeypatch.setattr(ProductViewSet, "query_budgets", {"retrieve": 3})
+        response = self.client.get(self.url, format="json")
+        assert response.status_code == 200
+        assert "ProductViewSet.retrieve: 쿼리 4 개 실행 (예산 3 개)" in caplog.text
+
+    def test_query_budget_settings_override(self, settings):
+        settings.SHOP_QUERY_BUDGETS = {"product-detail": 1}
+        with pytest.raises(QueryBudgetExceeded):
+            self.client.get(self.url, format="json")
+
+
+# Metrics (shop.metrics) TEST
+@pytest.mark.django_db
+class TestMetrics:
+    def setup_method(cls):
+        cls.client = APIClient()
+        cls.url = reverse("metrics")
+        product = Product.objects.create(name="TestProduct")
+        ProductOption.objects.create(product=product, name="TestOption", price=500)
+
+    def test_record_viewset_actions(self):
+        self.client.get(reverse("product-list"), format="json")
+        self.client.get(reverse("product-detail", kwargs={"pk": 1}), format="json")
+        self.client.get(reverse("product-detail", kwargs={"pk": 999}), format="json")
+
+        values = collect()
+        label = 'action="ProductViewSet.retrieve"'
+        assert values["shop_requests_total{{{}}}".format(label)] == 2
+        assert values['shop_request_errors_total{{{},class="4xx"}}'.format(label)] == 1
+        assert values['shop_requests_total{action="ProductViewSet.list"}'] == 1
+        # 상세 조회 4 개 + 존재하지 않는 상품 2 개
+        assert values["shop_db_queries_total{{{}}}".format(label)] == 6
+        assert values["shop_db_duration_seconds_total{{{}}}".format(label)] > 0
+        assert values["shop_response_bytes_total{{{}}}".format(label)] > 0
+
+    def test_skip_non_viewset_requests(self, settings):
+        settings.SHOP_METRICS_TOKEN = "secret"
+        self.client.get(self.url, HTTP_AUTHORIZATION="Bearer secret")
+        assert collect() == {}
+
+    def test_streaming_response_bytes(self):
+        response = self.client.get(reverse("product-export"))
+        size = len(b"".join(response.streaming_content))
+
+        values = collect()
+        assert (
+            values['shop_response_bytes_total{action="ProductViewSet.export"}'] == size
+        )
+
+    def test_prometheus_endpoint(self, settings):
+        settings.SHOP_METRICS_TOKEN = "secret"
+        for _ in range(3):
+            self.client.get(reverse("product-list"), format="json")
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION="Bearer secret")
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/plain; version=0.0.4"
+        text = response.content.decode()
+        assert "# TYPE shop_request_duration_seconds histogram" in text
+        assert "# TYPE shop_requests_total counter" in text
+        assert (
+            'shop_request_duration_seconds_bucket{action="ProductViewSet.list",'
+            'le="+Inf"} 3' in text
+        )
+        assert (
+            'shop_request_duration_seconds_count{action="ProductViewSet.list"} 3'
+            in text
+        )
+
+    def test_prometheus_endpoint_not_allowed(self, settings):
+        # 토큰이 없으면 로컬 (프록시) 에서 온 요청도 거부
+        response = self.client.get(self.url, REMOTE_ADDR="127.0.0.1")
+        assert response.status_code == 404
+
+        settings.SHOP_METRICS_TOKEN = "secret"
+        for authorization in ["", "Bearer", "Bearer wrong", "secret"]:
+            response = self.client.get(
+                self.url, REMOTE_ADDR="127.0.0.1", HTTP_AUTHORIZATION=authorization
+            )
+            assert response.status_code == 404
+
+    def test_aggregate_process_files(self, metrics_dir):
+        # 다른 워커 프로세스의 파일도 합산
+        os.makedirs(metrics_dir)
+        first = MetricsFile(os.path.join(metrics_dir, "metrics-1.db"))
+        second = MetricsFile(os.path.join(metrics_dir, "metrics-2.db"))
+        first.increment_many([('shop_requests_total{action="A.list"}', 2)])
+        second.increment_many([('shop_requests_total{action="A.list"}', 3)])
+        second.increment_many([('shop_requests_total{action="A.create"}', 1)])
+        first.close()
+        second.close()
+
+        values = collect()
+        assert values['shop_requests_total{action="A.list"}'] == 5
+        assert values['shop_requests_total{action="A.create"}'] == 1
+
+        # 다시 열어도 기존 값에 이어서 기록
+        first = MetricsFile(os.path.join(metrics_dir, "metrics-1.db"))
+        first.increment_many([('shop_requests_total{action="A.list"}', 1)])
+        first.close()
+        assert collect()['shop_requests_total{action="A.list"}'] == 6
+
+    def test_grow_file(self, metrics_dir):
+        os.makedirs(metrics_dir)
+        metrics_file = MetricsFile(os.path.join(metrics_dir, "metrics-1.db"))
+        keys = ['shop_requests_total{{action="A.a{}"}}'.format(i) for i in range(3000)]
+        metrics_file.increment_many([(key, 1) for key in keys])
+        metrics_file.close()
+
+        values = collect()
+        assert len(values) == 3000
+        assert os.path.getsize(os.path.join(metrics_dir, "metrics-1.db")) > (
+            MetricsFile.initial_size
+        )
+
+    def test_render_cumulative_buckets(self):
+        text = render_prometheus(
+            {
+                'shop_request_duration_seconds_bucket{action="A.list",le="0.005"}': 1,
+                'shop_request_duration_seconds_bucket{action="A.list",le="0.1"}': 2,
+                'shop_request_duration_seconds_sum{action="A.list"}': 0.15,
+                'shop_request_duration_seconds_count{action="A.list"}': 3,
+            }
+        )
+        lines = text.splitlines()
+        assert (
+            'shop_request_duration_seconds_bucket{action="A.list",le="0.005"} 1'
+            in lines
+        )
+        assert (
+            'shop_request_duration_seconds_bucket{action="A.list",le="0.05"} 1' in lines
+        )
+        assert (
+            'shop_request_duration_seconds_bucket{action="A.list",le="0.1"} 3' in lines
+        )
+        assert (
+            'shop_request_duration_seconds_bucket{action="A.list",le="+Inf"} 3' in lines
+        )
+        assert 'shop_request_duration_seconds_sum{action="A.list"} 0.15' in lines
+
+
+# Admin changelist TEST
+@pytest.mark.django_db
+class TestAdminChangelist:
+    def setup_method(cls):
+        tags = [Tag.objects.create(name=f"TestTag{i}") for i in range(3)]
+        for i in range(30):
+            product = Product.objects.create(name=f"TestProduct{i}")
+            for j in range(2):
+                ProductOption.objects.create(
+                    product=product, name=f"TestOption{j}", price=i * 100 + j
+                )
+            product.tag_set.set(tags[: i % 3 + 1])
+        Product.objects.refresh_price_summary()
+
+    def count_queries(self, client, name):
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(reverse(name))
+        assert response.status_code == 200
+        return len(captured), response
+
+    @pytest.mark.parametrize(
+        "name, model, rows",
+        [
+            ("admin:shop_product_changelist", Product, 30),
+            ("admin:shop_productoption_changelist", ProductOption, 60),
+        ],
+    )
+    def test_changelist_query_count(self, admin_client, monkeypatch, name, model, rows):
+        # 페이지 크기와 관계없이 같은 쿼리 수
+        monkeypatch.setattr(admin.site._registry[model], "list_per_page", 5)
+        small, _ = self.count_queries(admin_client, name)
+        monkeypatch.setattr(admin.site._registry[model], "list_per_page", 100)
+        large, response = self.count_queries(admin_client, name)
+        assert small == large == settings.SHOP_QUERY_BUDGETS[name]["GET"]
+        assert len(response.context["cl"].result_list) == rows
+
+    def test_changelist_summary(self, admin_client):
+        _, response = self.count_queries(admin_client, "admin:shop_product_changelist")
+        product = next(
+            product for product in response.context["cl"].result_list if product.pk == 3
+        )
+        assert product.tag_count == 3
+        assert product.option_count == 2
+        assert [tag.name for tag in product.tag_set_list] == [
+            "TestTag0",
+            "TestTag1",
+            "TestTag2",
+        ]
+        assert [option.name for option in product.option_list] == [
+            "TestOption0",
+            "TestOption1",
+        ]
+
+    def test_changelist_estimated_count(self, admin_client, settings):
+        Product.objects.filter(pk__in=[1, 2]).delete()
+        _, response = self.count_queries(admin_client, "admin:shop_product_changelist")
+        assert response.context["cl"].result_count == 28
+
+        # 최대 pk 로 추정
+        settings.SHOP_ADMIN_EXACT_COUNT_LIMIT = 10
+        _, response = self.count_queries(admin_client, "admin:shop_product_changelist")
+        assert response.context["cl"].result_count == 30
+
+    def test_changelist_delete_selected(self, admin_client):
+        response = admin_client.post(
+            reverse("admin:shop_product_changelist"),
+            {"action": "delete_selected", "_selected_action": [1, 2], "post": "yes"},
+        )
+        assert response.status_code == 302
+        assert Product.objects.count() == 28
+        assert ProductOption.objects.count() == 56
+
+
+# SQLite profile (SHOP_DB_PROFILE) TEST
+@pytest.mark.django_db
+class TestSQLiteProfile:
+    def connect(self, tmp_path):
+        # 테스트 DB (메모리) 대신 임시 파일 DB 연결
+        settings_dict = dict(connections["default"].settings_dict)
+        settings_dict["NAME"] = str(tmp_path / "db.sqlite3")
+        return connections["default"].__class__(settings_dict, alias="profile")
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute("PRAGMA {}".format(name))
+            return cursor.fetchone()[0]
+
+    def test_production_pragmas(self, settings, tmp_path):
+        settings.SHOP_DB_PROFILE = "production"
+        wrapper = self.connect(tmp_path)
+        try:
+            assert self.pragma(wrapper, "journal_mode") == "wal"
+            # NORMAL
+            assert self.pragma(wrapper, "synchronous") == 1
+            assert self.pragma(wrapper, "cache_size") == -64 * 1024
+            assert self.pragma(wrapper, "busy_timeout") == 5000
+            assert self.pragma(wrapper, "mmap_size") == 256 * 1024 * 1024
+        finally:
+            wrapper.close()
+
+    def test_default_pragmas(self, settings, tmp_path):
+        settings.SHOP_DB_PROFILE = "default"
+        wrapper = self.connect(tmp_path)
+        try:
+            assert self.pragma(wrapper, "journal_mode") == "delete"
+            # FULL
+            assert self.pragma(wrapper, "synchronous") == 2
+        finally:
+            wrapper.close()
+
+    def test_pragmas_not_counted(self, settings, tmp_path):
+        # 연결 생성시 PRAGMA 는 요청 쿼리 수에 포함되지 않음
+        settings.SHOP_DB_PROFILE = "production"
+        wrapper = self.connect(tmp_path)
+        executed = []
+
+        def wrapper_hook(execute, sql, params, many, context):
+            executed.append(sql)
+            return execute(sql, params, many, context)
+
+        try:
+            with wrapper.execute_wrapper(wrapper_hook):
+                assert self.pragma(wrapper, "synchronous") == 1
+            assert executed == ["PRAGMA synchronous"]
+        finally:
+            wrapper.close()
+
+
+# Shop/product price summary TEST
+@pytest.mark.django_db
+class TestProductPriceSummaryAPI:
+    def setup_method(cls):
+        cls.client = APIClient()
+        cls.url = reverse("product-list")
+        for name, prices in [
+            ("TestProduct1", [3000, 1000]),
+            ("TestProduct2", [500]),
+            ("TestProduct3", []),
+            ("TestProduct4", [2000, 4000]),
+        ]:
+            product = Product.objects.create(name=name)
+            for price in prices:
+                ProductOption.objects.create(
+                    product=product, name="TestOption", price=price
+                )
+        Product.objects.refresh_price_summary()
+
+    def get_names(self, query):
+        response = self.client.get(self.url + query, format="json")
+        assert response.status_code == 200
+        return [product["name"] for product in response.data["results"]]
+
+    def test_product_price_summary_create(self):
+        request_data = {
+            "name": "TestProduct5",
             "option_set": [
                 {"name": "TestOption1", "price": 1000},
-                {"name": "TestOption2", "price": 500},
-                {"name": "TestOption3", "price": 0},
+                {"name": "TestOption2", "price": 200},
             ],
-            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"name": "NewTag"}],
+            "tag_set": [],
         }
-        response_data = {
+        response = self.client.post(self.url, request_data, format="json")
+        product = Product.objects.get(pk=response.data["pk"])
+        assert (product.min_price, product.max_price, product.option_count) == (
+            200,
+            1000,
+            2,
+        )
+
+    def test_product_price_summary_partial_update(self):
+        request_data = {
             "pk": 1,
-            "name": "TestProduct",
+            "name": "TestProduct1",
             "option_set": [
-                {"pk": 1, "name": "TestOption1", "price": 1000},
-                {"pk": 2, "name": "TestOption2", "price": 500},
-                {"pk": 3, "name": "TestOption3", "price": 0},
+                {"pk": 1, "name": "TestOption", "price": 5000},
+                {"name": "NewOption", "price": 100},
             ],
-            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"pk": 2, "name": "NewTag"}],
+            "tag_set": [],
         }
-        response = self.client.post(self.url, request_data, format="json")
-        assert response.status_code == 201
-        assert Product.objects.count() == 1
-        assert response.data == response_data
-        product = Product.objects.first()
+        url = reverse("product-detail", kwargs={"pk": 1})
+        response = self.client.patch(url, request_data, format="json")
+        assert response.status_code == 200
+        product = Product.objects.get(pk=1)
+        assert (product.min_price, product.max_price, product.option_count) == (
+            100,
+            5000,
+            2,
+        )
+
+        request_data["option_set"] = []
+        self.client.patch(url, request_data, format="json")
+        product = Product.objects.get(pk=1)
+        assert (product.min_price, product.max_price, product.option_count) == (
+            None,
+            None,
+            0,
+        )
+
+    def test_product_price_summary_bulk_create(self):
+        request_data = [
+            {
+                "name": "TestProduct5",
+                "option_set": [{"name": "TestOption", "price": 700}],
+                "tag_set": [],
+            }
+        ]
+        response = self.client.post(
+            reverse("product-bulk"), request_data, format="json"
+        )
+        product = Product.objects.get(pk=response.data[0]["pk"])
+        assert (product.min_price, product.max_price, product.option_count) == (
+            700,
+            700,
+            1,
+        )
+
+    def test_view_product_list_ordering_price(self):
+        assert self.get_names("?ordering=min_price") == [
+            "TestProduct2",
+            "TestProduct1",
+            "TestProduct4",
+        ]
+        assert self.get_names("?ordering=-max_price") == [
+            "TestProduct4",
+            "TestProduct1",
+            "TestProduct2",
+        ]
+
+    def test_view_product_list_ordering_price_cursor(self):
+        names = []
+        url = self.url + "?ordering=min_price&page_size=1"
+        while url:
+            response = self.client.get(url, format="json")
+            names += [product["name"] for product in response.data["results"]]
+            url = response.data["next"]
+        assert names == ["TestProduct2", "TestProduct1", "TestProduct4"]
+
+    @pytest.mark.parametrize("ordering", ["min_price", "-max_price"])
+    def test_view_product_list_ordering_price_ties(self, ordering):
+        # offset_cutoff (1000) 보다 많은 같은 가격도 (가격, pk) 커서로 모두 한번씩 조회
+        Product.objects.bulk_create(
+            Product(name="Sale", min_price=1500, max_price=1500, option_count=1)
+            for _ in range(1250)
+        )
+        pks, pages = [], []
+        url = self.url + "?ordering={}&page_size=100".format(ordering)
+        while url:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url, format="json")
+            assert response.status_code == 200
+            assert not any(
+                "OFFSET" in query["sql"] for query in context.captured_queries
+            )
+            pages.append([product["pk"] for product in response.data["results"]])
+            pks += pages[-1]
+            url = response.data["next"]
+        assert len(pks) == len(set(pks)) == 1253
+        expected = sorted(
+            Product.objects.filter(min_price__isnull=False).values_list(
+                ordering.lstrip("-"), "pk"
+            ),
+            reverse=ordering.startswith("-"),
+        )
+        assert pks == [pk for _, pk in expected]
+
+        # previous 링크로 이전 페이지를 같은 순서로 다시 조회
+        response = self.client.get(response.data["previous"], format="json")
+        assert [product["pk"] for product in response.data["results"]] == pages[-2]
+
+    def test_view_product_list_price_filter(self):
+        assert self.get_names("?price_lte=1000") == ["TestProduct1", "TestProduct2"]
+        assert self.get_names("?price_gte=3500") == ["TestProduct4"]
+        assert self.get_names("?price_lte=2000&ordering=-min_price") == [
+            "TestProduct4",
+            "TestProduct1",
+            "TestProduct2",
+        ]
+
+    def test_view_product_list_fail_price_filter_not_number(self):
+        response = self.client.get(self.url + "?price_lte=Error", format="json")
+        assert response.status_code == 400
+
+    def test_rebuild_price_summary_command(self):
+        Product.objects.update(min_price=None, max_price=None, option_count=0)
+        call_command("rebuild_price_summary", "--batch-size=2", stdout=io.StringIO())
+        assert list(
+            Product.objects.values_list("min_price", "max_price", "option_count")
+        ) == [(1000, 3000, 2), (500, 500, 1), (None, None, 0), (2000, 4000, 2)]
+
+
+def explain_query_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql)
+        return " / ".join(row[-1] for row in cursor.fetchall())
+
+
+# Shop/options GET TEST
+@pytest.mark.django_db
+class TestOptionPriceRangeAPI:
+    def setup_method(cls):
+        cls.client = APIClient()
+        cls.url = reverse("option-list")
+        cls.products_url = reverse("option-products")
+        for i in range(3):
+            product = Product.objects.create(name=f"TestProduct{i+1}")
+            for j in range(3):
+                ProductOption.objects.create(
+                    product=product,
+                    name=f"TestOption{j+1}",
+                    price=(i + 1) * 1000 + j * 100,
+                )
+
+    def get_plans(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, format="json")
+        assert response.status_code == 200
+        plans = [
+            explain_query_plan(query["sql"])
+            for query in context.captured_queries
+            if "shop_productoption" in query["sql"]
+        ]
+        return response, plans
+
+    def test_view_option_list_price_range(self):
+        response = self.client.get(
+            self.url + "?price_gte=1100&price_lte=2100", format="json"
+        )
+        assert response.status_code == 200
+        assert [
+            (option["product"], option["price"]) for option in response.data["results"]
+        ] == [(1, 1100), (1, 1200), (2, 2000), (2, 2100)]
+
+    def test_view_option_list_product_in(self):
+        response = self.client.get(
+            self.url + "?product__in=1,3&price_lte=3000", format="json"
+        )
+        assert [option["pk"] for option in response.data["results"]] == [1, 2, 3, 7]
+
+    def test_view_option_products_price_range(self):
+        response = self.client.get(
+            self.products_url + "?price_gte=2150&price_lte=3000", format="json"
+        )
+        assert response.status_code == 200
+        assert [product["name"] for product in response.data["results"]] == [
+            "TestProduct2",
+            "TestProduct3",
+        ]
+        assert len(response.data["results"][0]["option_set"]) == 3
+
+    def test_view_option_list_price_ties(self):
+        # offset_cutoff (1000) 보다 많은 같은 가격의 옵션도 모두 한번씩 조회
+        product = Product.objects.get(pk=1)
+        ProductOption.objects.bulk_create(
+            ProductOption(product=product, name="SaleOption", price=1100)
+            for _ in range(1250)
+        )
+        pks = []
+        url = self.url + "?page_size=100"
+        while url:
+            # 커서가 반복되면 끝나지 않으므로 최대 페이지 수 확인
+            assert len(pks) < 1300
+            response, plans = self.get_plans(url)
+            for plan in plans:
+                assert "shop_option_price_idx" in plan
+            pks += [option["pk"] for option in response.data["results"]]
+            url = response.data["next"]
+        assert len(pks) == len(set(pks)) == 1259
+        assert pks == list(
+            ProductOption.objects.order_by("price", "pk").values_list("pk", flat=True)
+        )
+
+    def test_view_option_list_fail_invalid_params(self):
+        assert self.client.get(self.url + "?price_lte=Error").status_code == 400
+        assert self.client.get(self.url + "?product__in=1,a").status_code == 400
+
+    def test_view_option_list_fail_too_many_products(self, settings):
+        settings.SHOP_SYNC_CHUNK_SIZE = 2
+        response = self.client.get(self.url + "?product__in=1,2,3")
+        assert response.status_code == 400
+        assert response.data == ["상품은 최대 2 개까지 조회할 수 있습니다."]
+        assert self.client.get(self.url + "?product__in=1,2").status_code == 200
+
+    def test_option_query_plan_price_index(self):
+        _, plans = self.get_plans(self.url + "?price_gte=1100&price_lte=2100")
+        assert plans
+        for plan in plans:
+            assert "shop_option_price_idx" in plan
+            assert "SCAN shop_productoption" not in plan
+
+    def test_option_query_plan_product_price_index(self):
+        _, plans = self.get_plans(self.url + "?product__in=1,3&price_gte=1100")
+        assert plans
+        for plan in plans:
+            assert "shop_option_product_price_idx" in plan
+            assert "SCAN shop_productoption" not in plan
+
+    def test_option_products_query_plan(self):
+        _, plans = self.get_plans(self.products_url + "?price_lte=2000")
+        # 옵션 범위 조회 + option_set prefetch 모두 인덱스 사용
+        assert len(plans) == 2
+        for plan in plans:
+            assert "USING" in plan and "INDEX" in plan
+            assert "SCAN shop_productoption" not in plan
+
+
+# Shop/options/prices POST TEST
+@pytest.mark.django_db
+class TestOptionPriceAdjustAPI:
+    def setup_method(cls):
+        cls.client = APIClient()
+        cls.url = reverse("option-prices")
+        for name, prices, tags in [
+            ("TestProduct1", [1000, 1250], ["Coffee"]),
+            ("TestProduct2", [3000], ["Coffee", "Hot"]),
+            ("TestProduct3", [5000], ["Cold"]),
+        ]:
+            cls.client.post(
+                reverse("product-list"),
+                {
+                    "name": name,
+                    "option_set": [
+                        {"name": f"Option{price}", "price": price} for price in prices
+                    ],
+                    "tag_set": [{"name": tag} for tag in tags],
+                },
+                format="json",
+            )
+
+    def prices(self):
+        return list(
+            ProductOption.objects.order_by("pk").values_list("price", flat=True)
+        )
+
+    def test_adjust_price_percent_by_tag(self, django_assert_max_num_queries):
+        with django_assert_max_num_queries(12):
+            response = self.client.post(
+                self.url,
+                {"tags": [1], "operation": "percent", "value": 10},
+                format="json",
+            )
+        assert response.status_code == 200
+        assert response.data == {"updated": 3, "products": 2}
+        assert self.prices() == [1100, 1375, 3300, 5000]
+
+        product = Product.objects.get(pk=1)
+        assert (product.min_price, product.max_price) == (1100, 1375)
+        assert TagFacet.objects.get(tag=1).max_price == 3300
+        assert Product.objects.get(pk=3).version < product.version
+
+    def test_adjust_price_percent_rounding(self):
+        for rounding, expected in [
+            ("round", [900, 1130]),
+            ("floor", [900, 1120]),
+            ("ceil", [900, 1130]),
+        ]:
+            self.client.post(
+                self.url,
+                {"products": [1], "operation": "set", "value": 1000},
+                format="json",
+            )
+            ProductOption.objects.filter(pk=2).update(price=1250)
+            self.client.post(
+                self.url,
+                {
+                    "products": [1],
+                    "operation": "percent",
+                    "value": -10,
+                    "rounding": rounding,
+                    "unit": 10,
+                },
+                format="json",
+            )
+            assert self.prices()[:2] == expected
+
+    def test_adjust_price_add_by_price_range(self):
+        response = self.client.post(
+            self.url,
+            {"price_gte": 1200, "price_lte": 3000, "operation": "add", "value": -2000},
+            format="json",
+        )
+        assert response.data == {"updated": 2, "products": 2}
+        # 0 원 미만은 0 원
+        assert self.prices() == [1000, 0, 1000, 5000]
+        assert Product.objects.get(pk=1).min_price == 0
+
+    def test_adjust_price_set_and_search(self):
+        response = self.client.post(
+            self.url,
+            {"tags": [1, 2], "products": [2, 3], "operation": "set", "value": 700},
+            format="json",
+        )
+        assert response.data == {"updated": 1, "products": 1}
+        assert self.prices() == [1000, 1250, 700, 5000]
+
+        response = self.client.get(
+            reverse("product-detail", kwargs={"pk": 2}), format="json"
+        )
+        assert response.data["option_set"][0]["price"] == 700
+
+    def test_adjust_price_many_products(self, settings):
+        # 변경된 상품 pk 가 SQLite 변수 수 제한 (이전 버전 기본값 999) 보다 많은 경우
+        # 파생 데이터를 chunk 별로 갱신하므로 쿼리 수는 예산 (chunk 하나 기준) 보다 많음
+        settings.SHOP_QUERY_BUDGET_STRICT = False
+        self.client.post(
+            reverse("product-bulk"),
+            [
+                {
+                    "name": f"SaleProduct{i}",
+                    "option_set": [{"name": "SaleOption", "price": 1000 + i}],
+                    "tag_set": [{"name": "Sale"}],
+                }
+                for i in range(1200)
+            ],
+            format="json",
+        )
+        tag = Tag.objects.get(name="Sale")
+        connection.ensure_connection()
+        limit = connection.connection.setlimit(
+            sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999
+        )
+        try:
+            response = self.client.post(
+                self.url,
+                {"tags": [tag.pk], "operation": "add", "value": 100},
+                format="json",
+            )
+        finally:
+            connection.connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, limit)
+        assert response.data == {"updated": 1200, "products": 1200}
+        facet = TagFacet.objects.get(tag=tag)
+        assert (facet.product_count, facet.min_price, facet.max_price) == (
+            1200,
+            1100,
+            2299,
+        )
+        assert Product.objects.filter(tag_set=tag, min_price=1100).exists()
+        assert Product.objects.filter(version=0).count() == 0
+
+    def test_adjust_price_fail_too_many_pks(self, settings):
+        settings.SHOP_SYNC_CHUNK_SIZE = 2
+        response = self.client.post(
+            self.url,
+            {"products": [1, 2, 3], "operation": "add", "value": 100},
+            format="json",
+        )
+        assert response.status_code == 400
+        assert response.data == ["products 는 최대 2 개까지 입력할 수 있습니다."]
+
+        response = self.client.post(
+            self.url,
+            {"tags": [1], "products": [1, 2], "operation": "add", "value": 100},
+            format="json",
+        )
+        assert response.status_code == 400
+        assert response.data == [
+            "tags / products 는 합쳐서 최대 2 개까지 입력할 수 있습니다."
+        ]
+
+        response = self.client.post(
+            self.url,
+            {"products": [1, 2], "operation": "add", "value": 100},
+            format="json",
+        )
+        assert response.status_code == 200
+
+    def test_adjust_price_no_match(self):
+        response = self.client.post(
+            self.url,
+            {"price_gte": 10000, "operation": "add", "value": 100},
+            format="json",
+        )
+        assert response.data == {"updated": 0, "products": 0}
+
+    def test_adjust_price_fail_invalid_data(self):
+        for data in [
+            {"operation": "set", "value": 100},
+            {"tags": [], "operation": "set", "value": 100},
+            {"tags": ["a"], "operation": "set", "value": 100},
+            {"tags": [1], "operation": "multiply", "value": 2},
+            {"tags": [1], "operation": "set"},
+            {"tags": [1], "operation": "set", "value": -1},
+            {"tags": [1], "operation": "add", "value": "a"},
+            {"tags": [1], "operation": "percent", "value": 10, "rounding": "x"},
+            {"tags": [1], "operation": "percent", "value": 10, "unit": 0},
+            {"price_lte": "a", "operation": "add", "value": 100},
+        ]:
+            response = self.client.post(self.url, data, format="json")
+            assert response.status_code == 400, data
+        assert self.client.post(self.url, [1], format="json").status_code == 400
+        assert self.prices() == [1000, 1250, 3000, 5000]
+
+
+# Shop/product GET (search) TEST
+@pytest.mark.django_db
+class TestProductSearchAPI:
+    def setup_method(cls):
+        cls.client = APIClient()
+        cls.url = reverse("product-list")
+        request_data = [
+            {
+                "name": "아메리카노",
+                "option_set": [{"name": "샷 추가", "price": 500}],
+                "tag_set": [{"name": "커피음료"}],
+            },
+            {
+                "name": "카페라떼",
+                "option_set": [{"name": "아메리카노 샷", "price": 500}],
+                "tag_set": [{"name": "커피음료"}],
+            },
+            {
+                "name": "녹차라떼",
+                "option_set": [{"name": "휘핑크림", "price": 300}],
+                "tag_set": [{"name": "논커피음료"}],
+            },
+        ]
+        cls.client.post(reverse("product-bulk"), request_data, format="json")
+
+    def search(self, query):
+        response = self.client.get(self.url, {"q": query}, format="json")
+        assert response.status_code == 200
+        return [product["name"] for product in response.data["results"]]
+
+    def test_view_product_search_fragment(self):
+        assert self.search("페라떼") == ["카페라떼"]
+        assert sorted(self.search("휘핑크")) == ["녹차라떼"]
+        assert sorted(self.search("커피음")) == ["녹차라떼", "아메리카노", "카페라떼"]
+        assert self.search("커피음 메리카") == ["아메리카노", "카페라떼"]
+
+    def test_view_product_search_ranking(self):
+        # 상품명 일치가 옵션명 일치보다 우선
+        assert self.search("아메리카노") == ["아메리카노", "카페라떼"]
+
+    def test_view_product_search_cursor(self):
+        names = []
+        response = self.client.get(self.url, {"q": "커피음", "page_size": 1})
+        url = response.data["next"]
+        names += [product["name"] for product in response.data["results"]]
+        while url:
+            response = self.client.get(url, format="json")
+            assert len(response.data["results"]) == 1
+            names += [product["name"] for product in response.data["results"]]
+            url = response.data["next"]
+        assert sorted(names) == ["녹차라떼", "아메리카노", "카페라떼"]
+
+    def test_view_product_search_query_count(self, django_assert_num_queries):
+        # ETag 집계 1 + 검색 1 + 상품 1 + prefetch 2
+        with django_assert_num_queries(5):
+            self.client.get(self.url, {"q": "커피음", "page_size": 2})
+
+    def test_view_product_search_fail_short_query(self):
+        response = self.client.get(self.url, {"q": "라"}, format="json")
+        assert response.status_code == 400
+
+    def test_view_product_search_fail_invalid_cursor(self):
+        response = self.client.get(self.url, {"q": "커피음", "cursor": "xx"})
+        assert response.status_code == 404
+
+    def test_view_product_search_sync_write_paths(self):
+        url = reverse("product-detail", kwargs={"pk": 3})
+        request_data = {
+            "pk": 3,
+            "name": "녹차라떼",
+            "option_set": [{"name": "말차파우더", "price": 500}],
+            "tag_set": [],
+        }
+        self.client.patch(url, request_data, format="json")
+        assert self.search("휘핑크") == []
+        assert self.search("말차파") == ["녹차라떼"]
+
+        self.client.delete(url)
+        assert self.search("말차파") == []
+
+    def test_view_product_search_sync_tag_rename(self):
+        tag = Tag.objects.get(name="논커피음료")
+        tag.name = "티음료"
+        tag.save()
+        assert self.search("티음료") == ["녹차라떼"]
+
+    def test_view_product_search_sync_admin(self, admin_client):
+        response = admin_client.post(
+            reverse("admin:shop_productoption_change", args=[1]),
+            {"product": 1, "name": "바닐라시럽", "price": 300},
+        )
+        assert response.status_code == 302
+        assert self.search("바닐라") == ["아메리카노"]
+        assert Product.objects.get(pk=1).min_price == 300
+
+        response = admin_client.post(
+            reverse("admin:shop_product_delete", args=[1]), {"post": "yes"}
+        )
+        assert response.status_code == 302
+        assert self.search("바닐라") == []
+
+    def test_rebuild_search_index_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM shop_product_search")
+        assert self.search("커피음") == []
+
+        caches[settings.SHOP_RESPONSE_CACHE].clear()
+        call_command("rebuild_search_index", stdout=io.StringIO())
+        assert len(self.search("커피음")) == 3
+
+
+# Shop/product POST TEST
+@pytest.mark.django_db
+class TestProductPostAPI:
+    def setup_method(cls):
+        cls.client = APIClient()
+        cls.url = reverse("product-list")
+        Tag.objects.create(name="ExistTag")
+
+    def test_create_product_success(self):
+        request_data = {
+            "name": "TestProduct",
+            "option_set": [
+                {"name": "TestOption1", "price": 1000},
+                {"name": "TestOption2", "price": 500},
+                {"name": "TestOption3", "price": 0},
+            ],
+            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"name": "NewTag"}],
+        }
+        response_data = {
+            "pk": 1,
+            "name": "TestProduct",
+            "option_set": [
+                {"pk": 1, "name": "TestOption1", "price": 1000},
+                {"pk": 2, "name": "TestOption2", "price": 500},
+                {"pk": 3, "name": "TestOption3", "price": 0},
+            ],
+            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"pk": 2, "name": "NewTag"}],
+        }
+        response = self.client.post(self.url, request_data, format="json")
+        assert response.status_code == 201
+        assert Product.objects.count() == 1
+        assert response.data == response_data
+        product = Product.objects.first()
+
+        assert product.name == "TestProduct"
+        assert product.option_set.count() == 3
+
+        options = product.option_set.all()
+        for i, option in enumerate(options):
+            assert option.name == f"TestOption{i+1}"
+            assert option.price == (2 - i) * 500
+
+    def test_create_product_tag_pk_string(self):
+        request_data = {
+            "name": "TestProduct",
+            "option_set": [],
+            "tag_set": [{"pk": "1", "name": "ExistTag"}, {"name": "NewTag"}],
+        }
+        response = self.client.post(self.url, request_data, format="json")
+        assert response.status_code == 201
+        assert response.data["tag_set"] == [
+            {"pk": 1, "name": "ExistTag"},
+            {"pk": 2, "name": "NewTag"},
+        ]
+
+        request_data["tag_set"] = [{"pk": "a", "name": "ExistTag"}]
+        response = self.client.post(self.url, request_data, format="json")
+        assert response.status_code == 400
+        assert response.data == ["태그 pk 는 숫자로 입력해야 합니다."]
+        assert Product.objects.count() == 1
+
+    def test_create_product_fail_non_name(self):
+        request_data = {
+            "option_set": [
+                {"name": "TestOption1", "price": 1000},
+                {"name": "TestOption2", "price": 500},
+                {"name": "TestOption3", "price": 0},
+            ],
+            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"name": "NewTag"}],
+        }
+        response = self.client.post(self.url, request_data, format="json")
+        assert response.status_code == 400
+
+    def test_create_product_fail_non_option(self):
+        request_data = {
+            "name": "TestProduct",
+            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"name": "NewTag"}],
+        }
+        response = self.client.post(self.url, request_data, format="json")
+        assert response.status_code == 400
+
+    def test_create_product_success_option_null(self):
+        request_data = {
+            "name": "TestProduct",
+            "option_set": [],
+            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"name": "NewTag"}],
+        }
+        response_data = {
+            "pk": 1,
+            "name": "TestProduct",
+            "option_set": [],
+            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"pk": 2, "name": "NewTag"}],
+        }
+        response = self.client.post(self.url, request_data, format="json")
+        assert response.status_code == 201
+        assert response.data == response_data
+
+    def test_create_product_fail_option_name_null(self):
+        request_data = {
+            "name": "TestProduct",
+            "option_set": [
+                {"price": 1000},
+                {"name": "TestOption2", "price": 500},
+                {"name": "TestOption3", "price": 0},
+            ],
+            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"name": "NewTag"}],
+        }
+        response_data = {
+            "pk": 1,
+            "name": "TestProduct",
+            "option_set": [],
+            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"pk": 2, "name": "NewTag"}],
+        }
+        response = self.client.post(self.url, request_data, format="json")
+        assert response.status_code == 400
+
+    def test_create_product_fail_option_price_null(self):
+        request_data = {
+            "name": "TestProduct",
+            "option_set": [
+                {"name": "TestOption1"},
+                {"name": "TestOption2", "price": 500},
+                {"name": "TestOption3", "price": 0},
+            ],
+            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"name": "NewTag"}],
+        }
+        response_data = {
+            "pk": 1,
+            "name": "TestProduct",
+            "option_set": [],
+            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"pk": 2, "name": "NewTag"}],
+        }
+        response = self.client.post(self.url, request_data, format="json")
+        assert response.status_code == 400
+
+    def test_create_product_fail_non_tag(self):
+        request_data = {
+            "name": "TestProduct",
+            "option_set": [
+                {"name": "TestOption1", "price": 1000},
+                {"name": "TestOption2", "price": 500},
+                {"name": "TestOption3", "price": 0},
+            ],
+        }
+        response_data = {
+            "pk": 1,
+            "name": "TestProduct",
+            "option_set": [
+                {"pk": 1, "name": "TestOption1", "price": 1000},
+                {"pk": 2, "name": "TestOption2", "price": 500},
+                {"pk": 3, "name": "TestOption3", "price": 0},
+            ],
+            "tag_set": [],
+        }
+        response = self.client.post(self.url, request_data, format="json")
+        assert response.status_code == 400
+
+    def test_create_product_success_tag_null(self):
+        request_data = {
+            "name": "TestProduct",
+            "option_set": [
+                {"name": "TestOption1", "price": 1000},
+                {"name": "TestOption2", "price": 500},
+                {"name": "TestOption3", "price": 0},
+            ],
+            "tag_set": [],
+        }
+        response_data = {
+            "pk": 1,
+            "name": "TestProduct",
+            "option_set": [
+                {"pk": 1, "name": "TestOption1", "price": 1000},
+                {"pk": 2, "name": "TestOption2", "price": 500},
+                {"pk": 3, "name": "TestOption3", "price": 0},
+            ],
+            "tag_set": [],
+        }
+        response = self.client.post(self.url, request_data, format="json")
+        assert response.status_code == 201
+        assert response.data == response_data
+
+    def test_create_product_fail_option_price_is_string(self):
+        request_data = {
+            "name": "TestProduct",
+            "option_set": [
+                {"name": "TestOption1", "price": 1000},
+                {"name": "TestOption2", "price": 500},
+                {"name": "TestOption3", "price": "Error"},
+            ],
+            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"name": "NewTag"}],
+        }
+        response = self.client.post(self.url, request_data, format="json")
+        assert response.status_code == 400
+
+    def test_create_product_fail_tag_name_is_duplicate(self):
+        request_data = {
+            "name": "TestProduct",
+            "option_set": [
+                {"name": "TestOption1", "price": 1000},
+                {"name": "TestOption2", "price": 500},
+                {"name": "TestOption3", "price": 0},
+            ],
+            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"name": "ExistTag"}],
+        }
+        response = self.client.post(self.url, request_data, format="json")
+        assert response.status_code == 400
+
+    def test_create_product_fail_tag_name_null_pk_exist(self):
+        request_data = {
+            "name": "TestProduct",
+            "option_set": [
+                {"name": "TestOption1", "price": 1000},
+                {"name": "TestOption2", "price": 500},
+                {"name": "TestOption3", "price": 0},
+            ],
+            "tag_set": [{"pk": 1}, {"name": "ExistTag"}],
+        }
+        response = self.client.post(self.url, request_data, format="json")
+        assert response.status_code == 400
+
+    def test_create_product_fail_tag_name_null_pk_not_exist(self):
+        request_data = {
+            "name": "TestProduct",
+            "option_set": [
+                {"name": "TestOption1", "price": 1000},
+                {"name": "TestOption2", "price": 500},
+                {"name": "TestOption3", "price": 0},
+            ],
+            "tag_set": [{"pk": 1, "name": "ExistTag"}, {}],
+        }
+        response = self.client.post(self.url, request_data, format="json")
+        assert response.status_code == 400
+
+    def test_create_product_fail_test_transcation(self):
+        request_data = {
+            "name": "TestProduct",
+            "option_set": [
+                {"name": "TestOption1", "price": 1000},
+                {"name": "TestOption2", "price": 500},
+                {"name": "TestOption3", "price": "Error"},
+            ],
+            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"name": "ExistTag"}],
+        }
+        self.client.post(self.url, request_data, format="json")
+        assert Product.objects.count() == 0
+
+
+# Tag resolver TEST
+@pytest.mark.django_db
+class TestTagResolver:
+    def setup_method(cls):
+        cls.client = APIClient()
+        cls.url = reverse("product-list")
+        Tag.objects.create(name="ExistTag")
+
+    def test_create_product_success_existing_tag_without_pk(self):
+        request_data = {
+            "name": "TestProduct",
+            "option_set": [],
+            "tag_set": [{"name": "ExistTag"}, {"name": "NewTag"}],
+        }
+        response = self.client.post(self.url, request_data, format="json")
+        assert response.status_code == 201
+        assert [tag["name"] for tag in response.data["tag_set"]] == [
+            "ExistTag",
+            "NewTag",
+        ]
+        assert response.data["tag_set"][0]["pk"] == 1
+        assert Tag.objects.count() == 2
+
+    def test_resolve_tag_pks_query_count(self, django_assert_num_queries):
+        # 없는 태그 생성 insert 1 + 조회 1
+        with django_assert_num_queries(2):
+            pks = resolve_tag_pks([(1, "ExistTag"), (None, "NewTag"), (9, "NoTag")])
+        assert pks == [1, 2]
+
+    def test_resolve_tag_pks_ignore_wrong_pk(self):
+        assert resolve_tag_pks([(2, "ExistTag")]) == []
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTagResolverCache:
+    def setup_method(cls):
+        tag_resolver.clear()
+
+    def test_resolve_tag_pks_cache_hit(self, django_assert_num_queries):
+        tag = Tag.objects.create(name="ExistTag")
+        resolve_tag_pks([(None, "ExistTag"), (None, "NewTag")])
+
+        with django_assert_num_queries(0):
+            pks = resolve_tag_pks([(tag.pk, "ExistTag"), (None, "NewTag")])
+        assert pks == [tag.pk, Tag.objects.get(name="NewTag").pk]
+
+    def test_resolve_tag_pks_cache_invalidate(self):
+        tag = Tag.objects.create(name="ExistTag")
+        resolve_tag_pks([(None, "ExistTag")])
+
+        tag.name = "EditTag"
+        tag.save()
+        assert resolve_tag_pks([(None, "ExistTag")]) != [tag.pk]
+        assert Tag.objects.count() == 2
+
+    def test_resolve_tag_pks_cache_skip_rollback(self):
+        with pytest.raises(DatabaseError):
+            with transaction.atomic():
+                resolve_tag_pks([(None, "NewTag")])
+                raise DatabaseError
+
+        # 롤백된 태그는 캐시되지 않아 다시 생성
+        with CaptureQueriesContext(connection) as context:
+            tag_pks = resolve_tag_pks([(None, "NewTag")])
+        assert context.captured_queries
+        assert tag_pks == [Tag.objects.get(name="NewTag").pk]
+
+
+# Shop/tags/facets GET TEST
+@pytest.mark.django_db
+class TestTagFacetAPI:
+    def setup_method(cls):
+        cls.client = APIClient()
+        cls.url = reverse("tag-facets")
+        for name, prices, tags in [
+            ("TestProduct1", [3000, 1000], ["Coffee", "Hot"]),
+            ("TestProduct2", [500], ["Coffee"]),
+            ("TestProduct3", [], ["Coffee", "Cold"]),
+        ]:
+            cls.client.post(
+                reverse("product-list"),
+                {
+                    "name": name,
+                    "option_set": [
+                        {"name": f"Option{price}", "price": price} for price in prices
+                    ],
+                    "tag_set": [{"name": tag} for tag in tags],
+                },
+                format="json",
+            )
+
+    def facets(self):
+        return [
+            (
+                facet["name"],
+                facet["product_count"],
+                facet["min_price"],
+                facet["max_price"],
+            )
+            for facet in self.client.get(self.url).data
+        ]
+
+    def test_view_tag_facets(self, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            response = self.client.get(self.url)
+        assert response.status_code == 200
+        assert response.data[0] == {
+            "pk": 1,
+            "name": "Coffee",
+            "product_count": 3,
+            "min_price": 500,
+            "max_price": 3000,
+        }
+        assert self.facets() == [
+            ("Coffee", 3, 500, 3000),
+            ("Hot", 1, 1000, 3000),
+            ("Cold", 1, None, None),
+        ]
+
+    def test_tag_facets_partial_update(self):
+        self.client.patch(
+            reverse("product-detail", kwargs={"pk": 3}),
+            {
+                "pk": 3,
+                "name": "TestProduct3",
+                "option_set": [{"name": "NewOption", "price": 5000}],
+                "tag_set": [{"name": "Hot"}],
+            },
+            format="json",
+        )
+        assert self.facets() == [
+            ("Coffee", 3, 500, 5000),
+            ("Hot", 2, 1000, 5000),
+            ("Cold", 1, 5000, 5000),
+        ]
+
+    def test_tag_facets_destroy(self):
+        self.client.delete(reverse("product-detail", kwargs={"pk": 1}))
+        assert self.facets() == [("Coffee", 2, 500, 500), ("Cold", 1, None, None)]
+
+        self.client.delete(reverse("product-list"), [2, 3], format="json")
+        assert self.facets() == []
+
+    def test_tag_facets_admin_remove_tag(self, admin_client):
+        admin_client.post(
+            reverse("admin:shop_product_change", args=[1]),
+            {"name": "TestProduct1", "tag_set": [2]},
+        )
+        assert self.facets() == [
+            ("Coffee", 2, 500, 500),
+            ("Hot", 1, 1000, 3000),
+            ("Cold", 1, None, None),
+        ]
+
+    def test_tag_facets_delete_tag(self):
+        Tag.objects.get(name="Hot").delete()
+        assert [facet[0] for facet in self.facets()] == ["Coffee", "Cold"]
+
+    def test_tag_facets_rename_tag_in_chunks(self, settings):
+        settings.SHOP_SYNC_CHUNK_SIZE = 1
+        tag = Tag.objects.get(name="Coffee")
+        tag.name = "Tea"
+        tag.save()
+        assert self.facets() == [
+            ("Tea", 3, 500, 3000),
+            ("Hot", 1, 1000, 3000),
+            ("Cold", 1, None, None),
+        ]
+        response = self.client.get(reverse("product-list"), {"q": "Tea"})
+        assert len(response.data["results"]) == 3
+
+    def test_rebuild_tag_facets_command(self):
+        TagFacet.objects.filter(tag=1).update(product_count=0, min_price=None)
+        TagFacet.objects.filter(tag=2).delete()
+        call_command("rebuild_tag_facets", "--batch-size=1", stdout=io.StringIO())
+        assert self.facets() == [
+            ("Coffee", 3, 500, 3000),
+            ("Hot", 1, 1000, 3000),
+            ("Cold", 1, None, None),
+        ]
+
+
+# Shop/tags/autocomplete GET TEST
+@pytest.mark.django_db(transaction=True)
+class TestTagAutocompleteAPI:
+    def setup_method(cls):
+        cls.client = APIClient()
+        cls.url = reverse("tag-autocomplete")
+        # transaction 테스트는 pk 가 초기화되지 않으므로 생성한 pk 사용
+        cls.tags = [
+            Tag.objects.create(name=name)
+            for name in ["Coffee", "coffee bean", "Cola", "커피", "커피콩", "Tea"]
+        ]
+        cls.products = []
+        for i in range(3):
+            product = Product.objects.create(name=f"TestProduct{i}")
+            product.tag_set.set(cls.tags[: i + 1])
+            cls.products.append(product)
+
+    def test_autocomplete(self):
+        response = self.client.get(self.url, {"q": "co"})
+        assert response.status_code == 200
+        assert response.data == [
+            {"pk": self.tags[0].pk, "name": "Coffee", "product_count": 3},
+            {"pk": self.tags[1].pk, "name": "coffee bean", "product_count": 2},
+            {"pk": self.tags[2].pk, "name": "Cola", "product_count": 1},
+        ]
+
+        response = self.client.get(self.url, {"q": "커피"})
+        assert [tag["name"] for tag in response.data] == ["커피", "커피콩"]
+        assert [tag["product_count"] for tag in response.data] == [0, 0]
+
+        response = self.client.get(self.url, {"q": "COF", "limit": 1})
+        assert [tag["name"] for tag in response.data] == ["Coffee"]
+
+        response = self.client.get(self.url, {"q": "x"})
+        assert response.data == []
+
+    def test_autocomplete_no_query(self, django_assert_num_queries):
+        # 인덱스 생성 1 번 이후에는 DB 조회 없음
+        with django_assert_num_queries(1):
+            self.client.get(self.url, {"q": "c"})
+        with django_assert_num_queries(0):
+            for prefix in ["co", "cof", "coff", "커"]:
+                self.client.get(self.url, {"q": prefix})
+
+    def test_autocomplete_fail_no_query(self):
+        response = self.client.get(self.url)
+        assert response.status_code == 400
+
+    def test_autocomplete_add_links(self, django_assert_num_queries):
+        self.client.get(self.url, {"q": "c"})
+        self.client.post(
+            reverse("product-list"),
+            {
+                "name": "NewProduct",
+                "option_set": [{"name": "TestOption", "price": 1000}],
+                "tag_set": [{"pk": self.tags[2].pk, "name": "Cola"}, {"name": "Cocoa"}],
+            },
+            format="json",
+        )
+        product = self.products[0]
+        self.client.patch(
+            reverse("product-detail", kwargs={"pk": product.pk}),
+            {
+                "pk": product.pk,
+                "name": "TestProduct0",
+                "option_set": [],
+                "tag_set": [{"name": "Coffee"}, {"name": "Cola"}],
+            },
+            format="json",
+        )
+
+        # 다시 생성하지 않고 추가된 연결 반영
+        with django_assert_num_queries(0):
+            response = self.client.get(self.url, {"q": "co"})
+        assert [(tag["name"], tag["product_count"]) for tag in response.data] == [
+            ("Cocoa", 1),
+            ("Coffee", 3),
+            ("coffee bean", 2),
+            ("Cola", 3),
+        ]
+
+    def test_autocomplete_skip_rollback(self):
+        self.client.get(self.url, {"q": "c"})
+        with pytest.raises(DatabaseError):
+            with transaction.atomic():
+                tag_pks = {}
+                pks = resolve_tag_pks([(None, "Cider")], tag_pks)
+                tag_index.add_links(tag_pks, [pks])
+                raise DatabaseError
+
+        response = self.client.get(self.url, {"q": "ci"})
+        assert response.data == []
+
+    def test_autocomplete_rename_tag(self):
+        self.client.get(self.url, {"q": "c"})
+        tag = Tag.objects.get(name="Cola")
+        tag.name = "Soda"
+        tag.save()
+
+        response = self.client.get(self.url, {"q": "so"})
+        assert response.data == [
+            {"pk": self.tags[2].pk, "name": "Soda", "product_count": 1}
+        ]
+
+    def test_autocomplete_maxsize(self, monkeypatch):
+        # 상품 수가 많은 태그만 유지
+        monkeypatch.setattr(tag_index, "maxsize", 2)
+        response = self.client.get(self.url, {"q": "c"})
+        assert [tag["name"] for tag in response.data] == ["Coffee", "coffee bean"]
+
+    def test_autocomplete_ttl(self, monkeypatch):
+        self.client.get(self.url, {"q": "c"})
+        self.products[2].tag_set.clear()
+
+        response = self.client.get(self.url, {"q": "cola"})
+        assert response.data[0]["product_count"] == 1
+
+        monkeypatch.setattr(tag_index, "ttl", 0)
+        response = self.client.get(self.url, {"q": "cola"})
+        assert response.data[0]["product_count"] == 0
+
+
+# Shop/product/bulk POST TEST
+@pytest.mark.django_db
+class TestProductBulkPostAPI:
+    def setup_method(cls):
+        cls.client = APIClient()
+        cls.url = reverse("product-bulk")
+        Tag.objects.create(name="ExistTag")
+
+    def test_bulk_create_product_success(self):
+        request_data = [
+            {
+                "name": f"TestProduct{i+1}",
+                "option_set": [
+                    {"name": "TestOption1", "price": 1000},
+                    {"name": "TestOption2", "price": 500},
+                ],
+                "tag_set": [{"pk": 1, "name": "ExistTag"}, {"name": "NewTag"}],
+            }
+            for i in range(3)
+        ]
+        response = self.client.post(self.url, request_data, format="json")
+        assert response.status_code == 201
+        assert response.data == [
+            {"index": i, "status": 201, "pk": i + 1} for i in range(3)
+        ]
+
+        assert Product.objects.count() == 3
+        assert ProductOption.objects.count() == 6
+        assert Tag.objects.count() == 2
+        for product in Product.objects.all():
+            assert [tag.name for tag in product.tag_set.all()] == ["ExistTag", "NewTag"]
+            assert [option.price for option in product.option_set.all()] == [1000, 500]
+
+    def test_bulk_create_product_query_count(self, django_assert_max_num_queries):
+        request_data = [
+            {
+                "name": f"TestProduct{i+1}",
+                "option_set": [{"name": "TestOption", "price": i}],
+                "tag_set": [{"name": f"NewTag{i % 5}"}],
+            }
+            for i in range(100)
+        ]
+        # 상품 수와 무관하게 chunk 당 고정된 쿼리 수
+        with django_assert_max_num_queries(16):
+            response = self.client.post(self.url, request_data, format="json")
+        assert response.status_code == 201
+        assert Product.objects.count() == 100
+        assert Tag.objects.count() == 6
+
+    def test_bulk_create_product_chunk_size(self):
+        request_data = [
+            {"name": f"TestProduct{i+1}", "option_set": [], "tag_set": []}
+            for i in range(5)
+        ]
+        response = self.client.post(
+            self.url + "?chunk_size=2", request_data, format="json"
+        )
+        assert response.status_code == 201
+        assert [item["pk"] for item in response.data] == [1, 2, 3, 4, 5]
+
+    def test_bulk_create_product_partial_fail(self):
+        request_data = [
+            {"name": "TestProduct1", "option_set": [], "tag_set": []},
+            {"name": "TestProduct2", "option_set": [{"name": "TestOption1"}]},
+            {
+                "name": "TestProduct3",
+                "option_set": [{"name": "TestOption1", "price": "Error"}],
+                "tag_set": [],
+            },
+            {"name": "TestProduct4", "option_set": [], "tag_set": [{"pk": 1}]},
+            {"name": "TestProduct5", "option_set": [], "tag_set": []},
+        ]
+        response = self.client.post(self.url, request_data, format="json")
+        assert response.status_code == 207
+        assert [item["status"] for item in response.data] == [201, 400, 400, 400, 201]
+        assert list(Product.objects.values_list("name", flat=True)) == [
+            "TestProduct1",
+            "TestProduct5",
+        ]
+
+    def test_bulk_create_product_fail_not_list(self):
+        request_data = {"name": "TestProduct", "option_set": [], "tag_set": []}
+        response = self.client.post(self.url, request_data, format="json")
+        assert response.status_code == 400
+
+    def test_bulk_create_product_not_reuse_deleted_pk(self):
+        Product.objects.create(name="DeletedProduct").delete()
+        request_data = [{"name": "TestProduct", "option_set": [], "tag_set": []}]
+        response = self.client.post(self.url, request_data, format="json")
+        assert response.data[0]["pk"] == 2
+
+
+# Shop/product bulk PATCH / DELETE TEST
+@pytest.mark.django_db
+class TestProductBulkUpdateAPI:
+    def setup_method(cls):
+        cls.client = APIClient()
+        cls.url = reverse("product-list")
+        tag = Tag.objects.create(name="ExistTag")
+        for i in range(5):
+            product = Product.objects.create(name=f"TestProduct{i+1}")
+            for j in range(2):
+                ProductOption.objects.create(
+                    product=product, name=f"TestOption{j+1}", price=(j + 1) * 1000
+                )
+            product.tag_set.add(tag)
+
+    def update_data(self, pk, price):
+        # 상품 pk 의 첫 옵션 가격 변경, 두번째 옵션 삭제, 새 옵션 / 태그 추가
+        first = pk * 2 - 1
+        return {
+            "pk": pk,
+            "option_set": [
+                {"pk": first, "name": "TestOption1", "price": price},
+                {"name": "New Option", "price": 300},
+            ],
+            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"name": "NewTag"}],
+        }
+
+    def test_bulk_update_product_success(self):
+        request_data = [self.update_data(pk, pk * 100) for pk in range(1, 6)]
+        response = self.client.patch(self.url, request_data, format="json")
+        assert response.status_code == 200
+        assert response.data == [
+            {"index": i, "status": 200, "pk": i + 1} for i in range(5)
+        ]
+
+        for product in Product.objects.all():
+            assert [
+                (option.name, option.price) for option in product.option_set.all()
+            ] == [("TestOption1", product.pk * 100), ("New Option", 300)]
+            assert [tag.name for tag in product.tag_set.all()] == [
+                "ExistTag",
+                "NewTag",
+            ]
+            assert (product.min_price, product.max_price) == (
+                min(product.pk * 100, 300),
+                max(product.pk * 100, 300),
+            )
+        assert Tag.objects.count() == 2
+
+    def test_bulk_update_product_query_count(self, django_assert_num_queries):
+        # 상품 수와 관계없이 같은 쿼리 수
+        def count(pks):
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.patch(
+                    self.url,
+                    [self.update_data(pk, pk * 100) for pk in pks],
+                    format="json",
+                )
+            assert response.status_code == 200
+            return len(captured)
+
+        assert count([1]) == count([2, 3, 4, 5])
+
+    def test_bulk_update_product_partial_fail(self):
+        request_data = [
+            self.update_data(1, 100),
+            {"pk": 2, "option_set": [{"name": "NoPrice"}], "tag_set": []},
+            self.update_data(999, 100),
+            # 다른 상품의 옵션
+            {
+                "pk": 3,
+                "option_set": [{"pk": 1, "name": "TestOption1", "price": 1}],
+                "tag_set": [],
+            },
+            self.update_data(1, 200),
+            "wrong",
+        ]
+        response = self.client.patch(self.url, request_data, format="json")
+        assert response.status_code == 207
+        assert [result["status"] for result in response.data] == [
+            200,
+            400,
+            404,
+            400,
+            400,
+            400,
+        ]
+        assert response.data[1]["errors"] == ["가격은 필수 입력 값입니다."]
+        assert response.data[2]["errors"] == ["존재하지 않는 상품입니다."]
+        assert response.data[3]["errors"] == ["존재하지 않는 옵션입니다."]
+        assert response.data[4]["errors"] == ["중복된 상품입니다."]
+
+        assert ProductOption.objects.get(pk=1).price == 100
+        assert ProductOption.objects.filter(product=3).count() == 2
+
+    def test_bulk_update_product_duplicate_option_pk(self):
+        request_data = [
+            self.update_data(1, 100),
+            {
+                "pk": 2,
+                "option_set": [
+                    {"pk": 3, "name": "TestOption1", "price": 1},
+                    {"pk": 3, "name": "TestOption1", "price": 2},
+                ],
+                "tag_set": [],
+            },
+            self.update_data(3, 300),
+        ]
+        response = self.client.patch(self.url, request_data, format="json")
+        assert response.status_code == 207
+        assert [result["status"] for result in response.data] == [200, 400, 200]
+        assert response.data[1]["errors"] == ["중복된 옵션입니다."]
+
+        assert ProductOption.objects.get(pk=1).price == 100
+        assert ProductOption.objects.get(pk=3).price == 1000
+        assert ProductOption.objects.get(pk=5).price == 300
+
+    def test_bulk_update_product_invalidate_cache(self):
+        detail_url = reverse("product-detail", kwargs={"pk": 1})
+        self.client.get(detail_url)
+        self.client.patch(self.url, [self.update_data(1, 100)], format="json")
+        response = self.client.get(detail_url)
+        assert [option["price"] for option in response.data["option_set"]] == [
+            100,
+            300,
+        ]
+
+    def test_bulk_update_product_fail_not_list(self):
+        response = self.client.patch(self.url, {"pk": 1}, format="json")
+        assert response.status_code == 400
+
+    def test_bulk_update_product_fail_limit(self, settings):
+        settings.SHOP_BULK_UPDATE_LIMIT = 2
+        request_data = [self.update_data(pk, 100) for pk in range(1, 4)]
+        response = self.client.patch(self.url, request_data, format="json")
+        assert response.status_code == 400
+        assert ProductOption.objects.get(pk=1).price == 1000
+
+    def test_bulk_delete_product_success(self):
+        response = self.client.delete(self.url, [1, 3, 5], format="json")
+        assert response.status_code == 200
+        assert response.data == [
+            {"index": 0, "status": 204, "pk": 1},
+            {"index": 1, "status": 204, "pk": 3},
+            {"index": 2, "status": 204, "pk": 5},
+        ]
+        assert list(Product.objects.values_list("pk", flat=True)) == [2, 4]
+        assert set(ProductOption.objects.values_list("product", flat=True)) == {2, 4}
+        assert Product.tag_set.through.objects.count() == 2
+        assert Tag.objects.count() == 1
+
+    def test_bulk_delete_product_query_count(self):
+        def count(pks):
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.delete(self.url, pks, format="json")
+            assert response.status_code == 200
+            return len(captured)
+
+        assert count([1]) == count([2, 3, 4, 5])
+
+    def test_bulk_delete_product_partial_fail(self):
+        response = self.client.delete(self.url, [1, 999, 1, "2"], format="json")
+        assert response.status_code == 207
+        assert [result["status"] for result in response.data] == [204, 404, 400, 400]
+        assert Product.objects.count() == 4
+
+
+# Shop/product/changes GET TEST
+@pytest.mark.django_db
+class TestProductChangeFeedAPI:
+    def setup_method(cls):
+        cls.client = APIClient()
+        cls.url = reverse("product-changes")
+        for i in range(3):
+            cls.client.post(
+                reverse("product-list"),
+                {
+                    "name": f"TestProduct{i+1}",
+                    "option_set": [{"name": "TestOption", "price": (i + 1) * 1000}],
+                    "tag_set": [{"name": "TestTag"}],
+                },
+                format="json",
+            )
+
+    def feed(self, since, **params):
+        response = self.client.get(self.url, {"since": since, **params})
+        assert response.status_code == 200
+        data = response.data
+        return (
+            data["cursor"],
+            data["has_more"],
+            [product["pk"] for product in data["upserts"]],
+            data["deleted"],
+        )
+
+    def test_view_change_feed(self, django_assert_num_queries):
+        with django_assert_num_queries(5):
+            response = self.client.get(self.url, {"since": 0})
+        assert response.status_code == 200
+        assert response.data["cursor"] == 3
+        assert response.data["has_more"] is False
+        assert response.data["deleted"] == []
+        assert (
+            response.data["upserts"][0]
+            == self.client.get(reverse("product-detail", kwargs={"pk": 1})).data
+        )
+        assert self.feed(3) == (3, False, [], [])
+
+    def test_view_change_feed_current_cursor(self):
+        response = self.client.get(self.url)
+        assert response.data == {
+            "cursor": 3,
+            "has_more": False,
+            "upserts": [],
+            "deleted": [],
+        }
+
+    def test_change_feed_write_paths(self, admin_client):
+        self.client.patch(
+            reverse("product-detail", kwargs={"pk": 2}),
+            {
+                "pk": 2,
+                "name": "TestProduct2",
+                "option_set": [{"name": "NewOption", "price": 500}],
+                "tag_set": [],
+            },
+            format="json",
+        )
+        self.client.delete(reverse("product-detail", kwargs={"pk": 3}))
+        assert self.feed(3) == (5, False, [2], [3])
+
+        admin_client.post(
+            reverse("admin:shop_product_change", args=[1]),
+            {"name": "ChangedProduct1", "tag_set": []},
+        )
+        admin_client.post(
+            reverse("admin:shop_product_delete", args=[2]), {"post": "yes"}
+        )
+        cursor, _, upserts, deleted = self.feed(5)
+        assert (upserts, deleted) == ([1], [2])
+        # 변경 후 삭제된 상품은 삭제로만 응답
+        assert self.feed(3)[2:] == ([1], [2, 3])
+
+    def test_change_feed_limit(self):
+        self.client.delete(reverse("product-detail", kwargs={"pk": 1}))
+        assert self.feed(0, limit=2) == (2, True, [2], [1])
+        assert self.feed(2, limit=2) == (4, False, [3], [1])
+
+    def test_compact_change_log_command(self):
+        for price in [1500, 2000]:
+            self.client.patch(
+                reverse("product-detail", kwargs={"pk": 1}),
+                {
+                    "pk": 1,
+                    "name": "TestProduct1",
+                    "option_set": [{"pk": 1, "name": "TestOption", "price": price}],
+                    "tag_set": [],
+                },
+                format="json",
+            )
+        out = io.StringIO()
+        call_command("compact_change_log", stdout=out)
+        assert "중복 2 개, 만료 0 개" in out.getvalue()
+        # 이전 변경이 정리되어도 모든 cursor 의 결과는 같음
+        assert self.feed(0) == (5, False, [1, 2, 3], [])
+        assert self.feed(4) == (5, False, [1], [])
+
+        call_command("compact_change_log", "--days=0", stdout=io.StringIO())
+        assert self.client.get(self.url, {"since": 4}).status_code == 410
+        assert self.client.get(self.url).data["cursor"] == 5
+        assert self.feed(5) == (5, False, [], [])
+
+        self.client.delete(reverse("product-detail", kwargs={"pk": 2}))
+        assert self.feed(5) == (6, False, [], [2])
+
+    def test_view_change_feed_fail_invalid_params(self):
+        assert self.client.get(self.url, {"since": "a"}).status_code == 400
+        assert self.client.get(self.url, {"since": -1}).status_code == 400
+        assert self.client.get(self.url, {"since": 0, "limit": "a"}).status_code == 400
+
+
+# Shop/product/export GET TEST
+@pytest.mark.django_db
+class TestProductExportAPI:
+    def setup_method(cls):
+        cls.client = APIClient()
+        cls.url = reverse("product-export")
+        product = Product.objects.create(name="TestProduct")
+        Product.objects.create(name="TestProduct2")
+        for i in range(2):
+            ProductOption.objects.create(
+                product=product, name=f"TestOption{i+1}", price=(1 - i) * 500
+            )
+        product.tag_set.add(Tag.objects.create(name="ExistTag"))
+
+    def test_export_product_ndjson(self):
+        response = self.client.get(self.url)
+        assert response.status_code == 200
+        assert response.streaming
+        assert response["Content-Type"].startswith("application/x-ndjson")
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {
+                "pk": 1,
+                "name": "TestProduct",
+                "option_set": [
+                    {"pk": 1, "name": "TestOption1", "price": 500},
+                    {"pk": 2, "name": "TestOption2", "price": 0},
+                ],
+                "tag_set": [{"pk": 1, "name": "ExistTag"}],
+            },
+            {"pk": 2, "name": "TestProduct2", "option_set": [], "tag_set": []},
+        ]
+
+    def test_export_product_csv(self):
+        response = self.client.get(self.url + "?type=csv")
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/csv")
+
+        content = b"".join(response.streaming_content).decode()
+        assert list(csv.reader(io.StringIO(content))) == [
+            ["kind", "pk", "product", "name", "price"],
+            ["product", "1", "", "TestProduct", ""],
+            ["option", "1", "1", "TestOption1", "500"],
+            ["option", "2", "1", "TestOption2", "0"],
+            ["tag", "1", "1", "ExistTag", ""],
+            ["product", "2", "", "TestProduct2", ""],
+        ]
+
+    def test_export_product_chunk_query_count(
+        self, settings, django_assert_num_queries
+    ):
+        settings.SHOP_EXPORT_CHUNK_SIZE = 1
+        response = self.client.get(self.url)
+        # chunk 마다 상품 1 + prefetch 2 쿼리, 마지막 빈 chunk 1 쿼리
+        with django_assert_num_queries(7):
+            content = b"".join(response.streaming_content)
+        assert len(content.splitlines()) == 2
+
+    def test_export_product_fail_unknown_type(self):
+        response = self.client.get(self.url + "?type=xml")
+        assert response.status_code == 400
+
+
+# Shop/product/snapshot GET TEST
+@pytest.mark.django_db
+class TestProductSnapshotAPI:
+    def setup_method(cls):
+        cls.client = APIClient()
+        cls.url = reverse("product-snapshot")
+        for i in range(5):
+            cls.client.post(
+                reverse("product-list"),
+                {
+                    "name": f"TestProduct{i+1}",
+                    "option_set": [{"name": "TestOption", "price": (i + 1) * 1000}],
+                    "tag_set": [{"name": "TestTag"}],
+                },
+                format="json",
+            )
+
+    def build(self, *args):
+        out = io.StringIO()
+        call_command("build_snapshot", "--chunk-size=2", *args, stdout=out)
+        return out.getvalue()
+
+    def products(self, response):
+        content = gzip.decompress(b"".join(response.streaming_content))
+        return [json.loads(line) for line in content.decode().splitlines()]
+
+    def test_view_product_snapshot(self, django_assert_num_queries):
+        assert "chunk 3 개" in self.build()
+        with django_assert_num_queries(0):
+            response = self.client.get(self.url)
+        assert response.status_code == 200
+        assert not response.has_header("Content-Encoding")
+        assert response["Content-Type"] == "application/gzip"
+        assert "Accept-Encoding" in response["Vary"]
+        assert response["X-Shop-Cursor"] == "5"
+        export = self.client.get(reverse("product-export"))
+        assert self.products(response) == [
+            json.loads(line)
+            for line in b"".join(export.streaming_content).decode().splitlines()
+        ]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert response.status_code == 304
+        assert "Accept-Encoding" in response["Vary"]
+
+    def test_view_product_snapshot_accept_encoding(self):
+        self.build()
+        etag = self.client.get(self.url)["ETag"]
+        for encoding in ["identity", "gzip, deflate", ""]:
+            response = self.client.get(self.url, HTTP_ACCEPT_ENCODING=encoding)
+            assert response.status_code == 200
+            assert not response.has_header("Content-Encoding")
+            assert response["Content-Type"] == "application/gzip"
+            assert response["ETag"] == etag
+            assert len(self.products(response)) == 5
+
+    def test_build_snapshot_changed_chunks(self):
+        self.build()
+        etag = self.client.get(self.url)["ETag"]
+        assert "chunk 0 개" in self.build()
+        assert self.client.get(self.url)["ETag"] == etag
+
+        self.client.patch(
+            reverse("product-detail", kwargs={"pk": 3}),
+            {
+                "pk": 3,
+                "name": "TestProduct3",
+                "option_set": [{"name": "NewOption", "price": 500}],
+                "tag_set": [],
+            },
+            format="json",
+        )
+        self.client.delete(reverse("product-list"), [5], format="json")
+        assert "chunk 1 개" in self.build()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        products = self.products(response)
+        assert [product["pk"] for product in products] == [1, 2, 3, 4]
+        assert products[2]["option_set"] == [
+            {"pk": 6, "name": "NewOption", "price": 500}
+        ]
+        assert sorted(
+            os.listdir(os.path.join(settings.SHOP_SNAPSHOT_DIR, "chunks"))
+        ) == [
+            "0.gz",
+            "1.gz",
+        ]
+
+        assert "chunk 2 개" in self.build("--force")
+        assert self.client.get(self.url)["ETag"] == response["ETag"]
+
+    def test_view_product_snapshot_fail_not_built(self):
+        assert self.client.get(self.url).status_code == 404
+
+
+# ASGI (config.asgi) TEST
+@pytest.mark.django_db(transaction=True)
+class TestThreadPoolASGIHandler:
+    def setup_method(cls):
+        cls.client = APIClient()
+        cls.application = ThreadPoolASGIHandler(get_wsgi_application(), 2)
+        for i in range(3):
+            product = Product.objects.create(name=f"TestProduct{i+1}")
+            ProductOption.objects.create(product=product, name="TestOption", price=500)
+
+    def teardown_method(cls):
+        cls.application.executor.shutdown(wait=True)
+
+    def call(self, path, method="GET", body=b"", query=b"", on_body=None):
+        messages = []
+
+        async def run():
+            queue = asyncio.Queue()
+            await queue.put({"type": "http.request", "body": body})
+
+            async def send(message):
+                messages.append(message)
+                if on_body is not None and message["type"] == "http.response.body":
+                    await on_body(queue)
+
+            scope = {
+                "type": "http",
+                "method": method,
+                "path": path,
+                "query_string": query,
+                "headers": [
+                    (b"host", b"testserver"),
+                    (b"content-type", b"application/json"),
+                ],
+                "server": ("testserver", 80),
+            }
+            await self.application(scope, queue.get, send)
+
+        asyncio.run(run())
+        return messages
+
+    def test_asgi_product_list(self):
+        messages = self.call(reverse("product-list"), query=b"page_size=2")
+        assert messages[0]["status"] == 200
+        content = b"".join(m.get("body", b"") for m in messages[1:])
+        assert (
+            content == self.client.get(reverse("product-list") + "?page_size=2").content
+        )
+
+    def test_asgi_product_create(self):
+        body = json.dumps(
+            {"name": "AsgiProduct", "option_set": [], "tag_set": []}
+        ).encode()
+        messages = self.call(reverse("product-list"), method="POST", body=body)
+        assert messages[0]["status"] == 201
+        assert Product.objects.filter(name="AsgiProduct").exists()
+
+    def test_asgi_product_export_stream(self, settings):
+        settings.SHOP_EXPORT_CHUNK_SIZE = 1
+        messages = self.call(reverse("product-export"))
+        assert messages[0]["status"] == 200
+        chunks = [m["body"] for m in messages[1:] if m["body"]]
+        # 상품 chunk 마다 따로 전송
+        assert len(chunks) == 3
+        assert b"".join(chunks) == b"".join(
+            self.client.get(reverse("product-export")).streaming_content
+        )
+
+    def test_asgi_close_connections_on_worker_threads(self, monkeypatch):
+        # 요청 처리 / chunk 생성을 실행한 모든 스레드에서 이후 DB 연결 정리
+        events = []
+        monkeypatch.setattr(
+            "config.asgi.close_old_connections",
+            lambda: events.append(("close", threading.current_thread().name)),
+        )
+
+        def application(environ, start_response):
+            events.append(("use", threading.current_thread().name))
+            start_response("200 OK", [])
+
+            def chunks():
+                for _ in range(3):
+                    events.append(("use", threading.current_thread().name))
+                    yield b"chunk"
+
+            return chunks()
+
+        self.application.executor.shutdown(wait=True)
+        self.application = ThreadPoolASGIHandler(application, 2)
+        messages = self.call("/")
+        assert b"".join(m["body"] for m in messages[1:]) == b"chunk" * 3
+        for index, (event, name) in enumerate(events):
+            if event == "use":
+                assert ("close", name) in events[index + 1 :]
+
+    def test_asgi_product_export_disconnect(self, settings):
+        settings.SHOP_EXPORT_CHUNK_SIZE = 1
+
+        async def disconnect(queue):
+            await queue.put({"type": "http.disconnect"})
+
+        messages = self.call(reverse("product-export"), on_body=disconnect)
+        assert len([m for m in messages[1:] if m["body"]]) < 3
+
+
+# import_catalog COMMAND TEST
+@pytest.mark.django_db
+class TestImportCatalogCommand:
+    def setup_method(cls):
+        Tag.objects.create(name="ExistTag")
 
-        assert product.name == "TestProduct"
-        assert product.option_set.count() == 3
+    def test_import_catalog_jsonl(self, tmp_path):
+        path = tmp_path / "products.jsonl"
+        path.write_text(
+            "\n".join(
+                json.dumps(
+                    {
+                        "name": f"TestProduct{i+1}",
+                        "option_set": [{"name": "TestOption1", "price": 1000}],
+                        "tag_set": [{"pk": 99, "name": "ExistTag"}, {"name": "NewTag"}],
+                    }
+                )
+                for i in range(5)
+            )
+            + "\n{invalid json\n"
+        )
+        out, err = io.StringIO(), io.StringIO()
+        call_command(
+            "import_catalog",
+            str(path),
+            "--chunk-size=2",
+            "--workers=1",
+            stdout=out,
+            stderr=err,
+        )
 
-        options = product.option_set.all()
-        for i, option in enumerate(options):
-            assert option.name == f"TestOption{i+1}"
-            assert option.price == (2 - i) * 500
+        assert Product.objects.count() == 5
+        assert ProductOption.objects.count() == 5
+        assert list(Tag.objects.values_list("name", flat=True)) == [
+            "ExistTag",
+            "NewTag",
+        ]
+        for product in Product.objects.all():
+            assert product.tag_set.count() == 2
+        assert "chunk 2" in out.getvalue()
+        assert "6:" in err.getvalue()
+        assert not ImportProgress.objects.exists()
 
-    def test_create_product_fail_non_name(self):
-        request_data = {
-            "option_set": [
-                {"name": "TestOption1", "price": 1000},
-                {"name": "TestOption2", "price": 500},
-                {"name": "TestOption3", "price": 0},
-            ],
-            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"name": "NewTag"}],
-        }
-        response = self.client.post(self.url, request_data, format="json")
-        assert response.status_code == 400
+    def test_import_catalog_csv_export_round_trip(self, tmp_path):
+        product = Product.objects.create(name="TestProduct, 1")
+        ProductOption.objects.create(product=product, name="TestOption1", price=1000)
+        product.tag_set.add(Tag.objects.get(name="ExistTag"))
+        response = APIClient().get(reverse("product-export") + "?type=csv")
+        path = tmp_path / "products.csv"
+        path.write_bytes(b"".join(response.streaming_content))
 
-    def test_create_product_fail_non_option(self):
-        request_data = {
-            "name": "TestProduct",
-            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"name": "NewTag"}],
-        }
-        response = self.client.post(self.url, request_data, format="json")
-        assert response.status_code == 400
+        call_command("import_catalog", str(path), "--workers=1", stdout=io.StringIO())
 
-    def test_create_product_success_option_null(self):
-        request_data = {
-            "name": "TestProduct",
-            "option_set": [],
-            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"name": "NewTag"}],
-        }
-        response_data = {
-            "pk": 1,
-            "name": "TestProduct",
-            "option_set": [],
-            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"pk": 2, "name": "NewTag"}],
-        }
-        response = self.client.post(self.url, request_data, format="json")
-        assert response.status_code == 201
-        assert response.data == response_data
+        imported = Product.objects.get(pk=2)
+        assert imported.name == "TestProduct, 1"
+        assert [(o.name, o.price) for o in imported.option_set.all()] == [
+            ("TestOption1", 1000)
+        ]
+        assert [tag.name for tag in imported.tag_set.all()] == ["ExistTag"]
 
-    def test_create_product_fail_option_name_null(self):
-        request_data = {
-            "name": "TestProduct",
-            "option_set": [
-                {"price": 1000},
-                {"name": "TestOption2", "price": 500},
-                {"name": "TestOption3", "price": 0},
-            ],
-            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"name": "NewTag"}],
-        }
-        response_data = {
-            "pk": 1,
-            "name": "TestProduct",
-            "option_set": [],
-            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"pk": 2, "name": "NewTag"}],
-        }
-        response = self.client.post(self.url, request_data, format="json")
-        assert response.status_code == 400
+    def test_import_catalog_resume(self, tmp_path, monkeypatch):
+        from shop.management.commands import import_catalog
 
-    def test_create_product_fail_option_price_null(self):
-        request_data = {
-            "name": "TestProduct",
-            "option_set": [
-                {"name": "TestOption1"},
-                {"name": "TestOption2", "price": 500},
-                {"name": "TestOption3", "price": 0},
-            ],
-            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"name": "NewTag"}],
-        }
-        response_data = {
-            "pk": 1,
-            "name": "TestProduct",
-            "option_set": [],
-            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"pk": 2, "name": "NewTag"}],
-        }
-        response = self.client.post(self.url, request_data, format="json")
-        assert response.status_code == 400
+        path = tmp_path / "products.jsonl"
+        path.write_text(
+            "\n".join(
+                json.dumps(
+                    {"name": f"TestProduct{i+1}", "option_set": [], "tag_set": []}
+                )
+                for i in range(6)
+            )
+        )
+        insert_products = import_catalog.insert_products
 
-    def test_create_product_fail_non_tag(self):
-        request_data = {
-            "name": "TestProduct",
-            "option_set": [
-                {"name": "TestOption1", "price": 1000},
-                {"name": "TestOption2", "price": 500},
-                {"name": "TestOption3", "price": 0},
-            ],
-        }
-        response_data = {
-            "pk": 1,
-            "name": "TestProduct",
-            "option_set": [
-                {"pk": 1, "name": "TestOption1", "price": 1000},
-                {"pk": 2, "name": "TestOption2", "price": 500},
-                {"pk": 3, "name": "TestOption3", "price": 0},
-            ],
-            "tag_set": [],
-        }
-        response = self.client.post(self.url, request_data, format="json")
-        assert response.status_code == 400
+        def fail_third_product(items, tag_pks):
+            if items[0][0] == "TestProduct3":
+                raise DatabaseError("disk I/O error")
+            return insert_products(items, tag_pks)
 
-    def test_create_product_success_tag_null(self):
-        request_data = {
-            "name": "TestProduct",
-            "option_set": [
-                {"name": "TestOption1", "price": 1000},
-                {"name": "TestOption2", "price": 500},
-                {"name": "TestOption3", "price": 0},
-            ],
-            "tag_set": [],
-        }
-        response_data = {
-            "pk": 1,
-            "name": "TestProduct",
-            "option_set": [
-                {"pk": 1, "name": "TestOption1", "price": 1000},
-                {"pk": 2, "name": "TestOption2", "price": 500},
-                {"pk": 3, "name": "TestOption3", "price": 0},
-            ],
-            "tag_set": [],
-        }
-        response = self.client.post(self.url, request_data, format="json")
-        assert response.status_code == 201
-        assert response.data == response_data
+        monkeypatch.setattr(import_catalog, "insert_products", fail_third_product)
+        with pytest.raises(CommandError):
+            call_command(
+                "import_catalog",
+                str(path),
+                "--chunk-size=2",
+                "--workers=1",
+                stdout=io.StringIO(),
+            )
+        assert Product.objects.count() == 2
 
-    def test_create_product_fail_option_price_is_string(self):
-        request_data = {
-            "name": "TestProduct",
-            "option_set": [
-                {"name": "TestOption1", "price": 1000},
-                {"name": "TestOption2", "price": 500},
-                {"name": "TestOption3", "price": "Error"},
-            ],
-            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"name": "NewTag"}],
-        }
-        response = self.client.post(self.url, request_data, format="json")
-        assert response.status_code == 400
+        monkeypatch.setattr(import_catalog, "insert_products", insert_products)
+        call_command(
+            "import_catalog",
+            str(path),
+            "--chunk-size=2",
+            "--workers=1",
+            "--resume",
+            stdout=io.StringIO(),
+        )
+        assert list(Product.objects.values_list("name", flat=True)) == [
+            f"TestProduct{i+1}" for i in range(6)
+        ]
+        assert not ImportProgress.objects.exists()
 
-    def test_create_product_fail_tag_name_is_duplicate(self):
-        request_data = {
-            "name": "TestProduct",
-            "option_set": [
-                {"name": "TestOption1", "price": 1000},
-                {"name": "TestOption2", "price": 500},
-                {"name": "TestOption3", "price": 0},
-            ],
-            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"name": "ExistTag"}],
-        }
-        response = self.client.post(self.url, request_data, format="json")
-        assert response.status_code == 400
+    def test_import_catalog_resume_after_commit(self, tmp_path):
+        # chunk 커밋 직후 종료되어도 --resume 시 같은 chunk 를 다시 저장하지 않음
+        path = tmp_path / "products.jsonl"
+        path.write_text(
+            "\n".join(
+                json.dumps(
+                    {"name": f"TestProduct{i+1}", "option_set": [], "tag_set": []}
+                )
+                for i in range(6)
+            )
+        )
 
-    def test_create_product_fail_tag_name_null_pk_exist(self):
-        request_data = {
-            "name": "TestProduct",
-            "option_set": [
-                {"name": "TestOption1", "price": 1000},
-                {"name": "TestOption2", "price": 500},
-                {"name": "TestOption3", "price": 0},
-            ],
-            "tag_set": [{"pk": 1}, {"name": "ExistTag"}],
-        }
-        response = self.client.post(self.url, request_data, format="json")
-        assert response.status_code == 400
+        class KilledOutput(io.StringIO):
+            def write(self, text):
+                if text.startswith("chunk 1:"):
+                    raise KeyboardInterrupt
+                return super().write(text)
 
-    def test_create_product_fail_tag_name_null_pk_not_exist(self):
-        request_data = {
-            "name": "TestProduct",
-            "option_set": [
-                {"name": "TestOption1", "price": 1000},
-                {"name": "TestOption2", "price": 500},
-                {"name": "TestOption3", "price": 0},
-            ],
-            "tag_set": [{"pk": 1, "name": "ExistTag"}, {}],
-        }
-        response = self.client.post(self.url, request_data, format="json")
-        assert response.status_code == 400
+        with pytest.raises(KeyboardInterrupt):
+            call_command(
+                "import_catalog",
+                str(path),
+                "--chunk-size=2",
+                "--workers=1",
+                stdout=KilledOutput(),
+            )
+        assert Product.objects.count() == 4
+        assert ImportProgress.objects.get().chunk == 1
 
-    def test_create_product_fail_test_transcation(self):
-        request_data = {
-            "name": "TestProduct",
-            "option_set": [
-                {"name": "TestOption1", "price": 1000},
-                {"name": "TestOption2", "price": 500},
-                {"name": "TestOption3", "price": "Error"},
-            ],
-            "tag_set": [{"pk": 1, "name": "ExistTag"}, {"name": "ExistTag"}],
-        }
-        self.client.post(self.url, request_data, format="json")
-        assert Product.objects.count() == 0
+        with pytest.raises(CommandError):
+            call_command(
+                "import_catalog",
+                str(path),
+                "--chunk-size=3",
+                "--workers=1",
+                "--resume",
+                stdout=io.StringIO(),
+            )
+        out = io.StringIO()
+        call_command(
+            "import_catalog",
+            str(path),
+            "--chunk-size=2",
+            "--workers=1",
+            "--resume",
+            stdout=out,
+        )
+        assert "chunk 1 이후부터" in out.getvalue()
+        assert list(Product.objects.values_list("name", flat=True)) == [
+            f"TestProduct{i+1}" for i in range(6)
+        ]
 
 
 # Shop/product/<int:pk> GET TEST
@@ -473,6 +2933,49 @@ class TestProductDetailPatchAPI:
         assert response.status_code == 200
         assert ProductOption.objects.count() == 0
 
+    def test_update_product_fail_duplicate_option_pk(self):
+        request_data = {
+            **self.success_data,
+            "option_set": [
+                {"pk": 1, "name": "TestOption1", "price": 1000},
+                {"pk": 1, "name": "Edit TestOption1", "price": 1500},
+            ],
+        }
+        response = self.client.patch(self.url, request_data, format="json")
+        assert response.status_code == 400
+        assert response.data == ["중복된 옵션입니다."]
+        assert ProductOption.objects.count() == 3
+
+    def test_update_product_option_pk_string(self):
+        request_data = {
+            **self.success_data,
+            "option_set": [
+                {"pk": "1", "name": "TestOption1", "price": 1000},
+                {"pk": "2", "name": "Edit TestOption2", "price": 1500},
+            ],
+        }
+        response = self.client.patch(self.url, request_data, format="json")
+        assert response.status_code == 200
+        assert response.data["option_set"] == [
+            {"pk": 1, "name": "TestOption1", "price": 1000},
+            {"pk": 2, "name": "Edit TestOption2", "price": 1500},
+        ]
+
+        request_data["option_set"].append({"pk": 1, "name": "Copy", "price": 100})
+        response = self.client.patch(self.url, request_data, format="json")
+        assert response.status_code == 400
+        assert response.data == ["중복된 옵션입니다."]
+
+    def test_update_product_fail_option_pk_not_number(self):
+        request_data = {
+            **self.success_data,
+            "option_set": [{"pk": "a", "name": "TestOption1", "price": 1000}],
+        }
+        response = self.client.patch(self.url, request_data, format="json")
+        assert response.status_code == 400
+        assert response.data == ["옵션 pk 는 숫자로 입력해야 합니다."]
+        assert ProductOption.objects.count() == 3
+
     def test_update_product_fail_option_name_null(self):
         request_data = {
             "pk": 1,
@@ -597,3 +3100,81 @@ class TestProductDetailPatchAPI:
         }
         response = self.client.patch(self.url, request_data, format="json")
         assert response.status_code == 400
+
+    def test_update_product_noop_query_count(self, django_assert_num_queries):
+        request_data = {
+            "pk": 1,
+            "name": "TestProduct",
+            "option_set": [
+                {"pk": 1, "name": "TestOption1", "price": 1000},
+                {"pk": 2, "name": "TestOption2", "price": 500},
+                {"pk": 3, "name": "TestOption3", "price": 0},
+            ],
+            "tag_set": [{"pk": 1, "name": "ExistTag"}],
+        }
+        version = Product.objects.get(pk=1).version
+        # 상품 1 + 옵션 / 태그 prefetch 2, 쓰기 없음
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.url, request_data, format="json")
+        assert response.status_code == 200
+        assert [query["sql"].split()[0] for query in queries] == [
+            "SAVEPOINT",
+            "SELECT",
+            "SELECT",
+            "SELECT",
+            "RELEASE",
+        ]
+        assert len(response.data["option_set"]) == 3
+        assert len(response.data["tag_set"]) == 2
+        assert Product.objects.get(pk=1).version == version
+
+    def test_update_product_writes_changed_rows_only(self):
+        request_data = {
+            "pk": 1,
+            "name": "TestProduct",
+            "option_set": [
+                {"pk": 1, "name": "TestOption1", "price": 1000},
+                {"pk": 2, "name": "TestOption2", "price": 700},
+            ],
+            "tag_set": [],
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.url, request_data, format="json")
+        assert response.status_code == 200
+        assert response.data["option_set"] == [
+            {"pk": 1, "name": "TestOption1", "price": 1000},
+            {"pk": 2, "name": "TestOption2", "price": 700},
+        ]
+        option_writes = [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith(
+                ('DELETE FROM "shop_productoption"', 'UPDATE "shop_productoption"')
+            )
+        ]
+        assert len(option_writes) == 2
+        assert option_writes[0].startswith("DELETE")
+        assert option_writes[1].startswith("UPDATE")
+        assert '"shop_productoption"."id" IN (2)' in option_writes[1]
+        assert not any(
+            query["sql"].startswith('INSERT INTO "shop_product_tag_set"')
+            for query in queries
+        )
+        assert Product.objects.get(pk=1).max_price == 1000
+
+    def test_update_product_fail_other_product_option(self):
+        other = Product.objects.create(name="OtherProduct")
+        option = ProductOption.objects.create(
+            product=other, name="OtherOption", price=100
+        )
+        request_data = {
+            "pk": 1,
+            "name": "TestProduct",
+            "option_set": [{"pk": option.pk, "name": "Hijack", "price": 1}],
+            "tag_set": [],
+        }
+        response = self.client.patch(self.url, request_data, format="json")
+        assert response.status_code == 400
+        option.refresh_from_db()
+        assert option.name == "OtherOption"
+        assert ProductOption.objects.filter(product=1).count() == 3
@@ -0,0 +1,216 @@
+from django.db import transaction, DatabaseError
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from .bulk import assign_pks
+from .models import Product, Tag, ProductOption
+from .sync import products_changed
+from .tags import parse_tag_payload, resolve_tag_lists, tag_index
+
+__all__ = (
+    "validate_update_payload",
+    "apply_product_updates",
+    "bulk_update_products",
+)
+
+
+def validate_update_payload(data):
+    # 반환값: ([(옵션 pk 또는 None, 옵션명, 가격)], [(태그 pk 또는 None, 태그명)])
+    options = []
+    for option in data["option_set"]:
+        if not isinstance(option, dict) or "name" not in option:
+            raise ValidationError("옵션명은 필수 입력 값입니다.")
+
+        if "price" not in option:
+            raise ValidationError("가격은 필수 입력 값입니다.")
+        try:
+            price = int(option["price"])
+        except (TypeError, ValueError):
+            raise ValidationError("가격은 숫자로 입력해야 합니다.")
+
+        # 기존 옵션과 비교할 수 있도록 pk 는 숫자로 변환 ("1" 도 허용)
+        pk = option.get("pk")
+        if pk is not None:
+            try:
+                pk = int(pk)
+            except (TypeError, ValueError):
+                raise ValidationError("옵션 pk 는 숫자로 입력해야 합니다.")
+
+        options.append((pk, option["name"], price))
+
+    tags = parse_tag_payload(data["tag_set"])
+    return options, tags
+
+
+def check_option_pks(product, options):
+    # 다른 상품의 옵션 pk 는 변경할 수 없음 (prefetch 된 옵션으로 확인)
+    current = {option.pk for option in product.option_set.all()}
+    seen = set()
+    for pk, _, _ in options:
+        if pk is None:
+            continue
+        if pk not in current:
+            raise ValidationError("존재하지 않는 옵션입니다.")
+        if pk in seen:
+            raise ValidationError("중복된 옵션입니다.")
+        seen.add(pk)
+
+
+def _diff_options(product, options, created, updated, deleted):
+    # 전달되지 않은 옵션은 삭제, 값이 바뀐 옵션만 수정, pk 가 없는 옵션은 추가
+    check_option_pks(product, options)
+    current = {option.pk: option for option in product.option_set.all()}
+    kept = []
+    for pk, name, price in options:
+        if pk is None:
+            option = ProductOption(product=product, name=name, price=price)
+            created.append(option)
+        else:
+            option = current.pop(pk)
+            if option.name != name or option.price != price:
+                option.name = name
+                option.price = price
+                updated.append(option)
+        kept.append(option)
+    deleted += list(current)
+    return kept
+
+
+def apply_product_updates(updates):
+    # updates: [(상품, 옵션, 태그)], 상품은 option_set / tag_set 이 prefetch 된 인스턴스
+    # 필요한 INSERT / UPDATE / DELETE 만 실행하고 prefetch 캐시를 변경된 상태로 갱신
+    created, updated, deleted = [], [], []
+    product_options = []
+    for product, options, _ in updates:
+        before = len(created) + len(updated) + len(deleted)
+        kept = _diff_options(product, options, created, updated, deleted)
+        changed = len(created) + len(updated) + len(deleted) != before
+        product_options.append((kept, changed))
+
+    # 기존 태그는 유지하고 연결되지 않은 태그만 추가
+    pending = []
+    for product, _, tags in updates:
+        linked = {tag.name for tag in product.tag_set.all()}
+        pending.append([(pk, name) for pk, name in tags if name not in linked])
+
+    tag_pks = {}
+    link_lists = [[] for _ in updates]
+    if any(pending):
+        link_lists = resolve_tag_lists(pending, tag_pks)
+    tag_names = {pk: name for name, pk in tag_pks.items()}
+
+    if deleted:
+        ProductOption.objects.filter(pk__in=deleted).delete()
+    if updated:
+        ProductOption.objects.bulk_update(updated, fields=["name", "price"])
+    if created:
+        assign_pks(ProductOption, created)
+        ProductOption.objects.bulk_create(created)
+
+    through = Product.tag_set.through
+    links = []
+    option_changed, tag_changed = [], []
+    for (product, _, _), (kept, changed), link_pks in zip(
+        updates, product_options, link_lists
+    ):
+        new_tags = [Tag(pk=pk, name=tag_names[pk]) for pk in link_pks]
+        links += [through(product_id=product.pk, tag_id=tag.pk) for tag in new_tags]
+
+        # 응답을 다시 조회하지 않도록 변경된 상태로 prefetch 캐시 교체
+        product._prefetched_objects_cache["option_set"] = sorted(
+            kept, key=lambda option: option.pk
+        )
+        product._prefetched_objects_cache["tag_set"] = sorted(
+            list(product.tag_set.all()) + new_tags, key=lambda tag: tag.pk
+        )
+
+        if changed:
+            option_changed.append(product.pk)
+        elif new_tags:
+            tag_changed.append(product.pk)
+
+    if links:
+        through.objects.bulk_create(links)
+        tag_index.add_links(tag_pks, link_lists)
+    if option_changed:
+        products_changed(option_changed)
+    if tag_changed:
+        products_changed(tag_changed, prices=False)
+    return option_changed + tag_changed
+
+
+def _validate_bulk_item(item, seen):
+    if (
+        not isinstance(item, dict)
+        or not isinstance(item.get("pk"), int)
+        or isinstance(item["pk"], bool)
+        or "option_set" not in item
+        or "tag_set" not in item
+    ):
+        raise ValidationError("잘못된 데이터입니다.")
+    if item["pk"] in seen:
+        raise ValidationError("중복된 상품입니다.")
+    seen.add(item["pk"])
+    return validate_update_payload(item)
+
+
+def bulk_update_products(data):
+    # 상품별 partial_update 와 같은 변경을 한 트랜잭션에서 실행
+    # 반환값: (상품별 결과, 변경된 상품 인스턴스 리스트)
+    results = [None] * len(data)
+    valid = []
+    seen = set()
+    for index, item in enumerate(data):
+        try:
+            payload = _validate_bulk_item(item, seen)
+            valid.append((index, item["pk"], payload))
+        except ValidationError as e:
+            results[index] = {
+                "index": index,
+                "status": status.HTTP_400_BAD_REQUEST,
+                "errors": e.detail,
+            }
+
+    products = Product.objects.prefetch_related("option_set", "tag_set").in_bulk(
+        [pk for _, pk, _ in valid]
+    )
+    updates = []
+    for index, pk, (options, tags) in valid:
+        product = products.get(pk)
+        try:
+            if product is None:
+                raise ValidationError("존재하지 않는 상품입니다.")
+            check_option_pks(product, options)
+        except ValidationError as e:
+            results[index] = {
+                "index": index,
+                "status": (
+                    status.HTTP_404_NOT_FOUND
+                    if product is None
+                    else status.HTTP_400_BAD_REQUEST
+                ),
+                "pk": pk,
+                "errors": e.detail,
+            }
+            continue
+        updates.append((index, (product, options, tags)))
+
+    try:
+        with transaction.atomic():
+            apply_product_updates([update for _, update in updates])
+    except DatabaseError:
+        for index, (product, _, _) in updates:
+            results[index] = {
+                "index": index,
+                "status": status.HTTP_409_CONFLICT,
+                "pk": product.pk,
+                "errors": ["상품을 저장하지 못했습니다. 다시 시도해주세요."],
+            }
+        return results, []
+
+    for index, (product, _, _) in updates:
+        results[index] = {
+            "index": index,
+            "status": status.HTTP_200_OK,
+            "pk": product.pk,
+        }
+    return results, [product for _, (product, _, _) in updates]
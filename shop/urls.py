@@ -8,10 +8,48 @@ urlpatterns = [
             {
                 "get": "list",
                 "post": "create",
+                "patch": "bulk_update",
+                "delete": "bulk_destroy",
             },
         ),
         name="product-list",
     ),
+    path(
+        "products/bulk/",
+        views.ProductViewSet.as_view(
+            {
+                "post": "bulk_create",
+            },
+        ),
+        name="product-bulk",
+    ),
+    path(
+        "products/export/",
+        views.ProductViewSet.as_view(
+            {
+                "get": "export",
+            },
+        ),
+        name="product-export",
+    ),
+    path(
+        "products/changes/",
+        views.ProductViewSet.as_view(
+            {
+                "get": "changes",
+            },
+        ),
+        name="product-changes",
+    ),
+    path(
+        "products/snapshot/",
+        views.ProductViewSet.as_view(
+            {
+                "get": "snapshot",
+            },
+        ),
+        name="product-snapshot",
+    ),
     path(
         "products/<int:pk>/",
         views.ProductViewSet.as_view(
@@ -24,4 +62,50 @@ urlpatterns = [
         ),
         name="product-detail",
     ),
+    path(
+        "options/",
+        views.ProductOptionViewSet.as_view(
+            {
+                "get": "list",
+            },
+        ),
+        name="option-list",
+    ),
+    path(
+        "options/products/",
+        views.ProductOptionViewSet.as_view(
+            {
+                "get": "products",
+            },
+        ),
+        name="option-products",
+    ),
+    path(
+        "options/prices/",
+        views.ProductOptionViewSet.as_view(
+            {
+                "post": "adjust_price",
+            },
+        ),
+        name="option-prices",
+    ),
+    path(
+        "tags/autocomplete/",
+        views.TagViewSet.as_view(
+            {
+                "get": "autocomplete",
+            },
+        ),
+        name="tag-autocomplete",
+    ),
+    path(
+        "tags/facets/",
+        views.TagViewSet.as_view(
+            {
+                "get": "facets",
+            },
+        ),
+        name="tag-facets",
+    ),
+    path("internal/metrics/", views.metrics, name="metrics"),
 ]
@@ -1,19 +1,175 @@
-from django.db import transaction, IntegrityError
-from django.db.models import Q
+import hmac
+from django.conf import settings
+from django.db import transaction
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.viewsets import GenericViewSet, ModelViewSet, ReadOnlyModelViewSet
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.exceptions import ValidationError, ParseError
-from .serializers import ProductSerializer
-from .models import Product, Tag, ProductOption
+from rest_framework.exceptions import ValidationError, ParseError, NotFound
+from .serializers import ProductSerializer, ProductOptionPriceSerializer
+from .models import Product, ProductOption, Tag, TagFacet
+from .pagination import (
+    ProductCursorPagination,
+    OptionCursorPagination,
+    SearchCursorPagination,
+)
+from .filters import PriceRangeFilter, ProductInFilter, ProductOrderingFilter
+from .cache import cache_response, conditional_response
+from .sync import products_changed, products_deleted
+from .bulk import bulk_create_products, bulk_delete_products
+from .tags import parse_tag_payload, resolve_tag_pks, tag_index
+from .update import (
+    validate_update_payload,
+    apply_product_updates,
+    bulk_update_products,
+)
+from .export import EXPORT_FORMATS
+from .projection import RELATION_FIELDS, serialize_product_rows
+from .metrics import collect, render_prometheus
+from .changes import change_feed, latest_cursor
+from .snapshot import (
+    SNAPSHOT_CONTENT_TYPE,
+    SNAPSHOT_FILENAME,
+    current_snapshot,
+    snapshot_path,
+)
+from .pricing import (
+    PRICE_OPERATIONS,
+    PRICE_ROUNDINGS,
+    parse_price_adjustment,
+    adjust_prices,
+)
+
+fields_parameter = openapi.Parameter(
+    "fields",
+    openapi.IN_QUERY,
+    description="응답에 포함할 필드 (쉼표 구분, 예: pk,name)",
+    type=openapi.TYPE_STRING,
+)
 
 
 class ProductViewSet(ModelViewSet):
     queryset = Product.objects.prefetch_related("tag_set", "option_set")
     serializer_class = ProductSerializer
+    pagination_class = ProductCursorPagination
+    filter_backends = (PriceRangeFilter, ProductOrderingFilter)
+    ordering_fields = ("pk", "min_price", "max_price")
+    ordering = ("pk",)
+    # ?fields= 로 선택할 수 있는 필드 중 prefetch 가 필요한 관계 필드
+    prefetch_fields = RELATION_FIELDS
+    # action 별 요청당 최대 쿼리 수 (QueryBudgetMiddleware), 요청 크기에 비례하는
+    # bulk_create 와 스트리밍 응답인 export 는 제외
+    query_budgets = {
+        "list": 5,
+        "retrieve": 4,
+        "create": 18,
+        "update": 16,
+        "partial_update": 21,
+        "destroy": 12,
+        "bulk_update": 26,
+        "bulk_destroy": 11,
+        "changes": 5,
+        "snapshot": 0,
+    }
+
+    def get_sparse_fields(self):
+        value = self.request.query_params.get("fields")
+        if value is None or self.action not in ("list", "retrieve"):
+            return None
+        fields = [field for field in value.split(",") if field]
+        if not fields or set(fields).difference(ProductSerializer.Meta.fields):
+            raise ValidationError("지원하지 않는 필드입니다.")
+        return fields
+
+    def get_columns(self, fields):
+        # 출력 / 커서 정렬에 필요한 상품 컬럼
+        ordering = ProductOrderingFilter().get_ordering(
+            self.request, Product.objects.none(), self
+        )
+        return {"pk"}.union(
+            set(fields).difference(self.prefetch_fields),
+            (field.lstrip("-") for field in ordering or ()),
+        )
+
+    def get_queryset(self):
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return super().get_queryset()
+
+        # 요청된 관계 필드만 prefetch 하고, 상품은 필요한 컬럼만 조회
+        relations = [field for field in fields if field in self.prefetch_fields]
+        return Product.objects.prefetch_related(*relations).only(
+            *self.get_columns(fields)
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs.setdefault("fields", fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_product_rows(self):
+        # 모델 인스턴스 대신 values() 로 조회 (관계 필드는 serialize_product_rows 에서 조회)
+        fields = self.get_sparse_fields() or ProductSerializer.Meta.fields
+        queryset = self.filter_queryset(self.get_queryset())
+        return queryset.prefetch_related(None).values(*self.get_columns(fields))
+
+    @swagger_auto_schema(manual_parameters=[fields_parameter])
+    @cache_response
+    @conditional_response
+    def list(self, request, *args, **kwargs):
+        query = request.query_params.get("q")
+        if query is not None:
+            # 검색시 정렬 / 가격 필터는 적용하지 않고 검색 점수 순으로 응답
+            paginator = SearchCursorPagination()
+            page = paginator.paginate_search(request, query, self.get_queryset())
+            return paginator.get_paginated_response(
+                self.get_serializer(page, many=True).data
+            )
+        if not settings.SHOP_FAST_READ:
+            return super().list(request, *args, **kwargs)
+
+        page = self.paginate_queryset(self.get_product_rows())
+        return self.get_paginated_response(
+            serialize_product_rows(page, self.get_sparse_fields())
+        )
+
+    @swagger_auto_schema(manual_parameters=[fields_parameter])
+    @cache_response
+    @conditional_response
+    def retrieve(self, request, *args, **kwargs):
+        if not settings.SHOP_FAST_READ:
+            return super().retrieve(request, *args, **kwargs)
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        rows = self.get_product_rows().filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        data = serialize_product_rows(list(rows), self.get_sparse_fields())
+        if not data:
+            raise Http404
+        return Response(data[0])
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        products_changed([serializer.instance.pk], prices=False)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        products_deleted([instance.pk])
+        super().perform_destroy(instance)
 
     @swagger_auto_schema(
         request_body=openapi.Schema(
@@ -95,31 +251,12 @@ class ProductViewSet(ModelViewSet):
 
         ProductOption.objects.bulk_create(product_options)
 
-        new_tags = []
-        exist_tags = []
-        for tag in tag_data:
-            if "name" in tag and "pk" not in tag:
-                new_tags.append(Tag(name=tag["name"]))
-            elif "name" in tag and "pk" in tag:
-                exist_tags.append(tag)
-            elif "name" not in tag:
-                raise ValidationError("태그명은 필수 입력 값입니다.")
-
-        if new_tags:
-            try:
-                Tag.objects.bulk_create(new_tags)
-            except IntegrityError:
-                raise ValidationError("태그명은 중복될 수 없습니다.")
-
-        all_tags = Tag.objects.filter(
-            Q(name__in=[tag.name for tag in new_tags])
-            | Q(
-                pk__in=[tag["pk"] for tag in exist_tags],
-                name__in=[tag["name"] for tag in exist_tags],
-            )
-        )
-
-        product.tag_set.set(all_tags)
+        tags = parse_tag_payload(tag_data)
+        tag_pks = {}
+        linked = resolve_tag_pks(tags, tag_pks)
+        product.tag_set.add(*linked)
+        tag_index.add_links(tag_pks, [linked])
+        products_changed([product.pk], created=True)
 
         return Response(
             ProductSerializer(product).data,
@@ -199,81 +336,409 @@ class ProductViewSet(ModelViewSet):
         if data.get("pk") != pk:
             raise ParseError("잘못된 접근입니다.")
 
-        product = get_object_or_404(Product, pk=pk)
+        options, tags = validate_update_payload(data)
+        product = get_object_or_404(
+            Product.objects.prefetch_related("option_set", "tag_set"), pk=pk
+        )
+        apply_product_updates([(product, options, tags)])
 
-        option_data = data.pop("option_set", [])
-        tag_data = data.pop("tag_set", [])
+        return Response(ProductSerializer(product).data)
 
-        existing_option_pks = [
-            option.get("pk") for option in option_data if option.get("pk")
-        ]
-        ProductOption.objects.filter(
-            product=product,
-        ).exclude(
-            pk__in=existing_option_pks,
-        ).delete()
-
-        new_option_objects = []
-        exist_option_objects = []
-        for option in option_data:
-            if "name" not in option:
-                raise ValidationError("옵션명은 필수 입력 값입니다.")
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                "chunk_size",
+                openapi.IN_QUERY,
+                description="한번에 저장할 상품 수",
+                type=openapi.TYPE_INTEGER,
+            ),
+        ],
+        request_body=openapi.Schema(
+            type=openapi.TYPE_ARRAY,
+            description="상품 추가 요청과 같은 형식의 상품 리스트",
+            items=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                required=["name", "option_set", "tag_set"],
+                properties={
+                    "name": openapi.Schema(type=openapi.TYPE_STRING),
+                    "option_set": openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(type=openapi.TYPE_OBJECT),
+                    ),
+                    "tag_set": openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(type=openapi.TYPE_OBJECT),
+                    ),
+                },
+            ),
+        ),
+        responses={
+            201: "Created",
+            207: "Multi-Status, 상품별 결과 확인",
+            400: "Bad Request",
+        },
+    )
+    def bulk_create(self, request, *args, **kwargs):
+        data = request.data
+        if not isinstance(data, list):
+            raise ParseError("잘못된 데이터입니다.")
 
-            if "price" not in option:
-                raise ValidationError("가격은 필수 입력 값입니다.")
-            else:
-                try:
-                    price = int(option["price"])
-                except ValueError:
-                    raise ValidationError("가격은 숫자로 입력해야 합니다.")
+        try:
+            chunk_size = int(
+                request.query_params.get("chunk_size", settings.SHOP_BULK_CHUNK_SIZE)
+            )
+        except ValueError:
+            raise ValidationError("chunk_size 는 숫자로 입력해야 합니다.")
+        chunk_size = max(1, min(chunk_size, settings.SHOP_BULK_CHUNK_SIZE))
 
-            if "pk" in option:
-                exist_option_objects.append(
-                    ProductOption(
-                        pk=option["pk"],
-                        product=product,
-                        name=option["name"],
-                        price=option["price"],
-                    )
-                )
-            else:
-                new_option_objects.append(
-                    ProductOption(
-                        product=product, name=option["name"], price=option["price"]
-                    )
+        results, products = bulk_create_products(data, chunk_size)
+
+        return Response(
+            results,
+            status=(
+                status.HTTP_201_CREATED
+                if len(products) == len(data)
+                else status.HTTP_207_MULTI_STATUS
+            ),
+        )
+
+    def get_bulk_data(self, request):
+        data = request.data
+        if not isinstance(data, list):
+            raise ParseError("잘못된 데이터입니다.")
+        if len(data) > settings.SHOP_BULK_UPDATE_LIMIT:
+            raise ValidationError(
+                "한번에 변경할 수 있는 상품은 최대 {} 개입니다.".format(
+                    settings.SHOP_BULK_UPDATE_LIMIT
                 )
+            )
+        return data
 
-        ProductOption.objects.bulk_update(
-            exist_option_objects,
-            fields=["name", "price"],
+    def bulk_response(self, results, success):
+        return Response(
+            results,
+            status=(
+                status.HTTP_200_OK
+                if all(result["status"] == success for result in results)
+                else status.HTTP_207_MULTI_STATUS
+            ),
         )
-        ProductOption.objects.bulk_create(new_option_objects)
-
-        new_tags = []
-        exist_tags = []
-        for tag in tag_data:
-            if "name" in tag and "pk" not in tag:
-                new_tags.append(Tag(name=tag["name"]))
-            elif "name" in tag and "pk" in tag:
-                exist_tags.append(tag)
-            elif "name" not in tag:
-                raise ValidationError("태그명은 필수 입력 값입니다.")
-
-        if new_tags:
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_ARRAY,
+            description="상품 변경 요청과 같은 형식의 상품 리스트 (name 제외)",
+            items=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                required=["pk", "option_set", "tag_set"],
+                properties={
+                    "pk": openapi.Schema(type=openapi.TYPE_INTEGER),
+                    "option_set": openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(type=openapi.TYPE_OBJECT),
+                    ),
+                    "tag_set": openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(type=openapi.TYPE_OBJECT),
+                    ),
+                },
+            ),
+        ),
+        responses={
+            200: "OK",
+            207: "Multi-Status, 상품별 결과 확인",
+            400: "Bad Request",
+        },
+    )
+    def bulk_update(self, request, *args, **kwargs):
+        results, _ = bulk_update_products(self.get_bulk_data(request))
+        return self.bulk_response(results, status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_ARRAY,
+            description="삭제할 상품 pk 리스트",
+            items=openapi.Schema(type=openapi.TYPE_INTEGER),
+        ),
+        responses={
+            200: "OK",
+            207: "Multi-Status, 상품별 결과 확인",
+            400: "Bad Request",
+        },
+    )
+    def bulk_destroy(self, request, *args, **kwargs):
+        results, _ = bulk_delete_products(self.get_bulk_data(request))
+        return self.bulk_response(results, status.HTTP_204_NO_CONTENT)
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                "since",
+                openapi.IN_QUERY,
+                description="이전 응답의 cursor (없으면 변경 없이 현재 cursor 만 응답)",
+                type=openapi.TYPE_INTEGER,
+            ),
+            openapi.Parameter(
+                "limit",
+                openapi.IN_QUERY,
+                description="한번에 확인할 최대 변경 수",
+                type=openapi.TYPE_INTEGER,
+            ),
+        ],
+        responses={
+            200: "{cursor, has_more, upserts: 변경된 상품, deleted: 삭제된 상품 pk}",
+            400: "Bad Request",
+            410: "정리된 cursor, 전체 상품 다시 조회 필요",
+        },
+    )
+    def changes(self, request, *args, **kwargs):
+        since = request.query_params.get("since")
+        if since is None:
+            # 전체 상품 조회 전에 받은 cursor 부터 변경 피드로 동기화
+            return Response(
+                {
+                    "cursor": latest_cursor(),
+                    "has_more": False,
+                    "upserts": [],
+                    "deleted": [],
+                }
+            )
+        try:
+            since = int(since)
+            limit = int(
+                request.query_params.get("limit", settings.SHOP_CHANGE_FEED_LIMIT)
+            )
+        except ValueError:
+            raise ValidationError("since / limit 는 숫자로 입력해야 합니다.")
+        if since < 0:
+            raise ValidationError("since 는 0 이상이어야 합니다.")
+        limit = max(1, min(limit, settings.SHOP_CHANGE_FEED_LIMIT))
+
+        cursor, has_more, upserts, deleted = change_feed(since, limit)
+        return Response(
+            {
+                "cursor": cursor,
+                "has_more": has_more,
+                "upserts": upserts,
+                "deleted": deleted,
+            }
+        )
+
+    @swagger_auto_schema(
+        responses={
+            200: "전체 상품 NDJSON 의 gzip 파일 (X-Shop-Cursor 이후 변경은 변경 피드로 동기화)",
+            304: "Not Modified",
+            404: "생성된 스냅샷 없음",
+        },
+    )
+    def snapshot(self, request, *args, **kwargs):
+        # build_snapshot 으로 미리 압축한 파일을 그대로 전송 (DB 조회 / 압축 없음)
+        # WSGI 서버의 wsgi.file_wrapper (gunicorn 은 sendfile) 로 전송됨
+        manifest = current_snapshot()
+        if manifest is None:
+            raise NotFound("스냅샷이 없습니다.")
+        etag = quote_etag(manifest["etag"])
+        if etag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+            response = HttpResponseNotModified()
+        else:
             try:
-                Tag.objects.bulk_create(new_tags)
-                # Tag.objects.bulk_create(new_tags, ignore_conflicts=True)
-            except IntegrityError:
-                raise ValidationError("태그명은 중복될 수 없습니다.")
-
-        all_tags = Tag.objects.filter(
-            Q(name__in=[tag.name for tag in new_tags])
-            | Q(
-                pk__in=[tag["pk"] for tag in exist_tags],
-                name__in=[tag["name"] for tag in exist_tags],
+                response = FileResponse(
+                    open(snapshot_path(manifest), "rb"),
+                    content_type=SNAPSHOT_CONTENT_TYPE,
+                )
+            except FileNotFoundError:
+                raise NotFound("스냅샷이 없습니다.")
+            response.block_size = settings.SHOP_SNAPSHOT_BLOCK_SIZE
+            response["Content-Disposition"] = 'attachment; filename="{}"'.format(
+                SNAPSHOT_FILENAME
             )
-            | Q(product=product)
+        # 응답은 Accept-Encoding 과 관계없이 같지만, 중간 서버가 압축 여부별로 캐시하도록 명시
+        patch_vary_headers(response, ["Accept-Encoding"])
+        response["ETag"] = etag
+        response["X-Shop-Cursor"] = manifest["cursor"]
+        return response
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                "type",
+                openapi.IN_QUERY,
+                description="ndjson (기본) 또는 csv",
+                type=openapi.TYPE_STRING,
+                enum=["ndjson", "csv"],
+            ),
+        ],
+        responses={200: "상품 / 옵션 / 태그 전체 스트리밍", 400: "Bad Request"},
+    )
+    def export(self, request, *args, **kwargs):
+        export_type = request.query_params.get("type", "ndjson")
+        if export_type not in EXPORT_FORMATS:
+            raise ValidationError("지원하지 않는 형식입니다.")
+
+        iter_rows, content_type = EXPORT_FORMATS[export_type]
+        response = StreamingHttpResponse(
+            iter_rows(settings.SHOP_EXPORT_CHUNK_SIZE),
+            content_type=content_type,
         )
-        product.tag_set.set(all_tags)
+        response["Content-Disposition"] = 'attachment; filename="products.{}"'.format(
+            export_type
+        )
+        return response
 
-        return Response(ProductSerializer(product).data)
+
+class ProductOptionViewSet(ReadOnlyModelViewSet):
+    queryset = ProductOption.objects.all()
+    serializer_class = ProductOptionPriceSerializer
+    pagination_class = OptionCursorPagination
+    filter_backends = (PriceRangeFilter, ProductInFilter)
+    query_budgets = {
+        "list": 1,
+        "products": 3,
+        "adjust_price": 12,
+    }
+    price_range_lookups = {
+        "price_lte": "price__lte",
+        "price_gte": "price__gte",
+    }
+
+    def products(self, request, *args, **kwargs):
+        # 가격 범위에 해당하는 옵션이 있는 상품
+        options = self.filter_queryset(self.get_queryset())
+        queryset = Product.objects.filter(
+            pk__in=options.values("product")
+        ).prefetch_related("tag_set", "option_set")
+
+        paginator = ProductCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(ProductSerializer(page, many=True).data)
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            description="조건 (tags / products / price_gte / price_lte 중 하나 이상) 에 맞는 옵션 가격 변경",
+            required=["operation", "value"],
+            properties={
+                "tags": openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_INTEGER),
+                ),
+                "products": openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_INTEGER),
+                ),
+                "price_gte": openapi.Schema(type=openapi.TYPE_INTEGER),
+                "price_lte": openapi.Schema(type=openapi.TYPE_INTEGER),
+                "operation": openapi.Schema(
+                    type=openapi.TYPE_STRING, enum=list(PRICE_OPERATIONS)
+                ),
+                "value": openapi.Schema(
+                    type=openapi.TYPE_NUMBER,
+                    description="set: 가격, add: 더할 금액, percent: 변경 비율 (%)",
+                ),
+                "rounding": openapi.Schema(
+                    type=openapi.TYPE_STRING,
+                    enum=list(PRICE_ROUNDINGS),
+                    description="percent 의 반올림 방식 (기본 round)",
+                ),
+                "unit": openapi.Schema(
+                    type=openapi.TYPE_INTEGER,
+                    description="percent 의 반올림 단위 (기본 1원)",
+                ),
+            },
+        ),
+        responses={
+            200: "{updated: 변경된 옵션 수, products: 변경된 상품 수}",
+            400: "Bad Request",
+        },
+    )
+    def adjust_price(self, request, *args, **kwargs):
+        lookups, price = parse_price_adjustment(request.data)
+        updated, pks = adjust_prices(lookups, price)
+        return Response({"updated": updated, "products": len(pks)})
+
+
+class TagViewSet(GenericViewSet):
+    queryset = Tag.objects.all()
+    # 자동완성은 인덱스 생성 / 재생성시에만 조회
+    query_budgets = {
+        "autocomplete": 1,
+        "facets": 1,
+    }
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                "q",
+                openapi.IN_QUERY,
+                description="태그명 prefix (대소문자 구분 없음)",
+                type=openapi.TYPE_STRING,
+                required=True,
+            ),
+            openapi.Parameter(
+                "limit",
+                openapi.IN_QUERY,
+                description="최대 태그 수",
+                type=openapi.TYPE_INTEGER,
+            ),
+        ],
+        responses={
+            200: "태그명 순서의 [{pk, name, product_count}]",
+            400: "Bad Request",
+        },
+    )
+    def autocomplete(self, request, *args, **kwargs):
+        prefix = request.query_params.get("q", "")
+        if not prefix:
+            raise ValidationError("검색어를 입력해주세요.")
+        try:
+            limit = int(
+                request.query_params.get("limit", settings.SHOP_TAG_AUTOCOMPLETE_LIMIT)
+            )
+        except ValueError:
+            raise ValidationError("limit 는 숫자로 입력해야 합니다.")
+        limit = max(1, min(limit, settings.SHOP_MAX_PAGE_SIZE))
+
+        return Response(
+            [
+                {"pk": pk, "name": name, "product_count": count}
+                for pk, name, count in tag_index.search(prefix, limit)
+            ]
+        )
+
+    @swagger_auto_schema(
+        responses={
+            200: "상품이 있는 태그별 [{pk, name, product_count, min_price, max_price}]"
+        },
+    )
+    def facets(self, request, *args, **kwargs):
+        # 쓰기마다 갱신되는 TagFacet 요약 테이블만 조회
+        rows = (
+            TagFacet.objects.filter(product_count__gt=0)
+            .order_by("tag")
+            .values_list("tag", "tag__name", "product_count", "min_price", "max_price")
+        )
+        return Response(
+            [
+                {
+                    "pk": pk,
+                    "name": name,
+                    "product_count": product_count,
+                    "min_price": min_price,
+                    "max_price": max_price,
+                }
+                for pk, name, product_count, min_price, max_price in rows
+            ]
+        )
+
+
+def metrics(request):
+    # 내부 수집용 - 토큰이 설정되지 않았거나 일치하지 않으면 존재하지 않는 URL 처럼 응답
+    token = settings.SHOP_METRICS_TOKEN
+    authorization = request.META.get("HTTP_AUTHORIZATION", "")
+    if not token or not hmac.compare_digest(
+        authorization.encode(), "Bearer {}".format(token).encode()
+    ):
+        raise Http404
+    return HttpResponse(
+        render_prometheus(collect()), content_type="text/plain; version=0.0.4"
+    )